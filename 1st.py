@@ -2,21 +2,19 @@ import asyncio
 import json
 import re
 import ssl
-from io import BytesIO
 from pathlib import Path
-from tempfile import NamedTemporaryFile
 from urllib.parse import quote, urlparse
 from datetime import datetime
 import aiofiles
 import aiohttp
 from bs4 import BeautifulSoup
 from docx import Document
-import pikepdf
-from PyPDF2 import PdfReader
-from pdfminer.high_level import extract_text as pdfminer_extract_text
+from pdf_text import open_pdf_reader
+import extract_pool
 from playwright.async_api import async_playwright
 import os
 from dotenv import load_dotenv
+from prefetch import LookaheadPrefetcher
 
 load_dotenv()
 
@@ -130,16 +128,16 @@ async def get_date(url, session):
 
     if ctype == "pdf":
         try:
-            pdf = PdfReader(BytesIO(content))
+            pdf = open_pdf_reader(content)
             info = pdf.metadata
             for attr in ['/ModDate', '/CreationDate']:
                 if attr in info and info[attr]:
                     if (d := parse_date(info[attr])):
                         return d, "pdf_metadata"
-            for page in pdf.pages:
-                txt = page.extract_text() or ''
-                if (d := parse_date(txt)):
-                    return d, "pdf_text"
+            # Pages stream in from the extraction pool; the rest is cancelled at the first date
+            pages, hit = await extract_pool.pdf_pages_until(content, lambda n, txt: parse_date(txt))
+            if hit:
+                return parse_date(pages[-1][1]), f"pdf_text (page {hit})"
         except Exception as e:
             print(f"❌ PDF error: {e}")
         return None, "pdf_no_date"
@@ -192,7 +190,6 @@ async def fetch_with_playwright(page, url):
         return None
 
 async def process_company(domain, country, all_keywords, keyword_to_provider, session, browser):
-    page = await browser.new_page()
     found_keywords = set()
     found_entries = []
 
@@ -200,40 +197,34 @@ async def process_company(domain, country, all_keywords, keyword_to_provider, se
     search_data = await perform_google_search(session, domain, all_kw_query)
     if not search_data:
         print(f" No search data for {domain}")
-        await page.close()
         return
 
     urls = extract_urls(search_data, domain)
+    urls = [u for u in urls if not any(x in u.lower() for x in ["career", "jobs", "hiring", "recruitment", "apply"])]
     if not urls:
         print(f" No relevant URLs found for {domain}")
-        await page.close()
         return
 
-    for url in urls:
-        if len(found_entries) >= MAX_KEYWORDS_PER_COMPANY:
-            break
-        if any(x in url.lower() for x in ["career", "jobs", "hiring", "recruitment", "apply"]):
-            continue
-
-        text = await fetch_with_playwright(page, url)
-        if not text:
-            continue
-
-        lower_text = text.lower()
-        for kw in all_keywords:
-            if kw in found_keywords:
+    # Next URLs load in extra pages while the current one is analyzed
+    async with LookaheadPrefetcher(browser, fetch_with_playwright, min_interval=REQUEST_DELAY) as prefetcher:
+        async for url, text in prefetcher.iterate(urls):
+            if not text:
                 continue
-            if re.search(rf'\b{re.escape(kw)}\b', lower_text, re.IGNORECASE):
-                date_str, date_source = await get_date(url, session)
-                print(f" Found: keyword='{kw}' | provider='{keyword_to_provider[kw]}' | url='{url}' | date='{date_str or '-'}' ({date_source})")
-                found_keywords.add(kw)
-                found_entries.append((kw, keyword_to_provider[kw], url, date_str))
-                if len(found_entries) >= MAX_KEYWORDS_PER_COMPANY:
-                    break
-
-        await delay(REQUEST_DELAY)
 
-    await page.close()
+            lower_text = text.lower()
+            for kw in all_keywords:
+                if kw in found_keywords:
+                    continue
+                if re.search(rf'\b{re.escape(kw)}\b', lower_text, re.IGNORECASE):
+                    date_str, date_source = await get_date(url, session)
+                    print(f" Found: keyword='{kw}' | provider='{keyword_to_provider[kw]}' | url='{url}' | date='{date_str or '-'}' ({date_source})")
+                    found_keywords.add(kw)
+                    found_entries.append((kw, keyword_to_provider[kw], url, date_str))
+                    if len(found_entries) >= MAX_KEYWORDS_PER_COMPANY:
+                        break
+
+            if len(found_entries) >= MAX_KEYWORDS_PER_COMPANY:
+                break
 
     if not found_entries:
         print(f"❌ No keywords found in {domain}")
@@ -1,14 +1,15 @@
 import requests
 from bs4 import BeautifulSoup
 import re
-import spacy
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import threading
 import traceback
-
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+from urllib.parse import urlparse
+from html_text import leaf_block_texts
+from structured_people import structured_people_roles
+import model_client  # spaCy NER from model_server.py when running, else loaded in-process
 
 DESIGNATION_KEYWORDS = [
     "Chief", "CEO", "CFO", "COO", "CIO", "CTO",
@@ -20,29 +21,57 @@ DESIGNATION_KEYWORDS = [
 
 BLACKLIST = {"Support", "Sitemap", "Partners", "Resources", "Company", "Home", "Headquarters"}
 
+# Compiled once: a block can only yield an executive if one of these matches it
+DESIGNATION_PATTERNS = [re.compile(rf"\b{keyword}(\s+[A-Z][a-zA-Z]+){{0,3}}", re.IGNORECASE)
+                        for keyword in DESIGNATION_KEYWORDS]
+DESIGNATION_RE = re.compile(
+    r"\b(?:%s)" % "|".join(re.escape(k) for k in sorted(DESIGNATION_KEYWORDS, key=len, reverse=True)), re.IGNORECASE
+)
+NEIGHBOUR_BLOCKS = 1  # blocks either side of a designation that may hold the matching name
+
 OUTPUT_FILE = "executives_results.csv"
 CHECKPOINT_DIR = "checkpoints(pycharm)"
 BATCH_SIZE = 200
 THREADS = 5
+HTML_TEXT_BACKEND = None  # "selectolax", "lxml", "bs4" or None for the fastest installed
+BLOCK_TAGS = ("h1", "h2", "h3", "h4", "p", "div", "span", "li")
+NER_PROCESSES = 1  # spaCy worker processes for in-process NER; >1 only pays off on very large pages
+MAX_ABOUT_PAGES = 15   # candidate pages visited per company at most
+ENOUGH_EXECUTIVES = 5  # stop exploring once a page yields this many executives
+PATIENCE = 3           # stop after this many pages in a row that do not beat the best page
+EXPLORE_STATS_FILE = "about_explore_stats.csv"  # one row per company, for tuning the two thresholds above
 
 os.makedirs(CHECKPOINT_DIR, exist_ok=True)
 
 
-def fetch_html(url):
+_stats_lock = threading.Lock()
+
+
+def fetch_page(url):
+    """(final URL after redirects, html); the URL is unchanged when only the r.jina.ai fallback answered."""
     try:
         r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
         if r.status_code == 200:
-            return r.text
+            return r.url, r.text
     except Exception:
         pass
 
     try:
         r = requests.get(f"https://r.jina.ai/{url}", timeout=10)
         if r.status_code == 200:
-            return r.text
+            return url, r.text
     except Exception:
         pass
-    return ""
+    return url, ""
+
+
+def fetch_html(url):
+    return fetch_page(url)[1]
+
+
+def site_origin(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
 
 
 def is_valid_name(name: str) -> bool:
@@ -57,31 +86,65 @@ def is_valid_name(name: str) -> bool:
 
 
 def clean_designation(text: str) -> str:
-    for keyword in DESIGNATION_KEYWORDS:
-        match = re.search(rf"\b{keyword}(\s+[A-Z][a-zA-Z]+){{0,3}}", text, re.IGNORECASE)
+    for pattern in DESIGNATION_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group().strip()
     return ""
 
 
 def extract_executives(html):
-    soup = BeautifulSoup(html, "html.parser")
-    text_blocks = soup.find_all(["h1", "h2", "h3", "h4", "p", "div", "span", "li"])
+    # Fast path: schema.org Person markup (JSON-LD, microdata, RDFa) with declared job titles
+    people = structured_people_roles(html)
+    declared = [(name, title) for name, title, _ in people if title]
+    if declared:
+        return [{"name": name, "designations": title} for name, title in declared]
+
+    exec_map = ner_executives(html)
+    # Role-only markup (e.g. a site-wide Organization.founder block) adds to NER instead of replacing it
+    for name, _, role in people:
+        if role:
+            exec_map.setdefault(name, set()).update(role.split(", "))
 
-    exec_map = {}
+    return [{"name": n, "designations": ", ".join(sorted(list(d)))} for n, d in exec_map.items()]
 
-    for block in text_blocks:
-        text = block.get_text(" ", strip=True)
-        if not text or len(text.split()) < 2:
-            continue
 
-        doc = nlp(text)
-        persons = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
+def ner_executives(html):
+    """name -> set(designations) from spaCy PERSON entities in or next to blocks holding a title."""
+    # Own text of each block (nested blocks excluded), so wrapper divs do not repeat their children
+    text_blocks = leaf_block_texts(html, BLOCK_TAGS, backend=HTML_TEXT_BACKEND)
+
+    # Page shortcut: no designation token anywhere means no executive rows, so no NER at all
+    titled = [i for i, text in enumerate(text_blocks) if DESIGNATION_RE.search(text)]
+    if not titled:
+        return {}
+    # NER only runs on titled blocks and their neighbours (name and title split across siblings)
+    window = sorted({j for i in titled for j in range(i - NEIGHBOUR_BLOCKS, i + NEIGHBOUR_BLOCKS + 1)
+                     if 0 <= j < len(text_blocks)})
+
+    # One batched NER call over the distinct candidate blocks long enough to hold a name
+    unique = list(dict.fromkeys(text_blocks[j] for j in window if len(text_blocks[j].split()) >= 2))
+    persons_in = {
+        text: [name.strip() for name, _ in ents]
+        for text, ents in zip(unique, model_client.entities(unique, labels=("PERSON",), n_process=NER_PROCESSES))
+    }
+    titled = set(titled)
+    # A titled block that names its own person keeps its title to itself
+    named = {text for text, persons in persons_in.items() if any(is_valid_name(p) for p in persons)}
 
-        for person in persons:
+    exec_map = {}
+
+    for i in window:
+        text = text_blocks[i]
+        for person in persons_in.get(text, []):
             if not is_valid_name(person):
                 continue
-            designation = clean_designation(text)
+            # Own block first, then the nearest titled neighbour without a name (next before previous)
+            designation = clean_designation(text) if i in titled else ""
+            for d in range(1, NEIGHBOUR_BLOCKS + 1):
+                for j in (i + d, i - d):
+                    if not designation and j in titled and text_blocks[j] not in named:
+                        designation = clean_designation(text_blocks[j])
             if not designation:
                 continue
 
@@ -89,14 +152,11 @@ def extract_executives(html):
                 exec_map[person] = set()
             exec_map[person].add(designation)
 
-    return [{"name": n, "designations": ", ".join(sorted(list(d)))} for n, d in exec_map.items()]
-
+    return exec_map
 
-def find_about_pages(base_url):
-    html = fetch_html(base_url)
-    if not html:
-        return []
 
+def score_about_links(base_url, html):
+    """[(score, url), ...] for the links of a homepage that look like about/leadership pages, in page order."""
     soup = BeautifulSoup(html, "html.parser")
     candidate_links = []
     keywords_priority = [
@@ -117,11 +177,49 @@ def find_about_pages(base_url):
                 full_url = requests.compat.urljoin(base_url, a["href"])
                 candidate_links.append((score, full_url))
                 break
+    return candidate_links
+
 
+def find_about_pages(base_url, html=None):
+    if html is None:
+        html = fetch_html(base_url)
+    if not html:
+        return []
+    candidate_links = score_about_links(base_url, html)
     candidate_links.sort(reverse=True)
     return [link for _, link in candidate_links]
 
 
+def resolve_sites(base):
+    """
+    {origin: homepage html} for the www / non-www variants of a company, each fetched
+    once; variants that redirect to the same origin collapse into one entry.
+    """
+    sites = {}
+    for url in base:
+        final_url, html = fetch_page(url)
+        if html:
+            sites.setdefault(site_origin(final_url), html)
+    return sites
+
+
+def rank_about_pages(sites):
+    """Candidate pages of all variants, de-duplicated and best score first (page order within a score)."""
+    best = {}
+    for origin, html in sites.items():
+        for score, link in score_about_links(origin, html):
+            key = link.split("#")[0].rstrip("/").lower().split("://", 1)[-1]  # scheme-insensitive
+            if key not in best or score > best[key][0]:
+                best[key] = (score, link, origin)
+    return sorted(best.values(), key=lambda c: -c[0])
+
+
+def save_explore_stats(stats):
+    with _stats_lock:
+        header = not os.path.exists(EXPLORE_STATS_FILE)
+        pd.DataFrame([stats]).to_csv(EXPLORE_STATS_FILE, mode="a", header=header, index=False)
+
+
 def normalize_url(raw_url: str):
     """Ensure https/http prefix, return both www and non-www versions"""
     url = raw_url.strip()
@@ -138,29 +236,51 @@ def normalize_url(raw_url: str):
 
 
 def process_company(base, idx):
+    """
+    Visits the candidate about pages of a company best score first and keeps the one with
+    the most executives, stopping at ENOUGH_EXECUTIVES or after PATIENCE pages without gain.
+    """
     best_execs = []
     best_about = ""
     best_count = 0
     chosen_url = ""
+    stats = {"Index": idx, "BaseURL": base[0], "Variants": 0, "Candidates": 0, "Visited": 0,
+             "BestRank": "", "Executives": 0, "Stop": "no_site"}
 
-    # try both www and non-www
-    for url in base:
-        try:
-            about_pages = find_about_pages(url)
-            if not about_pages:
-                continue
+    try:
+        sites = resolve_sites(base)
+        candidates = rank_about_pages(sites)
+        stats.update(Variants=len(sites), Candidates=len(candidates), Stop="exhausted")
+
+        since_best = 0
+        for rank, (_, about_url, origin) in enumerate(candidates[:MAX_ABOUT_PAGES], 1):
+            try:
+                executives = extract_executives(fetch_html(about_url))
+            except Exception:
+                traceback.print_exc()
+                executives = []
+            stats["Visited"] = rank
+            if len(executives) > best_count:
+                best_execs = executives
+                best_about = about_url
+                best_count = len(executives)
+                chosen_url = origin
+                stats["BestRank"] = rank
+                since_best = 0
+            else:
+                since_best += 1
+
+            if best_count >= ENOUGH_EXECUTIVES:
+                stats["Stop"] = "enough"
+                break
+            if since_best >= PATIENCE:
+                stats["Stop"] = "no_gain"
+                break
+    except Exception:
+        traceback.print_exc()
 
-            for about_url in about_pages[:15]:
-                html = fetch_html(about_url)
-                executives = extract_executives(html)
-                if len(executives) > best_count:
-                    best_execs = executives
-                    best_about = about_url
-                    best_count = len(executives)
-                    chosen_url = url
-        except Exception as e:
-            traceback.print_exc()
-            continue
+    stats["Executives"] = best_count
+    save_explore_stats(stats)
 
     if not best_execs:
         return [(idx, base[0], "", "", "No executives detected")]
@@ -1,9 +1,10 @@
 import requests
-from bs4 import BeautifulSoup
 import re
-import spacy
+import model_client  # spaCy NER from model_server.py when running, else loaded in-process
+from html_text import leaf_block_texts
+from structured_people import structured_people_roles
 
-nlp = spacy.load("en_core_web_sm")
+BLOCK_TAGS = ("h1", "h2", "h3", "h4", "p", "div", "span", "li")
 
 DESIGNATION_KEYWORDS = [
     "Chief", "CEO", "CFO", "COO", "CIO", "CTO",
@@ -15,6 +16,14 @@ DESIGNATION_KEYWORDS = [
 
 BLACKLIST = {"Support", "Sitemap", "Partners", "Resources", "Company", "Home", "Headquarters"}
 
+# Compiled once: a block can only yield an executive if one of these matches it
+DESIGNATION_PATTERNS = [re.compile(rf"\b{keyword}(\s+[A-Z][a-zA-Z]+){{0,3}}", re.IGNORECASE)
+                        for keyword in DESIGNATION_KEYWORDS]
+DESIGNATION_RE = re.compile(
+    r"\b(?:%s)" % "|".join(re.escape(k) for k in sorted(DESIGNATION_KEYWORDS, key=len, reverse=True)), re.IGNORECASE
+)
+NEIGHBOUR_BLOCKS = 1  # blocks either side of a designation that may hold the matching name
+
 
 def fetch_html(url):
     try:
@@ -46,33 +55,68 @@ def is_valid_name(name: str) -> bool:
 
 def clean_designation(text: str) -> str:
     """Return a clean short job title (no biography)."""
-    for keyword in DESIGNATION_KEYWORDS:
-    
-        match = re.search(rf"\b{keyword}(\s+[A-Z][a-zA-Z]+){{0,3}}", text, re.IGNORECASE)
+    for pattern in DESIGNATION_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group().strip()
     return ""
 
 
 def extract_executives(html):
-    soup = BeautifulSoup(html, "html.parser")
-    text_blocks = soup.find_all(["h1", "h2", "h3", "h4", "p", "div", "span", "li"])
+    # Fast path: schema.org Person markup (JSON-LD, microdata, RDFa) with declared job titles
+    people = structured_people_roles(html)
+    declared = [(name, title) for name, title, _ in people if title]
+    if declared:
+        return [{"name": name, "designations": sorted(title.split(", "))} for name, title in declared]
+
+    exec_map = ner_executives(html)
+    # Role-only markup (e.g. a site-wide Organization.founder block) adds to NER instead of replacing it
+    for name, _, role in people:
+        if role:
+            exec_map.setdefault(name, set()).update(role.split(", "))
+
+    executives = [{"name": name, "designations": sorted(list(desigs))}
+                  for name, desigs in exec_map.items()]
+
+    return executives
 
-    exec_map = {}  # name -> set(designations)
 
-    for block in text_blocks:
-        text = block.get_text(" ", strip=True)
-        if not text or len(text.split()) < 2:
-            continue
+def ner_executives(html):
+    """name -> set(designations) from spaCy PERSON entities in or next to blocks holding a title."""
+    # Own text of each block (nested blocks excluded), so wrapper divs do not repeat their children
+    text_blocks = leaf_block_texts(html, BLOCK_TAGS, backend="bs4")
+
+    # Page shortcut: no designation token anywhere means no executive rows, so no NER at all
+    titled = [i for i, text in enumerate(text_blocks) if DESIGNATION_RE.search(text)]
+    if not titled:
+        return {}
+    # NER only runs on titled blocks and their neighbours (name and title split across siblings)
+    window = sorted({j for i in titled for j in range(i - NEIGHBOUR_BLOCKS, i + NEIGHBOUR_BLOCKS + 1)
+                     if 0 <= j < len(text_blocks)})
+
+    # One batched NER call over the distinct candidate blocks long enough to hold a name
+    unique = list(dict.fromkeys(text_blocks[j] for j in window if len(text_blocks[j].split()) >= 2))
+    persons_in = {
+        text: [name.strip() for name, _ in ents]
+        for text, ents in zip(unique, model_client.entities(unique, labels=("PERSON",)))
+    }
+    titled = set(titled)
+    # A titled block that names its own person keeps its title to itself
+    named = {text for text, persons in persons_in.items() if any(is_valid_name(p) for p in persons)}
 
-        doc = nlp(text)
-        persons = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
+    exec_map = {}  # name -> set(designations)
 
-        for person in persons:
+    for i in window:
+        text = text_blocks[i]
+        for person in persons_in.get(text, []):
             if not is_valid_name(person):
                 continue
-
-            designation = clean_designation(text)
+            # Own block first, then the nearest titled neighbour without a name (next before previous)
+            designation = clean_designation(text) if i in titled else ""
+            for d in range(1, NEIGHBOUR_BLOCKS + 1):
+                for j in (i + d, i - d):
+                    if not designation and j in titled and text_blocks[j] not in named:
+                        designation = clean_designation(text_blocks[j])
             if not designation:
                 continue
 
@@ -80,11 +124,7 @@ def extract_executives(html):
                 exec_map[person] = set()
             exec_map[person].add(designation)
 
-
-    executives = [{"name": name, "designations": sorted(list(desigs))}
-                  for name, desigs in exec_map.items()]
-
-    return executives
+    return exec_map
 
 
 if __name__ == "__main__":
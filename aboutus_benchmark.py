@@ -0,0 +1,66 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import model_client
+from aboutus import BLOCK_TAGS, HTML_TEXT_BACKEND, clean_designation, extract_executives, is_valid_name
+from html_text import block_texts
+
+
+def baseline_executives(html, nlp):
+    """The original extractor: full spaCy pipeline, one nlp() call per (nested) block."""
+    exec_map = {}
+    for text in block_texts(html, BLOCK_TAGS, backend=HTML_TEXT_BACKEND):
+        if not text or len(text.split()) < 2:
+            continue
+        doc = nlp(text)
+        for person in [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]:
+            if not is_valid_name(person):
+                continue
+            designation = clean_designation(text)
+            if designation:
+                exec_map.setdefault(person, set()).add(designation)
+    return {n: ", ".join(sorted(d)) for n, d in exec_map.items()}
+
+
+def run(pages, extract):
+    found = {}
+    start = time.perf_counter()
+    for path, html in pages:
+        found[path] = extract(html)
+    return time.perf_counter() - start, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pages/sec of the executive extractor before and after batched NER")
+    parser.add_argument("pages", help="Directory of saved leadership/about pages (*.html, searched recursively)")
+    parser.add_argument("--server", action="store_true", help="Let the new extractor use a running model_server.py")
+    args = parser.parse_args()
+
+    pages = [(str(p), p.read_text(encoding="utf-8", errors="replace")) for p in sorted(Path(args.pages).rglob("*.htm*"))]
+    if not pages:
+        print(f"No HTML pages under {args.pages}")
+        sys.exit(2)
+    if not args.server:
+        model_client.MODEL_SERVER_URL = ""
+
+    import spacy
+    full_nlp = spacy.load(model_client.SPACY_MODEL)
+    model_client.load_spacy()  # both pipelines loaded up front; load time is not part of pages/sec
+
+    before_s, before = run(pages, lambda html: baseline_executives(html, full_nlp))
+    after_s, after = run(pages, lambda html: {e["name"]: e["designations"] for e in extract_executives(html)})
+
+    names_before = sum(len(v) for v in before.values())
+    names_after = sum(len(v) for v in after.values())
+    shared = sum(len(set(before[p]) & set(after[p])) for p, _ in pages)
+    print(f"{len(pages)} pages")
+    print(f"before: {len(pages) / before_s:8.2f} pages/s  {names_before} executives")
+    print(f"after:  {len(pages) / after_s:8.2f} pages/s  {names_after} executives "
+          f"({shared} also found before, {names_after - shared} new, {names_before - shared} no longer found)")
+    print(f"speed-up: {before_s / after_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,37 @@
 import asyncio
 import re
 import logging
-from urllib.parse import urljoin, urlparse
-from io import BytesIO
+from urllib.parse import urlparse
 import datetime as dt
 
 import pandas as pd
 import httpx
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text as pdf_extract_text
-from PIL import Image
-import pytesseract
 import nest_asyncio
 
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-from translate import Translator
+from page_document import PageDocument
+import extract_pool
+from pdf_text import join_pages, page_numbers_for
+from translation import detect_language, translate_chunks
+import multilingual
+import embedding_cache
+import embedding_batcher
+from embedding_backends import embedding_model_name
+import model_client
+from multilingual import term_view
 
 nest_asyncio.apply()
 logging.getLogger("pdfminer").setLevel(logging.ERROR)
 
-model = SentenceTransformer('all-mpnet-base-v2')
-translator = Translator(to_lang="en")
+PDF_CONTEXT_PAGES = 1  # pages read past the first keyword hit
+PDF_TEXT_BACKEND = None  # "pdfminer", "pypdf2", "pypdfium2" or None for $PDF_TEXT_BACKEND
+HTML_TEXT_BACKEND = None  # "selectolax", "lxml", "bs4" or None for the fastest installed
+ROW_CONCURRENCY = 4  # rows processed at once by run_partial_frontend; their embeddings are batched together
+
+EMBEDDING_BACKEND = None  # "torch", "minilm", "onnx", "onnx-int8" or None for $EMBEDDING_BACKEND
+EMBEDDING_MODEL = embedding_model_name(EMBEDDING_BACKEND)
+model = model_client.get_encoder(EMBEDDING_BACKEND)  # shared model_server.py if running, else loaded here
 
 # Acronym expansions
 ACRONYM_MAP = {
@@ -116,16 +125,6 @@ def ensure_https(url):
         return "https://" + url
     return url
 
-async def translate_if_needed(text):
-    try:
-        translated_text = translator.translate(text)
-        if translated_text.lower() == text.lower():
-            return text
-        return translated_text
-    except Exception as e:
-        logging.warning(f"Translation failed: {e}. Returning original text.")
-        return text
-
 def contains_whole_word(text, word):
     return re.search(rf'\b{re.escape(word)}\b', text, flags=re.IGNORECASE) is not None
 
@@ -144,7 +143,7 @@ def is_news_or_course_site(url):
     is_course = any(re.search(p, url_lower) for p in course_patterns)
     return is_news, is_course
 
-def split_chunks(text, keyword, window_words=400):
+def split_chunks(text, keyword, window_words=400, require_terms=True):
     keyword_lower = keyword.lower()
     positions = [m.start() for m in re.finditer(rf'\b{re.escape(keyword_lower)}\b', text.lower())]
     words = re.findall(r'\S+', text)
@@ -161,28 +160,36 @@ def split_chunks(text, keyword, window_words=400):
             start_idx = max(0, idx - window_words // 2)
             end_idx = min(len(words), idx + window_words // 2 + 1)
             chunk = ' '.join(words[start_idx:end_idx])
-            if any(t in chunk.lower() for t in all_terms):
+            if not require_terms or any(t in chunk.lower() for t in all_terms):
                 chunks.append(chunk.strip())
 
-    if not chunks and any(t in text.lower() for t in all_terms):
+    if not chunks and (not require_terms or any(t in text.lower() for t in all_terms)):
         chunks.append(text.strip()[:2000])
 
     return list(set(chunks))
 
-def semantic_filter(chunks, query):
+async def semantic_filter(chunks, query, embedder=None, model_name=None):
+    # Chunk and query vectors are cached on disk by (model name, text hash) and, while
+    # run_partial_frontend runs, batched across rows
+    embedder, model_name = (embedder, model_name) if embedder is not None else (model, EMBEDDING_MODEL)
     try:
         if not chunks:
             return []
-        chunk_embeddings = model.encode(chunks, show_progress_bar=False)
-        query_embedding = model.encode([query], show_progress_bar=False)
+        batcher = embedding_batcher.get(model_name)
+        if batcher is not None:
+            chunk_embeddings = await batcher.encode(chunks)
+            query_embedding = [await batcher.encode_query(query)]
+        else:
+            chunk_embeddings = embedding_cache.encode(embedder, chunks, model_name)
+            query_embedding = [embedding_cache.encode_query(embedder, query, model_name)]
         similarities = cosine_similarity(query_embedding, chunk_embeddings)[0]
         return [(chunk, sim) for chunk, sim in zip(chunks, similarities) if sim > 0.1]
     except Exception as e:
         logging.error(f"Semantic filtering failed: {e}")
         return []
 
-def justify_relevance(chunk, company, keyword, score, threshold, is_news=False, is_course=False):
-    chunk_lower = chunk.lower()
+def justify_relevance(chunk, company, keyword, score, threshold, is_news=False, is_course=False, language="en"):
+    chunk_lower = term_view(chunk, language)
     matched = [t for t in all_terms if t in chunk_lower]
 
     usage_matches = [t for t in matched if t in usageBase]
@@ -228,7 +235,21 @@ def justify_relevance(chunk, company, keyword, score, threshold, is_news=False,
 
     return relevance_status, level, explanation
 
-async def fetch_page_content(playwright, url):
+# PDFs stop being read once the keyword and, when ACRONYM_MAP has one, its expansion have both
+# appeared; the wrong-expansion check downstream must see the expansion if the document has it.
+def pdf_stop_condition(keyword):
+    if not keyword:
+        return None
+    missing = {keyword}
+    if ACRONYM_MAP.get(keyword.lower()):
+        missing.add(ACRONYM_MAP[keyword.lower()])
+
+    def found(number, page_text):
+        missing.difference_update([term for term in missing if contains_whole_word(page_text, term)])
+        return not missing
+    return found
+
+async def fetch_page_content(playwright, url, keyword=None):
     if url.lower().endswith(".pdf"):
         async with httpx.AsyncClient(timeout=20, verify=False) as client:
             try:
@@ -236,7 +257,10 @@ async def fetch_page_content(playwright, url):
                 r.raise_for_status()
                 if r.content[:4] != b"%PDF":
                     return "", "invalid_pdf"
-                return pdf_extract_text(BytesIO(r.content)), "pdf"
+                # Pages are extracted in parallel and reading stops shortly after the keyword (and its expansion)
+                pages, _ = await extract_pool.pdf_pages_until(r.content, pdf_stop_condition(keyword),
+                                                              extra_pages=PDF_CONTEXT_PAGES, backend=PDF_TEXT_BACKEND)
+                return join_pages(pages), "pdf"
             except httpx.RequestError as e:
                 logging.error(f"HTTP error fetching PDF {url}: {e}")
                 return "", "load_failed_http"
@@ -260,20 +284,22 @@ async def fetch_page_content(playwright, url):
         return "", "load_failed_playwright"
     return html, "html"
 
-async def extract_text_from_images(website, keywords):
+def parse_page(doc):
+    """Visible text of a PageDocument from its soup, so the <img> list for OCR reuses the same parse."""
+    doc.soup
+    return doc.text
+
+async def extract_text_from_images(website, keywords, doc=None):
     ocr_results = {}
     try:
         async with httpx.AsyncClient(timeout=15, verify=False) as client:
-            r = await client.get(website)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.text, 'html.parser')
+            if doc is None:
+                r = await client.get(website)
+                r.raise_for_status()
+                doc = PageDocument(r.content, url=website, content_type=r.headers.get("Content-Type", ""))
 
             img_tasks = []
-            for img_tag in soup.find_all("img"):
-                img_src = img_tag.get("src")
-                if not img_src:
-                    continue
-                img_url = urljoin(website, img_src)
+            for img_url in dict.fromkeys(img["src"] for img in doc.images):
                 img_tasks.append(process_single_image(client, img_url, keywords))
 
             results = await asyncio.gather(*img_tasks, return_exceptions=True)
@@ -290,8 +316,7 @@ async def process_single_image(client, img_url, keywords):
     try:
         img_resp = await client.get(img_url, timeout=10)
         img_resp.raise_for_status()
-        img = Image.open(BytesIO(img_resp.content))
-        text = pytesseract.image_to_string(img).strip()
+        text = await extract_pool.ocr_image(img_resp.content)
         found = [kw for kw in keywords if contains_whole_word(text, kw)]
         if found:
             return img_url, found
@@ -310,7 +335,7 @@ async def process_row(idx, row, playwright, st=None):
         st.info(f"Processing [{idx+1}]: {url}")
 
     is_news, is_course = is_news_or_course_site(url)
-    html_or_text, content_type = await fetch_page_content(playwright, url)
+    html_or_text, content_type = await fetch_page_content(playwright, url, keyword=keyword)
 
     if content_type.startswith("load_failed"):
         return [company, url, keyword, content_type, "NOT RELEVANT", "-", "LOW", f"Content loading failed: {content_type.replace('load_failed_', '')}.", "-"]
@@ -318,53 +343,89 @@ async def process_row(idx, row, playwright, st=None):
     if content_type == "invalid_pdf":
         return [company, url, keyword, content_type, "NOT RELEVANT", "-", "LOW", "Invalid PDF file detected.", "-"]
 
-    text = html_or_text if content_type == "pdf" else BeautifulSoup(html_or_text, 'html.parser').get_text(separator=' ', strip=True)
-    text = await translate_if_needed(text)
+    # Parsed once, off the event loop; the image OCR step reuses the same soup instead of parsing again
+    doc = None if content_type == "pdf" else PageDocument(html_or_text, url=url, backend=HTML_TEXT_BACKEND)
+    text = html_or_text if doc is None else await asyncio.to_thread(parse_page, doc)
+    language = detect_language(text)  # local; only keyword chunks of non-English pages get translated
 
     correct_expansion = ACRONYM_MAP.get(keyword.lower())
     if correct_expansion and has_wrong_expansion(text, keyword, correct_expansion):
         return [company, url, keyword, content_type, "NOT RELEVANT", "-", "LOW", f"Wrong expansion of keyword '{keyword}' found (expected '{correct_expansion}').", "-"]
 
-    ocr_results = await extract_text_from_images(url, [keyword] + list(ACRONYM_MAP.keys()))
+    ocr_results = await extract_text_from_images(url, [keyword] + list(ACRONYM_MAP.keys()), doc=doc)
     ocr_summary = "; ".join([f"{k}: {', '.join(v)}" for k, v in ocr_results.items()]) if ocr_results else "-"
 
-    chunks = split_chunks(text, keyword)
+    direct = multilingual.can_score_directly(language)
+    if language == "en":
+        chunks = split_chunks(text, keyword)
+    elif direct:
+        # multilingual mode: score the original chunks, no translation round trip
+        chunks = [c for c in split_chunks(text, keyword, require_terms=False) if any(t in term_view(c, language) for t in all_terms)]
+    else:
+        chunks = await translate_chunks(split_chunks(text, keyword, require_terms=False), source=language)
+        chunks = [c for c in chunks if any(t in c.lower() for t in all_terms)]
     if not chunks:
         return [company, url, keyword, content_type, "NOT RELEVANT", "-", "LOW", "No relevant text chunks found around keyword or no general terms.", ocr_summary]
 
     query = f"What is the relationship between {company} and {keyword}?"
-    rel_chunks = semantic_filter(chunks, query)
+    if direct:
+        rel_chunks = await semantic_filter(chunks, query, multilingual.get_model(), multilingual.MULTILINGUAL_MODEL)
+    else:
+        rel_chunks = await semantic_filter(chunks, query)
     if not rel_chunks:
         return [company, url, keyword, content_type, "NOT RELEVANT", "-", "LOW", "No semantically relevant chunks found after filtering.", ocr_summary]
 
     top_chunk, score = max(rel_chunks, key=lambda x: x[1])
-    relevance, level, explanation = justify_relevance(top_chunk, company, keyword, score, threshold=0.4, is_news=is_news, is_course=is_course)
+    relevance, level, explanation = justify_relevance(top_chunk, company, keyword, score, threshold=0.4, is_news=is_news, is_course=is_course,
+                                                      language=language if direct else "en")
 
     if ocr_results and relevance == "NOT RELEVANT":
         explanation += f" (Note: OCR detected keywords in images: {ocr_summary})"
+    if content_type == "pdf" and keyword and (pages := page_numbers_for(text, keyword)):
+        explanation += f" (PDF page(s): {', '.join(map(str, pages[:10]))})"
 
     return [company, url, keyword, content_type, relevance, top_chunk, level, explanation, ocr_summary]
 
-async def run_partial_frontend(input_filepath, output_filepath, st=None, single_row=None):
+async def run_partial_frontend(input_filepath, output_filepath, st=None, single_row=None, concurrency=ROW_CONCURRENCY):
     if single_row is not None:
         df = pd.DataFrame([single_row])
     else:
         df = pd.read_excel(input_filepath)
 
-    results = []
-    async with async_playwright() as playwright:
-        for idx, row in df.iterrows():
+    results = [None] * len(df)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    columns = [
+        "Company", "Link", "Keyword", "Content Type",
+        "Relevant or Not", "Chunk", "Score Level", "Explanation", "OCR Keywords & Image Links"
+    ]
+
+    async def run_row(pos, idx, row, playwright):
+        async with semaphore:
             if st and getattr(st.session_state, "stop_requested", False):
-                if st:
-                    st.warning("Stop requested. Exiting early.")
-                break
-            result = await process_row(idx, row, playwright, st)
-            results.append(result)
-
-            df_out = pd.DataFrame(results, columns=[
-                "Company", "Link", "Keyword", "Content Type",
-                "Relevant or Not", "Chunk", "Score Level", "Explanation", "OCR Keywords & Image Links"
-            ])
-            df_out.to_csv(output_filepath, index=False)
+                return
+            try:
+                results[pos] = await process_row(idx, row, playwright, st)
+            except Exception as e:
+                # One bad row must not take the shared batcher and browser down with it
+                logging.exception(f"Error processing row {idx}: {e}")
+                results[pos] = [normalize_company_name(str(row.get('Company Name', '')).strip()),
+                                ensure_https(str(row.get('URL', '')).strip()), str(row.get('Technology', '')).strip(),
+                                "error", "NOT RELEVANT", "-", "LOW", f"Processing exception: {e}", "-"]
+        df_out = pd.DataFrame([r for r in results if r is not None], columns=columns)
+        df_out.to_csv(output_filepath, index=False)
+
+    # Concurrent rows share one embedding batcher instead of encoding a few chunks each
+    embedding_batcher.start(model, EMBEDDING_MODEL)
+    if multilingual.multilingual_enabled():
+        embedding_batcher.start(multilingual.get_model(), multilingual.MULTILINGUAL_MODEL)
+    try:
+        async with async_playwright() as playwright:
+            await asyncio.gather(*(run_row(pos, idx, row, playwright) for pos, (idx, row) in enumerate(df.iterrows())))
+    finally:
+        await embedding_batcher.stop_all()
+        # dash.py imports this module and Streamlit reruns it: do not leave pool workers behind
+        extract_pool.shutdown()
+    if st and getattr(st.session_state, "stop_requested", False):
+        st.warning("Stop requested. Exiting early.")
 
     return output_filepath
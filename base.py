@@ -1,22 +1,18 @@
 import asyncio
 import json
-from io import BytesIO
 from pathlib import Path
 from urllib.parse import quote, urlparse
 import aiofiles
 import aiohttp
 from bs4 import BeautifulSoup
-from docx import Document
 import re
 from datetime import datetime
 from playwright.async_api import async_playwright
 import ssl
-from tempfile import NamedTemporaryFile
-import pikepdf
-from pdfminer.high_level import extract_text as pdfminer_extract_text
-import openpyxl
 import os
 from dotenv import load_dotenv
+from extractors import LIMITS, extract_document, read_body, read_head, sniff_kind
+from html_stream import STREAM_MAX_TEXT_CHARS, stream_response_text
 load_dotenv()
 
 NOW = datetime.now()
@@ -104,41 +100,33 @@ async def delay(seconds):
     await asyncio.sleep(seconds)
 
 
-def extract_text_from_xlsx(data):
-    text_parts = []
-    with NamedTemporaryFile(delete=True, suffix=".xlsx") as tmp:
-        tmp.write(data)
-        tmp.flush()
-        wb = openpyxl.load_workbook(tmp.name, read_only=True)
-        for sheet in wb.worksheets:
-            for row in sheet.iter_rows(values_only=True):
-                text_parts.append(' '.join(str(cell) for cell in row if cell))
-    return '\n'.join(text_parts)
-
 async def fetch_text(session, url):
     try:
         async with session.get(url, timeout=20, ssl=ssl_context) as resp:
             content_type = resp.headers.get('content-type', '')
-            data = await resp.read()
-
-            if 'pdf' in content_type or url.endswith(".pdf"):
-                with NamedTemporaryFile(delete=True, suffix=".pdf") as tmp:
-                    tmp.write(data)
-                    tmp.flush()
-                    with pikepdf.open(tmp.name) as pdf:
-                        pdf.save(tmp.name)
-                    text = pdfminer_extract_text(tmp.name)
-                    return text
-
-            if 'word' in content_type or url.endswith(".docx"):
-                doc = Document(BytesIO(data))
-                return '\n'.join(p.text for p in doc.paragraphs)
-
-            if 'excel' in content_type or url.endswith(".xlsx"):
-                return extract_text_from_xlsx(data)
-
-            soup = BeautifulSoup(data, 'html.parser')
-            return soup.get_text()
+            # Route on the body's magic bytes, not on the header or URL suffix
+            head = await read_head(resp)
+            kind = sniff_kind(head, content_type, url)
+
+            if kind == 'html':
+                # HTML is tokenized as it downloads, so 50 MB inline-JSON pages never sit in memory whole
+                extracted = await asyncio.wait_for(
+                    stream_response_text(resp, base_url=url, prefix=head), LIMITS['html'].timeout)
+                if extracted.truncated:
+                    print(f"✂️ Text of {url} truncated at {STREAM_MAX_TEXT_CHARS} chars")
+                return extracted.text
+
+            # docx and xlsx are both zips; which one is only known once the whole body is in
+            limit = LIMITS.get('xlsx' if kind == 'zip' else kind)
+            data = await read_body(resp, limit.max_bytes, prefix=head) if limit else None
+            if data is None:
+                print(f"Skipping {url}: {kind} body unsupported or too large")
+                return None
+
+            text, kind = await extract_document(data, content_type, url)
+            if text is None:
+                print(f"Skipping {url}: {kind}")
+            return text
     except Exception as e:
         print(f"Failed to fetch {url}: {e}")
         return None
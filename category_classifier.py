@@ -0,0 +1,185 @@
+import argparse
+import glob
+import logging
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Versioned artifacts (category_classifier_v<N>.joblib) are written here; the highest version is loaded.
+CLASSIFIER_DIR = os.getenv("CLASSIFIER_DIR", "models")
+# Pins one artifact file instead of the latest version in CLASSIFIER_DIR.
+CLASSIFIER_ARTIFACT = os.getenv("CLASSIFIER_ARTIFACT", "")
+ARTIFACT_PREFIX = "category_classifier_v"
+TEXT_COLUMN = "Chunk"
+LABEL_COLUMN = "Predicted Category"
+MISSING_LABELS = {"", "-", "nan", "none"}
+MIN_EVAL_ROWS = 100  # below this many labelled rows no hold-out report is printed
+
+
+def build_pipeline():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+    return make_pipeline(TfidfVectorizer(max_features=50000, stop_words="english", ngram_range=(1, 2),
+                                         sublinear_tf=True),
+                         MultinomialNB())
+
+
+def seed_pipeline():
+    """The six-sentence model try.py used to fit on every start; only used when no artifact exists."""
+    seed_docs = [
+        "Company X partners with AWS to offer cloud solutions",
+        "We are hiring software engineers and devops",
+        "Read our latest blog about productivity and best practices",
+        "Company Y integrates with Google Cloud Platform for storage",
+        "Join our team - open positions in marketing and engineering",
+        "Announcement: new product launch and solution brief"
+    ]
+    seed_labels = ["partnership", "hiring", "blog", "partnership", "hiring", "partnership"]
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import make_pipeline
+    pipeline = make_pipeline(TfidfVectorizer(max_features=5000, stop_words="english"), MultinomialNB())
+    return pipeline.fit(seed_docs, seed_labels)
+
+
+def artifact_versions(directory=CLASSIFIER_DIR):
+    """{version: path} of the artifacts in `directory`."""
+    versions = {}
+    for path in glob.glob(os.path.join(directory, f"{ARTIFACT_PREFIX}*.joblib")):
+        match = re.search(rf"{ARTIFACT_PREFIX}(\d+)\.joblib$", path)
+        if match:
+            versions[int(match.group(1))] = path
+    return versions
+
+
+def latest_artifact(directory=CLASSIFIER_DIR):
+    if CLASSIFIER_ARTIFACT:
+        return CLASSIFIER_ARTIFACT
+    versions = artifact_versions(directory)
+    return versions[max(versions)] if versions else None
+
+
+def load_artifact(path):
+    import joblib
+    return joblib.load(path)
+
+
+def load_pipeline():
+    """Fitted pipeline (predict(texts) -> labels) and a short description of where it came from."""
+    path = latest_artifact()
+    if path and os.path.exists(path):
+        artifact = load_artifact(path)
+        return artifact["pipeline"], f"v{artifact['version']} ({artifact['samples']} samples, {path})"
+    if path:
+        logger.warning(f"Classifier artifact {path} not found")
+    logger.warning("No trained category classifier; using the seed model (run: python category_classifier.py train ...)")
+    return seed_pipeline(), "seed"
+
+
+def load_labelled(paths, text_column=TEXT_COLUMN, label_column=LABEL_COLUMN):
+    """(texts, labels) from QC'd output CSVs; rows without a chunk or label are skipped, duplicates keep the last label."""
+    frames = []
+    for path in paths:
+        df = pd.read_excel(path) if path.lower().endswith((".xls", ".xlsx")) else pd.read_csv(path)
+        df = df.rename(columns={c: c.strip() for c in df.columns})
+        if text_column not in df.columns or label_column not in df.columns:
+            logger.warning(f"{path}: no {text_column!r} / {label_column!r} columns, skipped")
+            continue
+        frames.append(df[[text_column, label_column]].astype(str))
+    if not frames:
+        return [], []
+    df = pd.concat(frames, ignore_index=True)
+    df[text_column] = df[text_column].str.strip()
+    df[label_column] = df[label_column].str.strip()
+    df = df[~df[text_column].str.lower().isin(MISSING_LABELS) & ~df[label_column].str.lower().isin(MISSING_LABELS)]
+    df = df.drop_duplicates(subset=[text_column], keep="last")
+    return df[text_column].tolist(), df[label_column].tolist()
+
+
+def evaluate(texts, labels):
+    """Hold-out report on a stratified 20% split, when there is enough data for one."""
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+    counts = pd.Series(labels).value_counts()
+    if len(texts) < MIN_EVAL_ROWS or len(counts) < 2 or counts.min() < 2:
+        logger.info("Too few labelled rows per category for a hold-out report")
+        return None
+    train_x, test_x, train_y, test_y = train_test_split(texts, labels, test_size=0.2, stratify=labels, random_state=0)
+    pipeline = build_pipeline().fit(train_x, train_y)
+    report = classification_report(test_y, pipeline.predict(test_x), zero_division=0)
+    print(report)
+    return report
+
+
+def train(paths, directory=CLASSIFIER_DIR, text_column=TEXT_COLUMN, label_column=LABEL_COLUMN):
+    """Fits the pipeline on every labelled row and saves it as the next artifact version; returns its path."""
+    import joblib
+    import sklearn
+    texts, labels = load_labelled(paths, text_column, label_column)
+    if len(set(labels)) < 2:
+        raise ValueError(f"Need labelled rows of at least two categories, found {sorted(set(labels))}")
+    logger.info(f"{len(texts)} labelled chunks, categories: {pd.Series(labels).value_counts().to_dict()}")
+    report = evaluate(texts, labels)
+
+    start = time.perf_counter()
+    pipeline = build_pipeline().fit(texts, labels)
+    logger.info(f"Fitted in {time.perf_counter() - start:.1f}s")
+
+    os.makedirs(directory, exist_ok=True)
+    version = max(artifact_versions(directory), default=0) + 1
+    path = os.path.join(directory, f"{ARTIFACT_PREFIX}{version}.joblib")
+    joblib.dump({
+        "pipeline": pipeline,
+        "version": version,
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "samples": len(texts),
+        "labels": sorted(set(labels)),
+        "label_column": label_column,
+        "sources": [os.path.abspath(p) for p in paths],
+        "sklearn": sklearn.__version__,
+        "holdout_report": report,
+    }, path)
+    logger.info(f"Saved category classifier v{version} to {path}")
+    return path
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s — %(levelname)s — %(message)s")
+    parser = argparse.ArgumentParser(description="Train and inspect the page category classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("train", help="Fit on QC'd output CSVs and save the next artifact version")
+    fit.add_argument("inputs", nargs="+", help="Labelled output files (.csv/.xlsx) or glob patterns")
+    fit.add_argument("--text-column", default=TEXT_COLUMN)
+    fit.add_argument("--label-column", default=LABEL_COLUMN)
+    fit.add_argument("--dir", default=CLASSIFIER_DIR, help="Artifact directory")
+
+    info = sub.add_parser("info", help="Show the saved artifact versions")
+    info.add_argument("--dir", default=CLASSIFIER_DIR, help="Artifact directory")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "train":
+            paths = sorted({p for pattern in args.inputs for p in (glob.glob(pattern) or [pattern])})
+            train(paths, args.dir, text_column=args.text_column, label_column=args.label_column)
+        else:
+            versions = artifact_versions(args.dir)
+            if not versions:
+                print(f"No artifacts in {args.dir}")
+            for version, path in sorted(versions.items()):
+                artifact = load_artifact(path)
+                print(f"v{version}  {artifact['trained_at']}  {artifact['samples']} samples  "
+                      f"labels={', '.join(artifact['labels'])}  {path}")
+    except Exception as e:
+        logger.exception(f"Fatal error: {e}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,8 +68,8 @@ def parse_date(text):
                 continue
     return None
 
-async def fetch_date_from_html(content):
-    soup = BeautifulSoup(content, 'html.parser')
+async def fetch_date_from_html(soup):
+    """(date, source) from a page already parsed by the caller."""
 
     for selector in [
         '.local-date', '.pr-date', 'time',
@@ -168,9 +168,11 @@ async def process_url(url, page, company_name, domain, all_keywords, found_entri
         return
 
     src = 'own' if domain in urlparse(url).netloc else '3rd-party'
-    text = BeautifulSoup(content, 'html.parser').get_text(" ", strip=True)
+    # One parse per page: the keyword text and the date lookup share the soup
+    soup = BeautifulSoup(content, 'html.parser')
+    text = soup.get_text(" ", strip=True)
 
-    date, date_src = await fetch_date_from_html(content)
+    date, date_src = await fetch_date_from_html(soup)
 
     for kw in ["android"] + all_keywords:
         if re.search(r'\b' + re.escape(kw.lower()) + r'\b', text.lower()):
@@ -2,10 +2,9 @@ import re
 import csv
 from datetime import datetime
 from pathlib import Path
-from io import BytesIO
 import requests
 from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
+from pdf_text import iter_pdf_pages, open_pdf_reader
 import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -70,17 +69,17 @@ def fetch_page_content(url):
 
 def extract_date_from_pdf(content):
     try:
-        pdf = PdfReader(BytesIO(content))
+        pdf = open_pdf_reader(content)
         info = pdf.metadata
         for attr in ['/ModDate', '/CreationDate']:
             if attr in info and info[attr]:
                 if (d := parse_date(info[attr])):
                     return d, "pdf_metadata"
         # fallback: text
-        for page in pdf.pages:
-            txt = page.extract_text() or ''
+        # Page by page, so the first dated page ends the extraction
+        for number, txt in iter_pdf_pages(content):
             if (d := parse_date(txt)):
-                return d, "pdf_text"
+                return d, f"pdf_text (page {number})"
     except Exception as e:
         print(f"❌ PDF error: {e}")
     return None, "pdf_no_date"
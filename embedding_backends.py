@@ -0,0 +1,81 @@
+import logging
+import os
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# "torch" (all-mpnet-base-v2, fp32), "minilm" (all-MiniLM-L6-v2, fp32), "onnx" (mpnet on
+# ONNX Runtime) or "onnx-int8" (mpnet, dynamically quantized to int8 for ONNX Runtime).
+# embedding_benchmark.py compares them against "torch" before a pipeline switches.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Where ONNX exports and int8 quantizations are written once and reused.
+EMBEDDING_EXPORT_DIR = os.getenv("EMBEDDING_EXPORT_DIR", "models")
+# onnxruntime quantization preset: "avx512_vnni", "avx512", "avx2" or "arm64".
+EMBEDDING_QUANT_CONFIG = os.getenv("EMBEDDING_QUANT_CONFIG", "avx2")
+
+Backend = namedtuple("Backend", ["model", "runtime", "quantized"])
+EMBEDDING_BACKENDS = {
+    "torch": Backend("all-mpnet-base-v2", "torch", False),
+    "minilm": Backend("all-MiniLM-L6-v2", "torch", False),
+    "onnx": Backend("all-mpnet-base-v2", "onnx", False),
+    "onnx-int8": Backend("all-mpnet-base-v2", "onnx", True),
+}
+
+
+def resolve(backend=None):
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r} (expected one of {tuple(EMBEDDING_BACKENDS)})")
+    return backend
+
+
+def embedding_model_name(backend=None):
+    """
+    Name the vectors of a backend are cached under. Backends of the same model share
+    it only when they produce the same vectors (fp32 torch and fp32 ONNX do; int8 does not).
+    """
+    backend = resolve(backend)
+    spec = EMBEDDING_BACKENDS[backend]
+    return f"{spec.model}@int8" if spec.quantized else spec.model
+
+
+def _export_dir(model_name):
+    return os.path.join(EMBEDDING_EXPORT_DIR, f"{model_name}-onnx")
+
+
+def _load_quantized(model_name):
+    from sentence_transformers import SentenceTransformer
+    local = _export_dir(model_name)
+    file_name = f"onnx/model_qint8_{EMBEDDING_QUANT_CONFIG}.onnx"
+    if not os.path.exists(os.path.join(local, file_name)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        logger.info(f"Exporting {model_name} to ONNX and quantizing ({EMBEDDING_QUANT_CONFIG}) into {local}")
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save_pretrained(local)
+        export_dynamic_quantized_onnx_model(model, EMBEDDING_QUANT_CONFIG, local)
+    return SentenceTransformer(local, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def load_embedding_model(backend=None):
+    """SentenceTransformer for the selected backend, on CPU."""
+    from sentence_transformers import SentenceTransformer
+    backend = resolve(backend)
+    spec = EMBEDDING_BACKENDS[backend]
+    logger.info(f"Loading embedding model {spec.model} ({backend})")
+    if spec.runtime == "onnx":
+        if spec.quantized:
+            return _load_quantized(spec.model)
+        return SentenceTransformer(spec.model, device="cpu", backend="onnx")
+    # safetensors weights are memory-mapped rather than read into a second buffer
+    return SentenceTransformer(spec.model, device="cpu", model_kwargs={"low_cpu_mem_usage": True})
+
+
+def available_backends():
+    found = ["torch", "minilm"]
+    try:
+        import onnxruntime
+        import optimum
+        found += ["onnx", "onnx-int8"]
+    except ImportError:
+        pass
+    return found
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+# Texts gathered into one encode() call, and how long the first request waits for company.
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", 256))
+EMBED_MAX_WAIT = float(os.getenv("EMBED_MAX_WAIT", 0.02))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+
+_batchers = {}
+
+
+class EmbeddingBatcher:
+    """
+    Collects texts from concurrent rows and embeds them in large, length-sorted
+    batches on a worker thread, so the model sees a few big calls instead of one
+    tiny call per row. Cached vectors (embedding_cache) never enter the queue.
+
+        batcher = EmbeddingBatcher(model, "all-mpnet-base-v2")
+        vectors = await batcher.encode(chunks)
+        ...
+        await batcher.close()
+    """
+
+    def __init__(self, model, model_name, max_batch=EMBED_MAX_BATCH, max_wait=EMBED_MAX_WAIT,
+                 batch_size=EMBED_BATCH_SIZE):
+        self.model = model
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_size = batch_size
+        self.batches = self.texts = 0
+        self.seconds = 0.0
+        self._queries = {}
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    def _lengths(self, texts):
+        """Token counts when the model exposes its tokenizer, character counts otherwise."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            try:
+                return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+            except Exception:
+                pass
+        return [len(t) for t in texts]
+
+    async def _collect(self):
+        """One queued request, plus whatever else arrives within max_wait (up to max_batch texts)."""
+        requests = [await self._queue.get()]
+        if requests[0] is None:
+            return requests
+        size = len(requests[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            requests.append(request)
+            if request is None:
+                break
+            size += len(request[0])
+        return requests
+
+    def _encode(self, keys, texts):
+        # Sorted by length so each sub-batch pads to similar sizes; the cache stores by key.
+        order = np.argsort(self._lengths(texts))
+        vectors = self.model.encode([texts[i] for i in order], batch_size=self.batch_size, show_progress_bar=False)
+        return embedding_cache.get_cache().put_many(self.model_name, [(keys[i], v) for i, v in zip(order, vectors)])
+
+    async def _run(self):
+        while True:
+            requests = await self._collect()
+            if any(r is None for r in requests):
+                for request in requests:
+                    if request is not None:
+                        request[1].set_exception(RuntimeError("Embedding batcher closed"))
+                return
+            todo = {}
+            for pending, _ in requests:
+                todo.update(pending)
+            start = time.perf_counter()
+            try:
+                stored = await asyncio.to_thread(self._encode, list(todo), list(todo.values()))
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.seconds += time.perf_counter() - start
+            self.batches += 1
+            self.texts += len(todo)
+            for _, future in requests:
+                if not future.done():
+                    future.set_result(stored)
+
+    async def encode(self, texts):
+        """Float32 vectors for `texts` in input order (cache hits are answered without queueing)."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        cache = embedding_cache.get_cache()
+        keys = [embedding_cache.text_key(t) for t in texts]
+        found = cache.get_many(self.model_name, list(dict.fromkeys(keys)))
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = embedding_cache.normalize(text)
+        cache.hits += len(keys) - len(pending)
+        cache.misses += len(pending)
+        if pending:
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((pending, future))
+            stored = await future
+            found.update((key, stored[key]) for key in pending)
+        return np.vstack([found[key] for key in keys])
+
+    async def encode_query(self, query):
+        if query not in self._queries:
+            self._queries[query] = (await self.encode([query]))[0]
+        return self._queries[query]
+
+    async def close(self):
+        await self._queue.put(None)
+        try:
+            await self._worker
+        except Exception:
+            pass
+        if self.batches:
+            logger.info(f"Embedding batcher {self.model_name}: {self.texts} texts in {self.batches} batches, "
+                        f"{self.texts / max(self.seconds, 1e-9):.1f} texts/s")
+
+
+def start(model, model_name, **kwargs):
+    """Register a batcher for `model_name` on the running loop (reused if already started)."""
+    if model_name not in _batchers:
+        _batchers[model_name] = EmbeddingBatcher(model, model_name, **kwargs)
+    return _batchers[model_name]
+
+
+def get(model_name):
+    return _batchers.get(model_name)
+
+
+async def stop_all():
+    while _batchers:
+        _, batcher = _batchers.popitem()
+        await batcher.close()
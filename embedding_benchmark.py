@@ -0,0 +1,118 @@
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from embedding_backends import available_backends, load_embedding_model
+
+REFERENCE_BACKEND = "torch"
+RELEVANT = "RELEVANT"
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend, texts, batch_size):
+    """Runs in a freshly spawned process so load time and RSS belong to this backend alone."""
+    base_rss = _rss_mb()
+    start = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_s = time.perf_counter() - start
+    model.encode(texts[:8], show_progress_bar=False)  # warm-up
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, show_progress_bar=False, normalize_embeddings=True)
+    encode_s = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "chunks_per_s": len(texts) / encode_s if encode_s else float("nan"),
+        "rss_mb": _rss_mb() - base_rss,
+    }, np.asarray(vectors, dtype=np.float32)
+
+
+def _label(value):
+    value = str(value).strip().upper()
+    return RELEVANT if value in ("RELEVANT", "1", "TRUE", "YES") else "NOT RELEVANT"
+
+
+def decisions(rows, vectors, justify_relevance):
+    """RELEVANT/NOT RELEVANT per sample row, as backend.process_row decides it."""
+    out = []
+    for row in rows:
+        if not row["chunks"]:
+            out.append("NOT RELEVANT")
+            continue
+        sims = vectors[row["chunk_idx"]] @ vectors[row["query_idx"]]
+        scored = [(c, float(s)) for c, s in zip(row["chunks"], sims) if s > 0.1]
+        if not scored:
+            out.append("NOT RELEVANT")
+            continue
+        top_chunk, score = max(scored, key=lambda x: x[1])
+        relevance, _, _ = justify_relevance(top_chunk, row["company"], row["keyword"], score, threshold=0.4)
+        out.append(relevance)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed, memory and decision agreement of the embedding backends")
+    parser.add_argument("sample", help="CSV with text, company, keyword and label (RELEVANT/NOT RELEVANT or 1/0)")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to run (default: all installed)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", default=None, help="Optional CSV with per-row decisions")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.sample)
+    missing = {"text", "company", "keyword", "label"} - set(df.columns)
+    if missing:
+        print(f"Sample is missing columns: {', '.join(sorted(missing))}")
+        sys.exit(2)
+
+    # Chunking and the decision rules come from backend.py; only the embeddings differ per backend.
+    from backend import justify_relevance, split_chunks
+
+    texts, rows = [], []
+    for r in df.itertuples(index=False):
+        chunks = split_chunks(str(r.text), str(r.keyword))
+        query = f"What is the relationship between {r.company} and {r.keyword}?"
+        rows.append({"company": r.company, "keyword": r.keyword, "label": _label(r.label), "chunks": chunks,
+                     "chunk_idx": list(range(len(texts), len(texts) + len(chunks))),
+                     "query_idx": len(texts) + len(chunks)})
+        texts.extend(chunks + [query])
+
+    backends = args.backends or available_backends()
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    summary, results = [], pd.DataFrame({"company": [r["company"] for r in rows],
+                                         "keyword": [r["keyword"] for r in rows],
+                                         "label": [r["label"] for r in rows]})
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            stats, vectors = pool.submit(run_backend, backend, texts, args.batch_size).result()
+        results[backend] = decisions(rows, vectors, justify_relevance)
+        summary.append(stats)
+
+    for stats in summary:
+        backend = stats["backend"]
+        stats["accuracy"] = (results[backend] == results["label"]).mean()
+        stats[f"agreement_vs_{REFERENCE_BACKEND}"] = (results[backend] == results[REFERENCE_BACKEND]).mean()
+
+    print(f"{len(rows)} rows, {len(texts)} texts embedded per backend\n")
+    print(pd.DataFrame(summary).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nPer-row decisions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", "embedding_cache.sqlite")
+# Vectors kept in memory (float32) in front of the sqlite store.
+EMBEDDING_LRU_SIZE = int(os.getenv("EMBEDDING_LRU_SIZE", 20_000))
+
+_WS_RE = re.compile(r"\s+")
+_cache = None
+
+
+def normalize(text):
+    return _WS_RE.sub(" ", text or "").strip()
+
+
+def text_key(text):
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by (model name, hash of the whitespace-normalized text).
+    Stored as float16 blobs in sqlite, with an in-memory LRU of float32 vectors.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_DB, lru_size=EMBEDDING_LRU_SIZE):
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (model TEXT, key TEXT, dim INTEGER, vec BLOB, PRIMARY KEY (model, key))"
+        )
+        self._conn.commit()
+        self.hits = self.misses = 0
+
+    def _remember(self, lru_key, vec):
+        self._lru[lru_key] = vec
+        self._lru.move_to_end(lru_key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, model_name, keys):
+        """{key: vector} for the keys already stored; LRU first, then one sqlite query."""
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                vec = self._lru.get((model_name, key))
+                if vec is not None:
+                    self._lru.move_to_end((model_name, key))
+                    found[key] = vec
+                else:
+                    missing.append(key)
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                    [model_name, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    vec = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                    found[key] = vec
+                    self._remember((model_name, key), vec)
+        return found
+
+    def put_many(self, model_name, items):
+        """
+        items: [(key, vector), ...]. Returns {key: vector} as stored (float16
+        precision), so a fresh result scores the same as a later cache hit.
+        """
+        stored = {}
+        with self._lock:
+            rows = []
+            for key, vec in items:
+                half = np.asarray(vec, dtype=np.float16)
+                stored[key] = half.astype(np.float32)
+                self._remember((model_name, key), stored[key])
+                rows.append((model_name, key, half.shape[-1], half.tobytes()))
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return stored
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
+
+
+def encode(model, texts, model_name, batch_size=32):
+    """
+    model.encode(texts) through the cache: duplicates within the call and chunks
+    seen on earlier rows or runs are looked up, only new text reaches the model.
+    Returns a float32 array in input order.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    cache = get_cache()
+    keys = [text_key(t) for t in texts]
+    found = cache.get_many(model_name, list(dict.fromkeys(keys)))
+    todo = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in todo:
+            todo[key] = normalize(text)
+    cache.hits += len(keys) - len(todo)
+    cache.misses += len(todo)
+    if todo:
+        vectors = model.encode(list(todo.values()), batch_size=batch_size, show_progress_bar=False)
+        found.update(cache.put_many(model_name, zip(todo.keys(), np.asarray(vectors))))
+    return np.vstack([found[key] for key in keys])
+
+
+_queries = {}
+
+
+def encode_query(model, query, model_name):
+    """Query vector memoized per (model, query); one per company/keyword for the whole run."""
+    key = (model_name, query)
+    if key not in _queries:
+        _queries[key] = encode(model, [query], model_name)[0]
+    return _queries[key]
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import mmap
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from io import BytesIO
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for CPU-bound extraction; 0 runs it in a thread instead (still off the loop).
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+# Payloads above this size go to the worker as a memory-mapped spool file instead of being pickled.
+SPOOL_THRESHOLD = int(os.getenv("EXTRACT_SPOOL_THRESHOLD", 1 << 20))
+# PDF pages handed to one worker at a time; a few chunks run in parallel ahead of the reader.
+PDF_PAGE_CHUNK = int(os.getenv("PDF_PAGE_CHUNK", 8))
+
+_executor = None
+
+
+def _warm_imports():
+    # Pay the import cost once per worker instead of on its first job.
+    for module in ("trafilatura", "pdfminer.high_level", "pytesseract", "PIL.Image", "html_text", "pdf_text"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def get_executor():
+    global _executor
+    if _executor is None and EXTRACT_WORKERS > 0:
+        _executor = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, initializer=_warm_imports)
+        logger.info(f"Started extraction pool with {EXTRACT_WORKERS} workers")
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# --- payload hand-over ---
+
+def _to_payload(data):
+    """Small payloads travel inline; large ones are written once and mapped by the worker."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if len(data) <= SPOOL_THRESHOLD or EXTRACT_WORKERS <= 0:
+        return ("inline", data)
+    with tempfile.NamedTemporaryFile(prefix="extract_", suffix=".spool", delete=False) as f:
+        f.write(data)
+    return ("spool", f.name)
+
+
+def _release(payload):
+    if payload[0] == "spool":
+        try:
+            os.unlink(payload[1])
+        except OSError:
+            pass
+
+
+class _Opened:
+    """Context manager giving the worker a buffer (bytes or mmap) for a payload."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self._file = self._map = None
+
+    def __enter__(self):
+        kind, value = self.payload
+        if kind == "inline":
+            return value
+        self._file = open(value, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def __exit__(self, *exc):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+# --- worker functions (module level so they pickle) ---
+
+def _html_text_job(payload, use_trafilatura=True, backend=None):
+    from html_text import html_to_text
+    with _Opened(payload) as buf:
+        html = bytes(buf).decode("utf-8", errors="replace")
+    if use_trafilatura:
+        try:
+            import trafilatura
+            extracted = trafilatura.extract(html, include_comments=False, include_tables=False)
+            if extracted and extracted.strip():
+                return extracted
+        except Exception as e:
+            logger.debug(f"trafilatura extraction failed: {e}")
+    return html_to_text(html, backend=backend)
+
+
+def _pdf_count_job(payload, backend=None):
+    from pdf_text import pdf_page_count
+    with _Opened(payload) as buf:
+        return pdf_page_count(buf, backend)
+
+
+def _pdf_repair_job(payload):
+    from pdf_text import repair_pdf
+    with _Opened(payload) as buf:
+        return repair_pdf(buf)
+
+
+def _pdf_pages_job(payload, first, last, backend=None):
+    from pdf_text import iter_pdf_pages
+    with _Opened(payload) as buf:
+        # mmap is file-like, so the PDF parser reads pages straight from the mapping
+        return list(iter_pdf_pages(buf, first, last, backend))
+
+
+def _ocr_job(payload):
+    import pytesseract
+    from PIL import Image
+    with _Opened(payload) as buf:
+        img = Image.open(BytesIO(bytes(buf))).convert("RGB")
+    return pytesseract.image_to_string(img).strip()
+
+
+async def _run(job, data, *args):
+    payload = _to_payload(data)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_executor(), job, payload, *args)
+    finally:
+        _release(payload)
+
+
+async def html_text(html, use_trafilatura=True, backend=None):
+    """trafilatura main text with html_text fallback, computed in the pool."""
+    if not html:
+        return ""
+    return await _run(_html_text_job, html, use_trafilatura, backend)
+
+
+def _release_when_done(payload, futures):
+    """
+    Drop the spool file once chunks that could not be cancelled have finished with it.
+    `futures` are the pool's concurrent.futures.Future objects: unlike the asyncio
+    wrappers, their cancel() returns False once a worker has started the chunk.
+    """
+    running = [f for f in futures if not f.cancel()]
+    if not running:
+        _release(payload)
+        return
+    remaining = [len(running)]
+
+    def done(_):
+        remaining[0] -= 1
+        if not remaining[0]:
+            _release(payload)
+    for f in running:
+        f.add_done_callback(done)
+
+
+async def iter_pdf_pages(data, max_pages=None, chunk_size=PDF_PAGE_CHUNK, backend=None):
+    """
+    Yield (page_number, text) in page order while later chunks of pages are
+    extracted in parallel by the pool. Closing the generator early (see
+    pdf_pages_until) cancels the chunks nobody will read.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    payload = _to_payload(data)
+    pending = deque()  # (pool future, awaitable) per chunk, in page order
+
+    def submit(first, last):
+        if executor is None:  # no pool: thread fallback, payload is always inline
+            return None, loop.run_in_executor(None, _pdf_pages_job, payload, first, last, backend)
+        future = executor.submit(_pdf_pages_job, payload, first, last, backend)
+        return future, asyncio.wrap_future(future)
+
+    try:
+        try:
+            count = await loop.run_in_executor(executor, _pdf_count_job, payload, backend)
+        except Exception as e:
+            logger.info(f"PDF page tree unreadable ({e}), retrying after pikepdf repair")
+            repaired = await loop.run_in_executor(executor, _pdf_repair_job, payload)
+            _release(payload)
+            payload = _to_payload(repaired)
+            count = await loop.run_in_executor(executor, _pdf_count_job, payload, backend)
+        if max_pages:
+            count = min(count, max_pages)
+
+        chunks = iter([(first, min(first + chunk_size - 1, count)) for first in range(1, count + 1, chunk_size)])
+        for first, last in chunks:
+            pending.append(submit(first, last))
+            if len(pending) >= max(1, EXTRACT_WORKERS):
+                break
+        while pending:
+            pages = await pending.popleft()[1]
+            for first, last in chunks:
+                pending.append(submit(first, last))
+                break
+            for page in pages:
+                yield page
+    finally:
+        _release_when_done(payload, [future for future, _ in pending if future is not None])
+
+
+async def pdf_pages_until(data, predicate=None, max_pages=None, extra_pages=0, backend=None):
+    """
+    Extract pages until predicate(page_number, text) is true, plus `extra_pages`
+    following pages for context. Returns ([(page_number, text), ...], hit page or None).
+    """
+    pages, hit = [], None
+    async with aclosing(iter_pdf_pages(data, max_pages=max_pages, backend=backend)) as stream:
+        async for number, text in stream:
+            pages.append((number, text))
+            if hit is None and predicate and predicate(number, text):
+                hit = number
+            if hit is not None and number >= hit + extra_pages:
+                break
+    return pages, hit
+
+
+async def pdf_text(data, max_pages=None, backend=None):
+    """Text of an in-memory PDF, pages extracted in parallel by the pool."""
+    from pdf_text import join_pages
+    pages, _ = await pdf_pages_until(data, max_pages=max_pages, backend=backend)
+    return join_pages(pages)
+
+
+async def ocr_image(data):
+    """Tesseract text of image bytes, computed in the pool."""
+    return await _run(_ocr_job, data)
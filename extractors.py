@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import zipfile
+from collections import namedtuple
+from io import BytesIO
+
+import extract_pool
+from html_stream import stream_html_text
+from prefilter import decode_bytes
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 2048
+XLSX_MAX_CELLS = 200_000
+DOCX_MAX_PARAGRAPHS = 50_000
+PDF_MAX_PAGES = 500
+TEXT_MAX_CHARS = 2_000_000
+
+Limit = namedtuple("Limit", ["max_bytes", "timeout"])
+MB = 1024 * 1024
+# `timeout` only stops extract_document waiting: a thread (or a pool worker already on a
+# PDF chunk) keeps running its parse to the end. The work itself is bounded by the
+# caps above (pages, paragraphs, cells, chars); unstarted PDF chunks are cancelled.
+LIMITS = {
+    "pdf": Limit(100 * MB, 120),
+    "docx": Limit(50 * MB, 60),
+    "xlsx": Limit(50 * MB, 60),
+    "html": Limit(50 * MB, 60),
+    "text": Limit(20 * MB, 30),
+}
+
+# Leading bytes of formats that must never reach an HTML/text parser.
+BINARY_MAGIC = [
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"RIFF", b"\x1f\x8b", b"II*\x00", b"MM\x00*",
+    b"Rar!", b"7z\xbc\xaf", b"ID3", b"OggS", b"fLaC", b"wOFF", b"wOF2",
+]
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"   # legacy .doc/.xls
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<meta", b"<title", b"<div", b"<script")
+
+
+def sniff_kind(head, content_type="", url=""):
+    """
+    Classify a body from its first bytes: pdf, zip (docx/xlsx, resolved later),
+    ole, binary, html or text. Headers and URL suffixes only break ties for text.
+    """
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "zip"
+    if head.startswith(OLE_MAGIC):
+        return "ole"
+    if any(head.startswith(m) for m in BINARY_MAGIC):
+        return "binary"
+    stripped = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if any(marker in stripped[:SNIFF_BYTES] for marker in HTML_MARKERS):
+        return "html"
+    if b"\x00" in head and not head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "binary"
+    content_type = (content_type or "").lower()
+    if "html" in content_type or "xml" in content_type or url.lower().endswith((".htm", ".html")):
+        return "html"
+    return "text"
+
+
+def zip_kind(data):
+    """docx / xlsx from the OOXML part names, None for any other zip."""
+    try:
+        names = set(zipfile.ZipFile(BytesIO(data)).namelist())
+    except zipfile.BadZipFile:
+        return None
+    if "word/document.xml" in names:
+        return "docx"
+    if "xl/workbook.xml" in names:
+        return "xlsx"
+    return None
+
+
+def extract_docx(data, content_type="", max_paragraphs=DOCX_MAX_PARAGRAPHS):
+    """Body paragraphs of a .docx; stops after `max_paragraphs`."""
+    from docx import Document
+    from docx.oxml.ns import qn
+    from docx.text.paragraph import Paragraph
+    doc = Document(BytesIO(data))
+    lines = []
+    for element in doc.element.body.iterchildren(qn("w:p")):
+        if len(lines) >= max_paragraphs:
+            logger.info(f"Document truncated at {max_paragraphs} paragraphs")
+            break
+        lines.append(Paragraph(element, doc).text)
+    return "\n".join(lines)
+
+
+def extract_xlsx(data, content_type="", max_cells=XLSX_MAX_CELLS):
+    """Read-only workbook straight from memory; stops after `max_cells` non-empty cells."""
+    import openpyxl
+    wb = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    lines, cells = [], 0
+    try:
+        for sheet in wb.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                values = [str(cell) for cell in row if cell]
+                if not values:
+                    continue
+                lines.append(" ".join(values))
+                cells += len(values)
+                if cells >= max_cells:
+                    logger.info(f"Workbook truncated at {max_cells} cells")
+                    return "\n".join(lines)
+    finally:
+        wb.close()
+    return "\n".join(lines)
+
+
+def extract_html(data, content_type=""):
+    return stream_html_text(data, content_type=content_type).text
+
+
+def extract_plain(data, content_type=""):
+    return decode_bytes(data[:TEXT_MAX_CHARS * 4], content_type=content_type)[:TEXT_MAX_CHARS]
+
+
+EXTRACTORS = {
+    "docx": extract_docx,
+    "xlsx": extract_xlsx,
+    "html": extract_html,
+    "text": extract_plain,
+}
+
+
+async def extract_document(data, content_type="", url=""):
+    """
+    Route a downloaded body to its extractor by content, within the type's size
+    and time limits. Returns (text or None, kind); kind explains a None.
+    """
+    kind = sniff_kind(data[:SNIFF_BYTES], content_type, url)
+    if kind == "zip":
+        kind = zip_kind(data) or "zip"
+    limit = LIMITS.get(kind)
+    if limit is None:
+        logger.info(f"No extractor for {kind} body of {url or 'document'}")
+        return None, f"unsupported_{kind}"
+    if len(data) > limit.max_bytes:
+        logger.info(f"{url or 'document'}: {kind} of {len(data)} bytes exceeds {limit.max_bytes}")
+        return None, f"{kind}_too_large"
+
+    if kind == "pdf":
+        job = extract_pool.pdf_text(data, max_pages=PDF_MAX_PAGES)
+    else:
+        job = asyncio.to_thread(EXTRACTORS[kind], data, content_type)
+    try:
+        return await asyncio.wait_for(job, limit.timeout), kind
+    except asyncio.TimeoutError:
+        logger.info(f"{url or 'document'}: {kind} extraction exceeded {limit.timeout}s")
+        return None, f"{kind}_timeout"
+
+
+async def read_body(resp, max_bytes, prefix=b""):
+    """Rest of an aiohttp body, or None as soon as it grows past max_bytes."""
+    parts, size = [prefix], len(prefix)
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            return None
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+async def read_head(resp, n=SNIFF_BYTES):
+    """First n bytes of an aiohttp body (fewer if the body is shorter)."""
+    head = b""
+    while len(head) < n:
+        chunk = await resp.content.read(n - len(head))
+        if not chunk:
+            break
+        head += chunk
+    return head
@@ -0,0 +1,200 @@
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from html_text import STRIP_TAGS
+from prefilter import sniff_charset
+
+# Extracted text is capped per document; the rest of the page is not even parsed.
+STREAM_MAX_TEXT_CHARS = int(os.getenv("STREAM_MAX_TEXT_CHARS", 2_000_000))
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_LINKS = 5000
+MAX_IMAGES = 500
+
+SKIP_OPEN_RE = re.compile(r"<(%s)\b" % "|".join(STRIP_TAGS), re.I)
+DATA_URI_RE = re.compile(r"data:[\w.+-]+/[\w.+-]+[;,]", re.I)
+# A data: URI ends at the attribute quote, whitespace, ">" or a CSS ")".
+DATA_URI_END_RE = re.compile(r"[\"'\s>)]")
+# Longest token that can straddle two chunks: "<noscript" / "data:image/svg+xml;".
+CARRY = 64
+
+
+class _TextParser(HTMLParser):
+    def __init__(self, extractor):
+        super().__init__(convert_charrefs=True)
+        self.extractor = extractor
+
+    def handle_starttag(self, tag, attrs):
+        ex = self.extractor
+        if tag == "a" and len(ex.links) < MAX_LINKS:
+            href = dict(attrs).get("href")
+            if href:
+                ex.links.append(urljoin(ex.base_url, href.strip()) if ex.base_url else href.strip())
+        elif tag == "img" and len(ex.images) < MAX_IMAGES:
+            src = (dict(attrs).get("src") or "").strip()
+            if src and not src.startswith("data:"):
+                ex.images.append(urljoin(ex.base_url, src) if ex.base_url else src)
+
+    def handle_data(self, data):
+        self.extractor._add_text(data)
+
+
+class StreamingTextExtractor:
+    """
+    Incremental HTML -> text for very large pages. Script/style/noscript/template
+    bodies and data: URIs are dropped before they reach the tokenizer, so memory
+    stays proportional to the capped text, not the document. Feed str chunks
+    (or bytes via feed_bytes) and stop reading once `done` is True.
+
+        ex = StreamingTextExtractor(max_chars=1_000_000)
+        for chunk in chunks:
+            ex.feed(chunk)
+            if ex.done:
+                break
+        ex.close()
+        ex.text, ex.truncated, ex.links, ex.images
+    """
+
+    def __init__(self, max_chars=STREAM_MAX_TEXT_CHARS, base_url=None, encoding=None):
+        self.max_chars = max_chars
+        self.base_url = base_url
+        self.encoding = encoding
+        self.links = []
+        self.images = []
+        self.truncated = False
+        self._parts = []
+        self._chars = 0
+        self._pending = ""
+        self._skip_until = None     # closing tag we are discarding up to, e.g. "</script"
+        self._in_data_uri = False
+        self._decoder = None
+        self._parser = _TextParser(self)
+
+    @property
+    def done(self):
+        return self.truncated
+
+    @property
+    def text(self):
+        return " ".join(self._parts)
+
+    def _add_text(self, data):
+        if self.truncated:
+            return
+        data = data.strip()
+        if not data:
+            return
+        room = self.max_chars - self._chars
+        if len(data) > room:
+            data = data[:max(room, 0)]
+            self.truncated = True
+        if data:
+            self._parts.append(data)
+            self._chars += len(data) + 1
+
+    def feed_bytes(self, chunk, content_type=""):
+        if self._decoder is None:
+            charset = self.encoding or sniff_charset(chunk, content_type) or "utf-8"
+            try:
+                codecs.lookup(charset)
+            except LookupError:
+                charset = "utf-8"
+            self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        self.feed(self._decoder.decode(chunk))
+
+    def feed(self, chunk):
+        if self.truncated:
+            return
+        buf = self._pending + chunk
+        self._pending = ""
+        out = []
+        pos = 0
+        while pos < len(buf):
+            if self._skip_until:
+                end = buf.lower().find(self._skip_until, pos)
+                if end < 0:
+                    # Keep only enough tail to recognise a split closing tag.
+                    self._pending = buf[max(pos, len(buf) - len(self._skip_until)):]
+                    pos = len(buf)
+                    break
+                pos = end
+                self._skip_until = None
+                continue
+            if self._in_data_uri:
+                m = DATA_URI_END_RE.search(buf, pos)
+                if not m:
+                    pos = len(buf)
+                    break
+                pos = m.start()
+                self._in_data_uri = False
+                continue
+
+            skip = SKIP_OPEN_RE.search(buf, pos)
+            data = DATA_URI_RE.search(buf, pos)
+            first = min((m for m in (skip, data) if m), key=lambda m: m.start(), default=None)
+            if first is None:
+                # Hold back a short tail in case a "<script" or "data:" starts across the boundary.
+                cut = max(pos, len(buf) - CARRY)
+                out.append(buf[pos:cut])
+                self._pending = buf[cut:]
+                pos = len(buf)
+                break
+            if first is skip:
+                close = buf.find(">", skip.end())
+                if close < 0:
+                    out.append(buf[pos:skip.start()])
+                    self._pending = buf[skip.start():]
+                    pos = len(buf)
+                    break
+                out.append(buf[pos:close + 1])
+                self._skip_until = "</" + skip.group(1).lower()
+                pos = close + 1
+            else:
+                out.append(buf[pos:data.start()])
+                self._in_data_uri = True
+                pos = data.end()
+
+        if out:
+            self._parser.feed("".join(out))
+
+    def close(self):
+        if self._decoder is not None:
+            self.feed(self._decoder.decode(b"", final=True))
+        if self._pending and not self._skip_until and not self.truncated:
+            self._parser.feed(self._pending)
+        self._pending = ""
+        self._parser.close()
+        return self
+
+
+def stream_html_text(html, max_chars=STREAM_MAX_TEXT_CHARS, base_url=None, chunk_chars=STREAM_CHUNK_BYTES,
+                     content_type=""):
+    """Run the streaming extractor over an in-memory str/bytes document, chunk by chunk."""
+    ex = StreamingTextExtractor(max_chars=max_chars, base_url=base_url)
+    for start in range(0, len(html), chunk_chars):
+        chunk = html[start:start + chunk_chars]
+        if isinstance(chunk, bytes):
+            ex.feed_bytes(chunk, content_type)
+        else:
+            ex.feed(chunk)
+        if ex.done:
+            break
+    return ex.close()
+
+
+async def stream_response_text(resp, max_chars=STREAM_MAX_TEXT_CHARS, base_url=None, prefix=b""):
+    """
+    Read an aiohttp response body incrementally; stops downloading once the text
+    cap is hit. `prefix` is body already consumed by the caller (e.g. for sniffing).
+    """
+    ex = StreamingTextExtractor(max_chars=max_chars, base_url=base_url)
+    content_type = resp.headers.get("content-type", "")
+    if prefix:
+        ex.feed_bytes(prefix, content_type)
+    async for chunk in resp.content.iter_chunked(STREAM_CHUNK_BYTES):
+        ex.feed_bytes(chunk, content_type)
+        if ex.done:
+            break
+    return ex.close()
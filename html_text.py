@@ -0,0 +1,206 @@
+import os
+import re
+
+from prefilter import decode_bytes
+
+# "selectolax", "lxml", "bs4" or "auto" (fastest installed). Pipelines can pass
+# backend= explicitly; this only sets the default.
+DEFAULT_BACKEND = os.getenv("HTML_TEXT_BACKEND", "auto")
+BACKENDS = ("selectolax", "lxml", "bs4")
+STRIP_TAGS = ("script", "style", "noscript", "template")
+
+SPACES_RE = re.compile(r" {2,}")
+
+
+def decode_html(html, encoding=None, content_type=""):
+    """Bytes -> str using the HTTP charset, then <meta charset>, then UTF-8; str passes through."""
+    if isinstance(html, bytes):
+        return decode_bytes(html, encoding, content_type)
+    return html or ""
+
+
+def _installed(name):
+    try:
+        if name == "selectolax":
+            import selectolax.parser  # noqa: F401
+        elif name == "lxml":
+            import lxml.html  # noqa: F401
+        else:
+            import bs4  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+_resolved = {}
+
+
+def resolve_backend(backend=None):
+    """Return the concrete backend name, falling back along selectolax -> lxml -> bs4."""
+    backend = (backend or DEFAULT_BACKEND or "auto").lower()
+    if backend not in _resolved:
+        if backend != "auto" and backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML text backend {backend!r} (expected one of {BACKENDS} or 'auto')")
+        order = BACKENDS if backend == "auto" else BACKENDS[BACKENDS.index(backend):]
+        _resolved[backend] = next((b for b in order if _installed(b)), "bs4")
+    return _resolved[backend]
+
+
+def available_backends():
+    return [b for b in BACKENDS if _installed(b)]
+
+
+# --- selectolax (Lexbor/Modest, C) ---
+
+def _selectolax_tree(html):
+    from selectolax.parser import HTMLParser
+    tree = HTMLParser(html)
+    tree.strip_tags(list(STRIP_TAGS))
+    return tree
+
+
+def _selectolax_node_text(node):
+    # strip=True leaves an extra separator for every whitespace-only text node
+    return SPACES_RE.sub(" ", node.text(deep=True, separator=" ", strip=True)).strip()
+
+
+def _selectolax_text(html):
+    tree = _selectolax_tree(html)
+    return _selectolax_node_text(tree.root) if tree.root is not None else ""
+
+
+def _selectolax_blocks(html, tags):
+    tree = _selectolax_tree(html)
+    return [_selectolax_node_text(node) for node in tree.css(", ".join(tags))]
+
+
+def _selectolax_own_text(node, tags):
+    parts = []
+    for child in node.iter(include_text=True):
+        if child.tag == "-text":
+            parts.append(child.text(deep=False) or "")
+        elif child.tag not in tags and child.tag[:1] not in ("_", "!", "-"):
+            parts.append(_selectolax_own_text(child, tags))
+    return " ".join(p.strip() for p in parts if p.strip())
+
+
+def _selectolax_own_blocks(html, tags):
+    tree = _selectolax_tree(html)
+    return [_selectolax_own_text(node, tags) for node in tree.css(", ".join(tags))]
+
+
+# --- lxml (libxml2, C) ---
+
+def _lxml_tree(html):
+    import lxml.html
+    from lxml import etree
+    # Encode back to UTF-8 so lxml never trips over a conflicting <?xml encoding?> or <meta>
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+    root = lxml.html.document_fromstring(html.encode("utf-8"), parser=parser)
+    etree.strip_elements(root, etree.Comment, etree.ProcessingInstruction, *STRIP_TAGS, with_tail=False)
+    return root
+
+
+def _lxml_node_text(node):
+    return " ".join(t.strip() for t in node.itertext() if t.strip())
+
+
+def _lxml_text(html):
+    if not html.strip():
+        return ""
+    return _lxml_node_text(_lxml_tree(html))
+
+
+def _lxml_blocks(html, tags):
+    if not html.strip():
+        return []
+    return [_lxml_node_text(el) for el in _lxml_tree(html).iter(*tags)]
+
+
+def _lxml_own_text(el, tags):
+    parts = [el.text or ""]
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in tags:
+            parts.append(_lxml_own_text(child, tags))
+        parts.append(child.tail or "")
+    return " ".join(p.strip() for p in parts if p.strip())
+
+
+def _lxml_own_blocks(html, tags):
+    if not html.strip():
+        return []
+    return [_lxml_own_text(el, tags) for el in _lxml_tree(html).iter(*tags)]
+
+
+# --- BeautifulSoup (pure Python, the original behaviour) ---
+
+def make_soup(html, encoding=None, content_type="", strip=True):
+    """BeautifulSoup over decoded HTML, for callers that still need tree navigation."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(decode_html(html, encoding, content_type), "html.parser")
+    if strip:
+        for el in soup(list(STRIP_TAGS)):
+            el.decompose()
+    return soup
+
+
+def _bs4_text(html):
+    return make_soup(html).get_text(" ", strip=True)
+
+
+def _bs4_blocks(html, tags):
+    return [el.get_text(" ", strip=True) for el in make_soup(html).find_all(list(tags))]
+
+
+def _bs4_own_text(el, tags):
+    from bs4 import Comment, NavigableString
+    parts = []
+    for child in el.children:
+        if isinstance(child, NavigableString):
+            if not isinstance(child, Comment):
+                parts.append(str(child))
+        elif child.name not in tags:
+            parts.append(_bs4_own_text(child, tags))
+    return " ".join(p.strip() for p in parts if p.strip())
+
+
+def _bs4_own_blocks(html, tags):
+    return [_bs4_own_text(el, tags) for el in make_soup(html).find_all(list(tags))]
+
+
+_TEXT = {"selectolax": _selectolax_text, "lxml": _lxml_text, "bs4": _bs4_text}
+_BLOCKS = {"selectolax": _selectolax_blocks, "lxml": _lxml_blocks, "bs4": _bs4_blocks}
+_OWN_BLOCKS = {"selectolax": _selectolax_own_blocks, "lxml": _lxml_own_blocks, "bs4": _bs4_own_blocks}
+
+
+def html_to_text(html, backend=None, encoding=None, content_type=""):
+    """
+    Visible text of an HTML document, text nodes joined by single spaces like
+    soup.get_text(" ", strip=True), with script/style/noscript/template removed.
+    """
+    html = decode_html(html, encoding, content_type)
+    if not html:
+        return ""
+    return _TEXT[resolve_backend(backend)](html)
+
+
+def block_texts(html, tags, backend=None, encoding=None, content_type=""):
+    """Text of every element whose tag is in `tags`, in document order (nested blocks repeat)."""
+    html = decode_html(html, encoding, content_type)
+    if not html:
+        return []
+    return _BLOCKS[resolve_backend(backend)](html, tuple(tags))
+
+
+def leaf_block_texts(html, tags, backend=None, encoding=None, content_type=""):
+    """
+    Text each `tags` element holds itself, i.e. without the text of nested `tags`
+    elements, so every piece of page text appears once. Empty blocks are dropped;
+    document order is kept.
+    """
+    html = decode_html(html, encoding, content_type)
+    if not html:
+        return []
+    tags = tuple(tags)
+    texts = _OWN_BLOCKS[resolve_backend(backend)](html, tags)
+    return [t for t in texts if t]
@@ -0,0 +1,78 @@
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from html_text import available_backends, html_to_text
+
+WORD_RE = re.compile(r"\w+", re.U)
+
+
+def current_text(raw):
+    # Exactly what the pipelines did before html_text: raw bytes, UnicodeDammit, html.parser
+    return BeautifulSoup(raw, "html.parser").get_text(" ", strip=True)
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def token_overlap(a, b):
+    ta, tb = WORD_RE.findall(a.lower()), WORD_RE.findall(b.lower())
+    if not ta and not tb:
+        return 1.0
+    common = sum((Counter(ta) & Counter(tb)).values())
+    return common / max(len(ta), len(tb))
+
+
+def iter_documents(paths):
+    for p in map(Path, paths):
+        files = sorted(p.rglob("*.htm*")) if p.is_dir() else [p]
+        for f in files:
+            yield f, f.read_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare html_text backends against the BeautifulSoup text the pipelines used")
+    parser.add_argument("paths", nargs="+", help="Saved .html files or directories of them")
+    parser.add_argument("--min-overlap", type=float, default=0.98, help="Token overlap a document needs to count as matching")
+    parser.add_argument("--show", type=int, default=5, help="Mismatching documents to print per backend")
+    args = parser.parse_args()
+
+    docs = list(iter_documents(args.paths))
+    if not docs:
+        print("No HTML documents found")
+        sys.exit(2)
+
+    start = time.perf_counter()
+    reference = [normalize(current_text(raw)) for _, raw in docs]
+    print(f"{'current bs4':<12} {time.perf_counter() - start:8.2f}s  (reference, {len(docs)} documents)")
+
+    failed = False
+    for backend in available_backends():
+        start = time.perf_counter()
+        texts = [normalize(html_to_text(raw, backend=backend)) for _, raw in docs]
+        elapsed = time.perf_counter() - start
+
+        exact, mismatches = 0, []
+        for (path, _), ref, text in zip(docs, reference, texts):
+            if ref == text:
+                exact += 1
+                continue
+            overlap = token_overlap(ref, text)
+            if overlap < args.min_overlap:
+                mismatches.append((overlap, path))
+        print(f"{backend:<12} {elapsed:8.2f}s  exact {exact}/{len(docs)}  below {args.min_overlap:.0%} overlap: {len(mismatches)}")
+        for overlap, path in sorted(mismatches)[:args.show]:
+            print(f"    {overlap:.3f}  {path}")
+        failed = failed or bool(mismatches)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
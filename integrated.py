@@ -6,11 +6,14 @@ from pathlib import Path
 from urllib.parse import quote, urlparse
 import aiofiles
 import aiohttp
-from bs4 import BeautifulSoup
 from playwright.async_api import async_playwright
 import csv 
 import os
 from dotenv import load_dotenv
+from prefilter import KeywordPrefilter, sniff_charset
+from prefetch import LookaheadPrefetcher
+from keyword_watch import install_keyword_watcher, watch_keywords, watched_page_text
+from page_extract import extract_page
 
 load_dotenv()
 COMPANIES_FILE = r'C:\Users\propl\OneDrive\Desktop\work\input.csv'
@@ -21,6 +24,11 @@ OUTPUT_CSV_FILE = RESULTS_DIR / 'company_keyword_results.csv'
 SCRAPINGDOG_API_KEY = os.getenv('SCRAPINGDOG_API_KEY')
 REQUEST_DELAY = 1.5
 MAX_RESULTS_PER_COMPANY = 3
+USE_KEYWORD_WATCHER = True  # resolve navigation in-page as soon as a keyword is seen
+# With the watcher: GET the raw HTML first and skip rendering when it cannot contain a keyword.
+# Off by default: it costs an extra request per URL, and a JS-rendered page with a
+# 200+ character static shell but no keyword in it would be skipped (false negative).
+USE_SOURCE_PREFILTER = False
 
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -87,6 +95,35 @@ async def fetch_with_playwright(page, url):
         print(f"❌ Playwright failed on {url}: {e}")
         return None
 
+async def fetch_keyword_hits(page, url):
+    if url.endswith(".pdf"):
+        return None
+    try:
+        return set(await watch_keywords(page, url, min_hits=1, timeout=90000))
+    except Exception as e:
+        print(f"❌ Playwright failed on {url}: {e}")
+        return None
+
+async def keywords_absent_from_source(session, url, prefilter):
+    """
+    Cheap pre-render check: True only when the raw HTML cannot contain any keyword,
+    so the page is never rendered. Any fetch problem keeps the page on the full path.
+    """
+    if url.lower().endswith(".pdf"):
+        return False
+    try:
+        async with session.get(url, timeout=20, ssl=ssl_context) as resp:
+            if resp.status != 200:
+                return False
+            content_type = resp.headers.get("content-type", "text/html")
+            if "html" not in content_type:
+                return False
+            body = await resp.read()
+        return prefilter.should_skip(body, encoding=sniff_charset(body, content_type))
+    except Exception as e:
+        print(f"⚠️ Prefilter fetch failed for {url}: {e}")
+        return False
+
 def is_third_party(url, domain):
     return domain not in urlparse(url).netloc
 
@@ -117,9 +154,8 @@ async def crawl_with_playwright(domain, all_keywords, page, session, found_entri
         visited.add(url)
         try:
             await page.goto(url, wait_until='domcontentloaded', timeout=90000)
-            text = await page.evaluate("document.body.innerText") or ""
-            html = await page.content()
-            soup = BeautifulSoup(html, 'html.parser')
+            payload = await extract_page(page, dates=False, json_ld=False, images=False)
+            text = payload.get("text") or ""
 
             for kw in all_keywords:
                 if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
@@ -129,17 +165,9 @@ async def crawl_with_playwright(domain, all_keywords, page, session, found_entri
                         found_entries.append((kw, url, 'own-crawl'))
                         print(f"✅ Found by crawl: {kw} | {url}")
 
-            for a in soup.find_all("a", href=True):
+            for absolute_href in payload.get("links", []):
                 if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
                     break
-                href = a['href']
-                parsed_href = urlparse(href)
-                if parsed_href.scheme and parsed_href.netloc:
-                    absolute_href = href
-                elif href.startswith('/'):
-                    absolute_href = f"https://{domain}{href}"
-                else:
-                    continue
                 if absolute_href.startswith(f"https://{domain}") and absolute_href not in visited:
                     queue.append(absolute_href)
 
@@ -161,35 +189,62 @@ async def write_results_to_csv(results_data):
     print(f"📊 Results saved to {OUTPUT_CSV_FILE}")
 
 async def process_company(company_name, domain, country, all_keywords, keyword_to_provider, session, browser):
-    page = await browser.new_page()
     found_entries = []
-
-    async def process_url(url):
+    prefilter = KeywordPrefilter(all_keywords)
+
+    async def setup_page(page):
+        if USE_KEYWORD_WATCHER:
+            await install_keyword_watcher(page, all_keywords)
+
+    async def fetch(page, url):
+        # Everything process_url needs is read here: the page is reused once this returns.
+        if not USE_KEYWORD_WATCHER:
+            return None, await fetch_with_playwright(page, url)
+        if USE_SOURCE_PREFILTER and await keywords_absent_from_source(session, url, prefilter):
+            print(f"⏭️ No keyword in page source, not rendering: {url}")
+            return set(), None
+        hits = await fetch_keyword_hits(page, url)
+        text = await watched_page_text(page) if hits and is_third_party(url, domain) else None
+        return hits, text
+
+    def process_url(url, signals):
         if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
             return
-        text = await fetch_with_playwright(page, url)
-        if not text:
-            return
+        hits, text = signals
         src = 'own' if not is_third_party(url, domain) else '3rd-party'
-        if src == '3rd-party' and not is_relevant_third_party(text, company_name, THIRD_PARTY_KEYWORDS):
-            return
+        if USE_KEYWORD_WATCHER:
+            if not hits:
+                return
+            if src == '3rd-party' and not is_relevant_third_party(text or "", company_name, THIRD_PARTY_KEYWORDS):
+                return
+            is_present = lambda kw: kw in hits
+        else:
+            if not text:
+                return
+            if src == '3rd-party' and not is_relevant_third_party(text, company_name, THIRD_PARTY_KEYWORDS):
+                return
+            is_present = lambda kw: is_keyword_present_whole_word(text, kw)
         for kw in all_keywords:
-            if is_keyword_present_whole_word(text, kw):
+            if is_present(kw):
                 if not any(fk == kw and furl == url for fk, furl, *_ in found_entries):
                     found_entries.append((kw, url, src))
                     print(f"✅ Found ({src}): {kw} | {url}")
                     break  # stop after 1 keyword match per URL
 
+    async def process_urls(urls):
+        # Next URLs load in extra pages while the current one is analyzed
+        async with LookaheadPrefetcher(browser, fetch, setup_page=setup_page) as prefetcher:
+            async for url, signals in prefetcher.iterate(urls):
+                process_url(url, signals)
+                if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
+                    break
+
     # --- Step 1: Single keyword (aws) ---
     primary_kw = "aws"
     query = SEARCH_QUERY_TEMPLATE_SINGLE.format(company_domain=domain, keyword=primary_kw)
     single_data = await perform_Google_Search(session, company_name, domain, query)
     urls = extract_urls(single_data)[:MAX_RESULTS_PER_COMPANY] if single_data else []
-
-    for url in urls:
-        await process_url(url)
-        if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
-            break
+    await process_urls(urls)
 
     # --- Step 2: All keywords if less than 3 results ---
     if len(found_entries) < MAX_RESULTS_PER_COMPANY:
@@ -197,13 +252,7 @@ async def process_company(company_name, domain, country, all_keywords, keyword_t
         query = SEARCH_QUERY_TEMPLATE_ALL.format(company_domain=domain, all_keywords=all_kw_query)
         all_data = await perform_Google_Search(session, company_name, domain, query)
         urls = extract_urls(all_data)[:MAX_RESULTS_PER_COMPANY] if all_data else []
-
-        for url in urls:
-            await process_url(url)
-            if len(found_entries) >= MAX_RESULTS_PER_COMPANY:
-                break
-
-    await page.close()
+        await process_urls(urls)
 
     results_for_csv = [
         [company_name, domain, country, keyword, url, source]
@@ -0,0 +1,211 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s — %(levelname)s — %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Same whole-word semantics as the crawlers' \b{kw}\b checks, but single-letter
+# tokens are kept so keywords such as "r d" or "c" still line up with the text.
+TOKEN_PATTERN = r"(?u)\b\w+\b"
+TEXT_COLUMNS = ["text", "Text", "content", "Content", "Chunk", "page_text"]
+COMPANY_COLUMNS = ["company", "Company", "Company Name", "company_name"]
+URL_COLUMNS = ["url", "URL", "Link", "link"]
+BATCH_SIZE = 5000
+
+MATRIX_FILE = "matrix.npz"
+DOCUMENTS_FILE = "documents.parquet"
+KEYWORDS_FILE = "keywords.parquet"
+HITS_FILE = "hits.parquet"
+
+
+def load_keyword_profile(path):
+    """Read a keyword JSON ({provider: [kw, ...]} or [kw, ...]) into (keyword, provider) pairs."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    pairs = []
+    if isinstance(data, dict):
+        for provider, kws in data.items():
+            for kw in (kws if isinstance(kws, list) else [kws]):
+                pairs.append((str(kw).lower().strip(), provider))
+    elif isinstance(data, list):
+        for kw in data:
+            pairs.append((str(kw).lower().strip(), "-"))
+    else:
+        raise ValueError("Keywords JSON must be a dict or list")
+    return [(kw, provider) for kw, provider in pairs if kw]
+
+
+def build_vectorizer(pairs):
+    """
+    Build a fixed-vocabulary CountVectorizer whose columns are the normalized
+    keyword n-grams. Keywords that normalize to the same n-gram share a column.
+    """
+    tokenize = re.compile(TOKEN_PATTERN).findall
+    term_keywords = {}
+    for kw, provider in pairs:
+        term = " ".join(tokenize(kw))
+        if not term:
+            logger.warning(f"Keyword {kw!r} has no word tokens, skipping")
+            continue
+        term_keywords.setdefault(term, []).append((kw, provider))
+
+    terms = sorted(term_keywords)
+    max_n = max((len(t.split()) for t in terms), default=1)
+    vectorizer = CountVectorizer(
+        vocabulary={t: i for i, t in enumerate(terms)},
+        ngram_range=(1, max_n),
+        token_pattern=TOKEN_PATTERN,
+        lowercase=True,
+        dtype=np.int32,
+    )
+    keywords_df = pd.DataFrame([
+        {
+            "col_id": i,
+            "term": t,
+            "keyword": ", ".join(dict.fromkeys(kw for kw, _ in term_keywords[t])),
+            "provider": ", ".join(dict.fromkeys(p for _, p in term_keywords[t])),
+        }
+        for i, t in enumerate(terms)
+    ])
+    return vectorizer, keywords_df
+
+
+def pick_column(columns, candidates, required=False, explicit=None):
+    if explicit:
+        if explicit not in columns:
+            raise ValueError(f"Column {explicit!r} not found in corpus (have {list(columns)})")
+        return explicit
+    for c in candidates:
+        if c in columns:
+            return c
+    if required:
+        raise ValueError(f"None of the columns {candidates} found in corpus (have {list(columns)})")
+    return None
+
+
+def iter_corpus(path, batch_size=BATCH_SIZE):
+    """Yield the corpus as DataFrame batches so 50k+ pages never sit in memory twice."""
+    lower = path.lower()
+    if lower.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    elif lower.endswith((".jsonl", ".ndjson")):
+        yield from pd.read_json(path, lines=True, chunksize=batch_size)
+    elif lower.endswith((".xls", ".xlsx")):
+        df = pd.read_excel(path)
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+    else:
+        yield from pd.read_csv(path, chunksize=batch_size)
+
+
+def build_hit_matrix(corpus_path, keywords_path, output_dir, text_column=None, batch_size=BATCH_SIZE):
+    pairs = load_keyword_profile(keywords_path)
+    vectorizer, keywords_df = build_vectorizer(pairs)
+    logger.info(f"Loaded {len(pairs)} keywords into {len(keywords_df)} vocabulary terms")
+
+    blocks, doc_frames = [], []
+    doc_offset = 0
+    for batch in iter_corpus(corpus_path, batch_size):
+        text_col = pick_column(batch.columns, TEXT_COLUMNS, required=True, explicit=text_column)
+        company_col = pick_column(batch.columns, COMPANY_COLUMNS)
+        url_col = pick_column(batch.columns, URL_COLUMNS)
+
+        texts = batch[text_col].fillna("").astype(str)
+        blocks.append(vectorizer.transform(texts).tocsr())
+        doc_frames.append(pd.DataFrame({
+            "doc_id": np.arange(doc_offset, doc_offset + len(batch)),
+            "company": batch[company_col].astype(str).values if company_col else "-",
+            "url": batch[url_col].astype(str).values if url_col else "-",
+        }))
+        doc_offset += len(batch)
+        logger.info(f"Vectorized {doc_offset} documents")
+
+    if not blocks:
+        raise ValueError(f"Corpus {corpus_path} is empty")
+
+    matrix = sparse.vstack(blocks, format="csr")
+    documents_df = pd.concat(doc_frames, ignore_index=True)
+
+    coo = matrix.tocoo()
+    hits_df = pd.DataFrame({"doc_id": coo.row, "col_id": coo.col, "count": coo.data})
+    hits_df = (hits_df
+               .merge(documents_df, on="doc_id")
+               .merge(keywords_df, on="col_id")
+               .sort_values(["doc_id", "col_id"])
+               .reset_index(drop=True))
+
+    os.makedirs(output_dir, exist_ok=True)
+    sparse.save_npz(os.path.join(output_dir, MATRIX_FILE), matrix)
+    documents_df.to_parquet(os.path.join(output_dir, DOCUMENTS_FILE), index=False)
+    keywords_df.to_parquet(os.path.join(output_dir, KEYWORDS_FILE), index=False)
+    hits_df.to_parquet(os.path.join(output_dir, HITS_FILE), index=False)
+
+    logger.info(f"{matrix.shape[0]} documents x {matrix.shape[1]} terms, {matrix.nnz} hits written to {output_dir}")
+    return matrix, documents_df, keywords_df
+
+
+def companies_mentioning(output_dir, keyword):
+    """Answer "which companies mention X" from a built matrix without re-running crawls."""
+    keywords_df = pd.read_parquet(os.path.join(output_dir, KEYWORDS_FILE))
+    term = " ".join(re.findall(TOKEN_PATTERN, keyword.lower()))
+    cols = keywords_df.loc[keywords_df["term"] == term, "col_id"].tolist()
+    if not cols:
+        return pd.DataFrame(columns=["company", "pages", "mentions"])
+
+    matrix = sparse.load_npz(os.path.join(output_dir, MATRIX_FILE)).tocsc()
+    column = matrix[:, cols[0]].tocoo()
+    documents_df = pd.read_parquet(os.path.join(output_dir, DOCUMENTS_FILE))
+    found = documents_df.iloc[column.row].assign(mentions=column.data)
+    return (found.groupby("company")
+            .agg(pages=("doc_id", "count"), mentions=("mentions", "sum"))
+            .sort_values("mentions", ascending=False)
+            .reset_index())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Document x keyword hit matrix over a crawled page corpus")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Vectorize a corpus against a keyword profile")
+    build.add_argument("corpus", help="Corpus of page texts (.csv, .jsonl, .parquet or .xlsx)")
+    build.add_argument("keywords", help="Keyword profile JSON")
+    build.add_argument("output_dir", help="Directory for matrix.npz and the Parquet tables")
+    build.add_argument("--text-column", default=None, help="Column holding page text (auto-detected by default)")
+    build.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    query = sub.add_parser("query", help="List companies whose pages mention a keyword")
+    query.add_argument("output_dir", help="Directory written by the build command")
+    query.add_argument("keyword")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "build":
+            build_hit_matrix(args.corpus, args.keywords, args.output_dir,
+                             text_column=args.text_column, batch_size=args.batch_size)
+        else:
+            result = companies_mentioning(args.output_dir, args.keyword)
+            if result.empty:
+                print(f"No pages mention {args.keyword!r}")
+            else:
+                print(result.to_string(index=False))
+    except Exception as e:
+        logger.exception(f"Fatal error: {e}")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import json
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Upper bound a negative page may spend rendering before we give up on it.
+WATCH_BUDGET_MS = 15000
+# A page counts as settled once it is loaded and the DOM has been quiet this long.
+QUIET_MS = 750
+POLL_MS = 100
+
+# Runs at document start on every navigation. Text nodes are scanned as they are
+# inserted, so a hit is known long before domcontentloaded/networkidle on SPA sites.
+WATCHER_JS = """
+(() => {
+  const KEYWORDS = __KEYWORDS__;
+  const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+  const escape = s => s.replace(/[.*+?^${}()|[\\]\\\\\\/]/g, '\\\\$&');
+  const norm = s => s.toLowerCase().replace(/\\s+/g, ' ').trim();
+  const wordRe = (alt, flags) => new RegExp('(?<![\\\\p{L}\\\\p{N}_])(?:' + alt + ')(?![\\\\p{L}\\\\p{N}_])', flags);
+
+  const labelsFor = new Map();
+  for (const [label, variants] of KEYWORDS) {
+    for (const v of variants) {
+      const key = norm(v);
+      if (!key) continue;
+      if (!labelsFor.has(key)) labelsFor.set(key, []);
+      labelsFor.get(key).push(label);
+    }
+  }
+  const keys = [...labelsFor.keys()].sort((a, b) => b.length - a.length);
+  const alternation = keys.map(k => k.split(' ').map(escape).join('\\\\s+')).join('|') || '(?!)';
+  const combined = wordRe(alternation, 'giu');
+  const single = new Map();
+
+  const state = {
+    hits: new Set(),
+    lastMutation: Date.now(),
+    scan(text) {
+      if (!text) return;
+      combined.lastIndex = 0;
+      let m;
+      while ((m = combined.exec(text)) !== null) {
+        const key = norm(m[0]);
+        // A long match ("aws lambda") can hide shorter keywords inside it ("aws").
+        for (const k of keys) {
+          if (k.length > key.length || !key.includes(k)) continue;
+          if (!single.has(k)) single.set(k, wordRe(k.split(' ').map(escape).join('\\\\s+'), 'iu'));
+          if (k === key || single.get(k).test(m[0])) {
+            for (const label of labelsFor.get(k)) state.hits.add(label);
+          }
+        }
+        combined.lastIndex = m.index + 1;
+      }
+    },
+    scanNode(node) {
+      if (node.nodeType === Node.TEXT_NODE) {
+        if (!node.parentNode || !SKIP.has(node.parentNode.nodeName)) state.scan(node.data);
+        return;
+      }
+      if (node.nodeType !== Node.ELEMENT_NODE || SKIP.has(node.nodeName)) return;
+      const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT, {
+        acceptNode: t => (t.parentNode && SKIP.has(t.parentNode.nodeName)) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT
+      });
+      while (walker.nextNode()) state.scan(walker.currentNode.data);
+    },
+    settled(quietMs) {
+      return document.readyState === 'complete' && Date.now() - state.lastMutation >= quietMs;
+    },
+    finish(minHits) {
+      // Keywords split across sibling text nodes are only visible in the rendered text.
+      if (state.hits.size < minHits && document.body) state.scan(document.body.innerText);
+      return [...state.hits];
+    }
+  };
+
+  const observer = new MutationObserver(records => {
+    state.lastMutation = Date.now();
+    for (const r of records) {
+      if (r.type === 'characterData') state.scanNode(r.target);
+      else for (const n of r.addedNodes) state.scanNode(n);
+    }
+  });
+  observer.observe(document, { childList: true, subtree: true, characterData: true });
+  window.__keywordWatch = state;
+})();
+"""
+
+
+def build_watcher_script(keywords):
+    """keywords: {label: [variant, ...]} or a plain iterable of keywords (label == keyword)."""
+    if isinstance(keywords, dict):
+        pairs = [[label, list(variants)] for label, variants in keywords.items()]
+    else:
+        pairs = [[kw, [kw]] for kw in keywords]
+    return WATCHER_JS.replace("__KEYWORDS__", json.dumps(pairs))
+
+
+async def install_keyword_watcher(page, keywords):
+    """Register the watcher once per page; it is re-injected on every navigation."""
+    await page.add_init_script(script=build_watcher_script(keywords))
+
+
+async def watch_keywords(page, url, min_hits=1, budget_ms=WATCH_BUDGET_MS, timeout=45000):
+    """
+    Navigate to url and return the keyword labels seen before either `min_hits`
+    distinct hits were observed, the page settled, or `budget_ms` elapsed.
+    The page is left wherever rendering had got to; the next goto aborts it.
+    """
+    await page.goto(url, wait_until='commit', timeout=timeout)
+    deadline = time.monotonic() + budget_ms / 1000
+    for _ in range(3):
+        remaining_ms = max(0, (deadline - time.monotonic()) * 1000)
+        try:
+            await page.wait_for_function(
+                """([n, quiet]) => {
+                    const w = window.__keywordWatch;
+                    return !!w && (w.hits.size >= n || w.settled(quiet));
+                }""",
+                arg=[min_hits, QUIET_MS],
+                polling=POLL_MS,
+                timeout=remaining_ms or 1,
+            )
+            break
+        except PlaywrightTimeoutError:
+            break
+        except Exception:
+            # A client-side redirect replaced the document; the new one has its own watcher.
+            continue
+
+    for _ in range(2):
+        try:
+            return await page.evaluate(
+                "n => window.__keywordWatch ? window.__keywordWatch.finish(n) : []", min_hits
+            )
+        except Exception:
+            # A client-side redirect destroyed the context mid-evaluate; let it land and retry.
+            try:
+                await page.wait_for_load_state('domcontentloaded', timeout=budget_ms)
+            except PlaywrightTimeoutError:
+                pass
+    return []
+
+
+async def watched_page_text(page, timeout=30000):
+    """innerText of a page left mid-render by watch_keywords, for callers that still need text."""
+    try:
+        await page.wait_for_load_state('domcontentloaded', timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+    try:
+        return await page.evaluate("document.body ? document.body.innerText : ''") or ""
+    except Exception:
+        return ""
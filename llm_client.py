@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Ollama server (`ollama serve`); its OLLAMA_NUM_PARALLEL decides how many of our requests it decodes together.
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 300))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))  # requests in flight to the server
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.sqlite")
+# "ollama", or "stub" for a canned in-process answer (tests and dry runs without a model server)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")
+
+
+def chunk_hash(text):
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """sqlite map of sha256(model, prompt version, company, keyword, chunk hash) -> parsed JSON answer."""
+
+    def __init__(self, path=LLM_CACHE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, model TEXT, answer TEXT)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model, prompt_version, company, keyword, chunk):
+        parts = [model, str(prompt_version), str(company).strip().lower(), str(keyword).strip().lower(), chunk_hash(chunk)]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, model, answer):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?)", (key, model, json.dumps(answer)))
+            self._conn.commit()
+
+
+class OllamaClient:
+    """
+    One keep-alive HTTP connection pool to Ollama for a whole run, at most `concurrency`
+    requests in flight, JSON-mode answers, and a disk cache in front. Identical requests
+    made while the first is still running wait for its answer instead of being sent again.
+    """
+
+    def __init__(self, model=OLLAMA_MODEL, base_url=OLLAMA_URL, concurrency=LLM_CONCURRENCY, cache_path=LLM_CACHE_DB,
+                 timeout=OLLAMA_TIMEOUT):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.cache = LLMCache(cache_path) if cache_path else None
+        self.requests = self.cache_hits = 0
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._inflight = {}
+        self._client = httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=max(1, concurrency)))
+
+    async def _generate(self, prompt):
+        """Parsed JSON object the model returned for `prompt`."""
+        async with self._semaphore:
+            self.requests += 1
+            resp = await self._client.post(f"{self.base_url}/api/generate", json={
+                "model": self.model,
+                "prompt": prompt,
+                "format": "json",
+                "stream": False,
+                "options": {"temperature": 0},
+            })
+        resp.raise_for_status()
+        answer = json.loads(resp.json()["response"])
+        if not isinstance(answer, dict):
+            raise ValueError(f"Expected a JSON object from {self.model}, got {type(answer).__name__}")
+        return answer
+
+    async def ask_json(self, prompt, key=None):
+        """
+        JSON object answer for `prompt`; `key` (LLMCache.key) makes it cached across runs
+        and shared between duplicate requests. Errors, including answers that are not a
+        JSON object, propagate and are never cached.
+        """
+        if key is None:
+            return await self._generate(prompt)
+        if self.cache and isinstance(answer := self.cache.get(key), dict):
+            self.cache_hits += 1
+            return answer
+        if key in self._inflight:
+            self.cache_hits += 1
+            return await asyncio.shield(self._inflight[key])
+        task = asyncio.ensure_future(self._generate(prompt))
+        self._inflight[key] = task
+        try:
+            answer = await task
+        finally:
+            self._inflight.pop(key, None)
+        if self.cache:
+            self.cache.put(key, self.model, answer)
+        return answer
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class StubClient:
+    """Same interface as OllamaClient without a model server; `answer(prompt)` supplies the reply."""
+
+    def __init__(self, answer=None, model="stub"):
+        self.model = model
+        self.answer = answer or (lambda prompt: {"uses_tech": False, "explanation": "stub answer", "confidence": "low"})
+        self.prompts = []
+        self.requests = self.cache_hits = 0
+
+    async def ask_json(self, prompt, key=None):
+        self.requests += 1
+        self.prompts.append(prompt)
+        answer = self.answer(prompt)
+        if not isinstance(answer, dict):
+            raise ValueError(f"Expected a JSON object from the stub, got {type(answer).__name__}")
+        return answer
+
+    async def aclose(self):
+        pass
+
+
+def get_client(backend=None, **kwargs):
+    """OllamaClient(**kwargs), or a StubClient for backend "stub" (kwargs are ignored then)."""
+    backend = (backend or LLM_BACKEND).lower()
+    if backend == "stub":
+        return StubClient()
+    if backend != "ollama":
+        raise ValueError(f"Unknown LLM backend {backend!r} (expected 'ollama' or 'stub')")
+    return OllamaClient(**kwargs)
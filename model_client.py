@@ -0,0 +1,201 @@
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# model_server.py address; every call falls back to in-process models when it is not running.
+MODEL_SERVER_URL = os.getenv("MODEL_SERVER_URL", "http://127.0.0.1:8765")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", 60))
+# After a failed call the server is not tried again for this many seconds.
+MODEL_SERVER_RETRY = float(os.getenv("MODEL_SERVER_RETRY", 30))
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+
+_down_until = 0.0
+_local = {}
+_load_lock = threading.RLock()  # scripts with worker threads must not load a model twice
+
+
+# --- in-process models (also what model_server.py serves) ---
+
+def load_encoder(backend=None):
+    from embedding_backends import load_embedding_model, resolve
+    key = ("encoder", resolve(backend))
+    with _load_lock:
+        if key not in _local:
+            _local[key] = load_embedding_model(backend)
+    return _local[key]
+
+
+def load_spacy():
+    with _load_lock:
+        if "spacy" in _local:
+            return _local["spacy"]
+        import spacy
+        logger.info(f"Loading spaCy model ({SPACY_MODEL}, NER only)...")
+        nlp = spacy.load(SPACY_MODEL)
+        # Only doc.ents is ever read: keep ner (and tok2vec if ner listens to it), skip tagger/parser/lemmatizer
+        keep = ["ner"]
+        if "tok2vec" in nlp.pipe_names and "ner" in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+            keep.insert(0, "tok2vec")
+        nlp.select_pipes(enable=keep)
+        _local["spacy"] = nlp
+    return _local["spacy"]
+
+
+def load_sentiment():
+    with _load_lock:
+        if "sentiment" in _local:
+            return _local["sentiment"]
+        import nltk
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        try:
+            nltk.data.find("sentiment/vader_lexicon.zip")
+        except LookupError:
+            nltk.download("vader_lexicon", quiet=True)
+        _local["sentiment"] = SentimentIntensityAnalyzer()
+    return _local["sentiment"]
+
+
+def load_classifier():
+    """Page category pipeline: the latest trained artifact (category_classifier.py), else the seed model."""
+    with _load_lock:
+        if "classifier" not in _local:
+            from category_classifier import load_pipeline
+            pipeline, source = load_pipeline()
+            logger.info(f"Category classifier: {source}")
+            _local["classifier"] = pipeline
+    return _local["classifier"]
+
+
+def local_encode(texts, backend=None, batch_size=32):
+    return np.asarray(load_encoder(backend).encode(list(texts), batch_size=batch_size, show_progress_bar=False),
+                      dtype=np.float32)
+
+
+def local_entities(texts, labels=None, batch_size=64, n_process=1):
+    nlp = load_spacy()
+    out = []
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        out.append([(ent.text, ent.label_) for ent in doc.ents if not labels or ent.label_ in labels])
+    return out
+
+
+def local_sentiment(texts):
+    sia = load_sentiment()
+    return [sia.polarity_scores(t) for t in texts]
+
+
+def local_classify(texts):
+    return [str(label) for label in load_classifier().predict(list(texts))]
+
+
+def pack_vectors(vectors):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return {"shape": list(vectors.shape), "data": base64.b64encode(vectors.tobytes()).decode("ascii")}
+
+
+def unpack_vectors(payload):
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+
+# --- server calls ---
+
+def _post(path, payload):
+    """JSON POST to the model server, or None when it is unreachable (then retried later)."""
+    global _down_until
+    if not MODEL_SERVER_URL or time.monotonic() < _down_until:
+        return None
+    request = urllib.request.Request(MODEL_SERVER_URL.rstrip("/") + path, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=MODEL_SERVER_TIMEOUT) as resp:
+            return json.loads(resp.read())
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        if _down_until == 0.0:
+            logger.info(f"Model server unavailable ({e}); using in-process models")
+        _down_until = time.monotonic() + MODEL_SERVER_RETRY
+        return None
+
+
+def server_available():
+    global _down_until
+    if not MODEL_SERVER_URL or time.monotonic() < _down_until:
+        return False
+    try:
+        with urllib.request.urlopen(MODEL_SERVER_URL.rstrip("/") + "/health", timeout=2) as resp:
+            return json.loads(resp.read()).get("ok", False)
+    except (urllib.error.URLError, OSError, ValueError):
+        _down_until = time.monotonic() + MODEL_SERVER_RETRY
+        return False
+
+
+def encode(texts, backend=None, batch_size=32):
+    """Sentence embeddings (float32 array), from the server when it is up."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    from embedding_backends import resolve
+    reply = _post("/encode", {"texts": texts, "backend": resolve(backend)})
+    if reply is not None:
+        return unpack_vectors(reply["vectors"])
+    return local_encode(texts, backend, batch_size)
+
+
+def entities(texts, labels=None, n_process=1):
+    """
+    [(entity text, label), ...] per text; `labels` keeps only those entity types.
+    n_process > 1 fans the in-process fallback out over spaCy worker processes.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    reply = _post("/ner", {"texts": texts, "labels": list(labels) if labels else None})
+    if reply is not None:
+        return [[tuple(ent) for ent in ents] for ents in reply["entities"]]
+    return local_entities(texts, labels, n_process=n_process)
+
+
+def sentiment(texts):
+    """VADER polarity scores per text."""
+    texts = list(texts)
+    if not texts:
+        return []
+    reply = _post("/sentiment", {"texts": texts})
+    return reply["scores"] if reply is not None else local_sentiment(texts)
+
+
+def classify(texts):
+    """Page category label per text; pass all texts of a run at once."""
+    texts = list(texts)
+    if not texts:
+        return []
+    reply = _post("/classify", {"texts": texts})
+    return reply["labels"] if reply is not None else local_classify(texts)
+
+
+class RemoteEncoder:
+    """Stands in for a SentenceTransformer (encode() only) so caches and batchers work unchanged."""
+
+    tokenizer = None
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **kwargs):
+        return encode(texts, self.backend, batch_size)
+
+
+def get_encoder(backend=None):
+    """RemoteEncoder when the model server is running, otherwise the model loaded in this process."""
+    if server_available():
+        logger.info(f"Using embeddings from model server at {MODEL_SERVER_URL}")
+        return RemoteEncoder(backend)
+    return load_encoder(backend)
@@ -0,0 +1,150 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import model_client
+from model_client import local_classify, local_encode, local_entities, local_sentiment, pack_vectors
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s — %(levelname)s — %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 256      # texts per model call
+MAX_WAIT = 0.02      # seconds the first request waits for others to join its batch
+
+
+class Batcher:
+    """
+    Groups concurrent requests (from any client) that share a key into one model
+    call. fn(key, texts) -> one result per text; each caller gets back its slice.
+    """
+
+    def __init__(self, name, fn, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.calls = self.texts = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True).start()
+
+    def submit(self, key, texts):
+        future = Future()
+        self._queue.put((key, list(texts), future))
+        return future.result()
+
+    def _run(self):
+        held = []
+        while True:
+            first = held.pop(0) if held else self._queue.get()
+            batch, size = [first], len(first[1])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request[0] != first[0]:
+                    held.append(request)  # different model/options: next batch
+                    continue
+                batch.append(request)
+                size += len(request[1])
+            texts = [t for _, request_texts, _ in batch for t in request_texts]
+            try:
+                results = self.fn(first[0], texts)
+            except Exception as e:
+                logger.exception(f"{self.name} batch failed")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.calls += 1
+            self.texts += len(texts)
+            pos = 0
+            for _, request_texts, future in batch:
+                future.set_result(results[pos:pos + len(request_texts)])
+                pos += len(request_texts)
+
+
+BATCHERS = {
+    "encode": Batcher("encode", lambda backend, texts: local_encode(texts, backend)),
+    "ner": Batcher("ner", lambda labels, texts: local_entities(texts, labels)),
+    "sentiment": Batcher("sentiment", lambda _, texts: local_sentiment(texts)),
+    "classify": Batcher("classify", lambda _, texts: local_classify(texts)),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            stats = {name: {"calls": b.calls, "texts": b.texts} for name, b in BATCHERS.items()}
+            self._reply(200, {"ok": True, "stats": stats})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            texts = [str(t) for t in payload.get("texts", [])]
+            if path == "/encode":
+                vectors = BATCHERS["encode"].submit(payload.get("backend"), texts)
+                self._reply(200, {"vectors": pack_vectors(vectors)})
+            elif path == "/ner":
+                labels = tuple(payload["labels"]) if payload.get("labels") else None
+                self._reply(200, {"entities": BATCHERS["ner"].submit(labels, texts)})
+            elif path == "/sentiment":
+                self._reply(200, {"scores": BATCHERS["sentiment"].submit(None, texts)})
+            elif path == "/classify":
+                self._reply(200, {"labels": BATCHERS["classify"].submit(None, texts)})
+            else:
+                self._reply(404, {"error": "not found"})
+        except Exception as e:
+            logger.exception(f"{path} failed")
+            self._reply(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared embedding / NER / sentiment / classifier server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", default=None, help="Embedding backend to preload (default: $EMBEDDING_BACKEND)")
+    parser.add_argument("--lazy", action="store_true", help="Load models on first request instead of at start")
+    args = parser.parse_args()
+
+    # Never call ourselves: the in-process loaders are what this server serves.
+    model_client.MODEL_SERVER_URL = ""
+    if not args.lazy:
+        model_client.load_encoder(args.backend)
+        model_client.load_spacy()
+        model_client.load_sentiment()
+        model_client.load_classifier()
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    logger.info(f"Model server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
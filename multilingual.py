@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# "translate": translate keyword chunks of non-English pages, then embed with the English model.
+# "multilingual": embed the original chunks with a multilingual model and match localized terms.
+EMBEDDING_MODE = os.getenv("EMBEDDING_MODE", "translate")
+MULTILINGUAL_MODEL = os.getenv("MULTILINGUAL_MODEL", "paraphrase-multilingual-mpnet-base-v2")
+MULTILINGUAL_TERMS_PATH = os.getenv(
+    "MULTILINGUAL_TERMS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "multilingual_terms.json")
+)
+
+_model = None
+_terms = None
+
+
+def multilingual_enabled():
+    return EMBEDDING_MODE.lower() == "multilingual"
+
+
+def get_model():
+    """The multilingual sentence-embedding model, loaded on first use."""
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        logger.info(f"Loading multilingual embedding model {MULTILINGUAL_MODEL}")
+        _model = SentenceTransformer(MULTILINGUAL_MODEL)
+    return _model
+
+
+def load_terms(path=None):
+    """{language: {english_term: [localized variants]}} from multilingual_terms.json."""
+    global _terms
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if _terms is None:
+        try:
+            with open(MULTILINGUAL_TERMS_PATH, "r", encoding="utf-8") as f:
+                _terms = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Multilingual terms unavailable ({e}); only English terms will match")
+            _terms = {}
+    return _terms
+
+
+def supported_languages():
+    return sorted(load_terms())
+
+
+def english_equivalents(text, language):
+    """English terms whose localized variants occur in `text` (lower-cased substring match)."""
+    table = load_terms().get(language, {})
+    text_lower = text.lower()
+    return [term for term, variants in table.items() if any(v in text_lower for v in variants)]
+
+
+def term_view(text, language="en"):
+    """
+    Lower-cased text with the English equivalents of any localized terms appended,
+    so the English term lists of justify_relevance work on foreign chunks unchanged.
+    """
+    text_lower = text.lower()
+    if language == "en":
+        return text_lower
+    found = english_equivalents(text_lower, language)
+    return f"{text_lower} {' '.join(found)}" if found else text_lower
+
+
+def can_score_directly(language):
+    """True when a non-English page can skip translation in the current mode."""
+    return multilingual_enabled() and language != "en" and language in load_terms()
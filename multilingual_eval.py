@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import sys
+import time
+
+import pandas as pd
+
+import multilingual
+from multilingual import term_view
+from translation import detect_language, translate_chunks
+from backend import all_terms, justify_relevance, semantic_filter, split_chunks
+
+RELEVANT = "RELEVANT"
+
+
+def _label(value):
+    value = str(value).strip().upper()
+    return RELEVANT if value in ("RELEVANT", "1", "TRUE", "YES") else "NOT RELEVANT"
+
+
+async def _decide(chunks, company, keyword, embedder=None, language="en"):
+    if not chunks:
+        return "NOT RELEVANT", 0.0
+    query = f"What is the relationship between {company} and {keyword}?"
+    rel_chunks = await semantic_filter(chunks, query, embedder, multilingual.MULTILINGUAL_MODEL if embedder else None)
+    if not rel_chunks:
+        return "NOT RELEVANT", 0.0
+    top_chunk, score = max(rel_chunks, key=lambda x: x[1])
+    relevance, _, _ = justify_relevance(top_chunk, company, keyword, score, threshold=0.4, language=language)
+    return relevance, float(score)
+
+
+async def translate_path(text, company, keyword, language):
+    chunks = split_chunks(text, keyword, require_terms=False)
+    chunks = await translate_chunks(chunks, source=language)
+    chunks = [c for c in chunks if any(t in c.lower() for t in all_terms)]
+    return await _decide(chunks, company, keyword)
+
+
+async def multilingual_path(text, company, keyword, language):
+    chunks = [c for c in split_chunks(text, keyword, require_terms=False)
+              if any(t in term_view(c, language) for t in all_terms)]
+    return await _decide(chunks, company, keyword, multilingual.get_model(), language)
+
+
+def scores(df, column):
+    predicted = df[column] == RELEVANT
+    actual = df["label"] == RELEVANT
+    tp = int((predicted & actual).sum())
+    precision = tp / predicted.sum() if predicted.sum() else 0.0
+    recall = tp / actual.sum() if actual.sum() else 0.0
+    return {
+        "accuracy": float((df[column] == df["label"]).mean()),
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+
+async def evaluate(df, include_english=False):
+    rows = []
+    for row in df.itertuples(index=False):
+        text = str(row.text)
+        language = getattr(row, "language", None)
+        if not isinstance(language, str) or not language.strip():
+            language = detect_language(text)
+        if language == "en" and not include_english:
+            continue
+        start = time.perf_counter()
+        translated, t_score = await translate_path(text, row.company, row.keyword, language)
+        t_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        direct, m_score = await multilingual_path(text, row.company, row.keyword, language)
+        m_seconds = time.perf_counter() - start
+        rows.append({
+            "company": row.company,
+            "keyword": row.keyword,
+            "language": language,
+            "label": _label(row.label),
+            "translate": translated,
+            "translate_score": t_score,
+            "translate_s": t_seconds,
+            "multilingual": direct,
+            "multilingual_score": m_score,
+            "multilingual_s": m_seconds,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare translate-then-embed with direct multilingual scoring on a labelled sample")
+    parser.add_argument("sample", help="CSV with text, company, keyword, label (RELEVANT/NOT RELEVANT or 1/0) "
+                                       "and optionally language")
+    parser.add_argument("--include-english", action="store_true", help="Also score rows detected as English")
+    parser.add_argument("--output", default=None, help="Optional CSV with per-row decisions")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.sample)
+    missing = {"text", "company", "keyword", "label"} - set(df.columns)
+    if missing:
+        print(f"Sample is missing columns: {', '.join(sorted(missing))}")
+        sys.exit(2)
+
+    results = asyncio.run(evaluate(df, args.include_english))
+    if results.empty:
+        print("No rows to evaluate")
+        sys.exit(1)
+
+    summary = []
+    for path in ("translate", "multilingual"):
+        summary.append({"path": path, **scores(results, path),
+                        "mean_s": results[f"{path}_s"].mean()})
+    print(f"{len(results)} rows, languages: {results['language'].value_counts().to_dict()}\n")
+    print(pd.DataFrame(summary).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\nDecision agreement between paths: {(results['translate'] == results['multilingual']).mean():.3f}")
+
+    by_language = results.groupby("language").apply(
+        lambda g: pd.Series({"rows": len(g),
+                             "translate_acc": (g["translate"] == g["label"]).mean(),
+                             "multilingual_acc": (g["multilingual"] == g["label"]).mean()}))
+    print("\n" + by_language.to_string(float_format=lambda v: f"{v:.3f}"))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\nPer-row decisions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
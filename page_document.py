@@ -0,0 +1,118 @@
+import json
+from functools import cached_property
+from urllib.parse import urljoin
+
+from html_text import STRIP_TAGS, decode_html, html_to_text, make_soup, resolve_backend
+
+HEADING_TAGS = ("title", "h1", "h2", "h3")
+DATE_META_HINTS = ("date", "time", "pubdate", "published", "modified", "updated")
+
+
+class PageDocument:
+    """
+    One fetched page, parsed at most once. Every property is computed on first
+    access and memoized, so text, links, dates and images share the same parse.
+
+        doc = PageDocument(html, url=url)
+        doc.text, doc.links, doc.headings, doc.footer_text, doc.meta, doc.json_ld, doc.images
+
+    When only `text` is needed and a C backend is installed the soup is never
+    built; once the soup exists, text is read from it instead of parsing again.
+    """
+
+    def __init__(self, html, url=None, encoding=None, content_type="", backend=None):
+        self.url = url
+        self.backend = backend
+        self._raw = html
+        self._encoding = encoding
+        self._content_type = content_type
+
+    @cached_property
+    def html(self):
+        return decode_html(self._raw, self._encoding, self._content_type)
+
+    @cached_property
+    def soup(self):
+        return make_soup(self.html, strip=False)
+
+    def _is_soup_built(self):
+        return "soup" in self.__dict__
+
+    @cached_property
+    def text(self):
+        """Visible text, as html_text.html_to_text() returns it."""
+        if not self._is_soup_built() and resolve_backend(self.backend) != "bs4":
+            return html_to_text(self.html, backend=self.backend)
+        from bs4.element import CData, NavigableString
+        parts = []
+        for s in self.soup.find_all(string=True):
+            # Comments, doctypes and script/style strings are NavigableString subclasses
+            if type(s) not in (NavigableString, CData) or s.find_parent(list(STRIP_TAGS)) is not None:
+                continue
+            s = s.strip()
+            if s:
+                parts.append(s)
+        return " ".join(parts)
+
+    @cached_property
+    def links(self):
+        """Absolute http(s) hrefs in document order, de-duplicated."""
+        seen = {}
+        for a in self.soup.find_all("a", href=True):
+            href = urljoin(self.url or "", a["href"].strip())
+            if href.lower().startswith(("http://", "https://")):
+                seen.setdefault(href, None)
+        return list(seen)
+
+    @cached_property
+    def headings(self):
+        """{tag: [text, ...]} for title, h1, h2 and h3."""
+        return {tag: [el.get_text() for el in self.soup.find_all(tag)] for tag in HEADING_TAGS}
+
+    @cached_property
+    def footer_text(self):
+        return " ".join(f.get_text(" ", strip=True) for f in self.soup.find_all("footer"))
+
+    @cached_property
+    def meta(self):
+        """Lower-cased name/property/itemprop -> content; the first occurrence wins."""
+        meta = {}
+        for m in self.soup.find_all("meta"):
+            key = m.get("property") or m.get("name") or m.get("itemprop")
+            content = m.get("content")
+            if key and content:
+                meta.setdefault(key.strip().lower(), content.strip())
+        return meta
+
+    @cached_property
+    def date_meta(self):
+        return {k: v for k, v in self.meta.items() if any(h in k for h in DATE_META_HINTS)}
+
+    @cached_property
+    def json_ld(self):
+        blocks = []
+        for s in self.soup.find_all("script", type="application/ld+json"):
+            try:
+                blocks.append(json.loads(s.string or ""))
+            except ValueError:
+                continue
+        return blocks
+
+    @cached_property
+    def images(self):
+        """[{"src", "alt", "width", "height"}] with absolute src; data: URIs are skipped."""
+        images = []
+        for img in self.soup.find_all("img"):
+            src = (img.get("src") or "").strip()
+            if not src or src.startswith("data:"):
+                continue
+            images.append({
+                "src": urljoin(self.url or "", src),
+                "alt": img.get("alt", ""),
+                "width": img.get("width", ""),
+                "height": img.get("height", ""),
+            })
+        return images
+
+    def select_one(self, selector):
+        return self.soup.select_one(selector)
@@ -0,0 +1,59 @@
+# One evaluate() call replaces innerText + page.content() + a BeautifulSoup pass:
+# the browser already has the DOM, so it returns only what the crawlers use.
+EXTRACT_JS = """
+(opts) => {
+  const out = { url: location.href };
+  if (opts.text) {
+    out.text = document.body ? document.body.innerText : '';
+  }
+  if (opts.links) {
+    const seen = new Set();
+    out.links = [];
+    for (const a of document.querySelectorAll('a[href]')) {
+      const href = a.href;
+      if (!/^https?:/i.test(href) || seen.has(href)) continue;
+      seen.add(href);
+      out.links.push(href);
+    }
+  }
+  if (opts.dates) {
+    out.dates = [];
+    for (const t of document.querySelectorAll('time')) {
+      const value = (t.getAttribute('datetime') || t.textContent || '').trim();
+      if (value) out.dates.push({ source: 'time', value });
+    }
+    for (const m of document.querySelectorAll('meta[name], meta[property], meta[itemprop]')) {
+      const key = (m.getAttribute('property') || m.getAttribute('name') || m.getAttribute('itemprop') || '').toLowerCase();
+      const value = (m.getAttribute('content') || '').trim();
+      if (value && /(date|time|pubdate|published|modified|updated)/.test(key)) {
+        out.dates.push({ source: 'meta:' + key, value });
+      }
+    }
+  }
+  if (opts.jsonLd) {
+    out.json_ld = [];
+    for (const s of document.querySelectorAll('script[type="application/ld+json"]')) {
+      try { out.json_ld.push(JSON.parse(s.textContent)); } catch (e) { }
+    }
+  }
+  if (opts.images) {
+    out.images = [];
+    for (const img of document.querySelectorAll('img')) {
+      const src = img.currentSrc || img.src;
+      if (!src || src.startsWith('data:')) continue;
+      out.images.push({ src, alt: img.alt || '', width: img.naturalWidth || 0, height: img.naturalHeight || 0 });
+    }
+  }
+  return out;
+}
+"""
+
+
+async def extract_page(page, text=True, links=True, dates=True, json_ld=True, images=True):
+    """
+    Return the current page as one compact dict: url, text (innerText), links
+    (absolute http(s), de-duplicated), dates (<time> and date-like <meta>),
+    json_ld (parsed blocks) and images (src/alt/size), as requested.
+    """
+    opts = {"text": text, "links": links, "dates": dates, "jsonLd": json_ld, "images": images}
+    return await page.evaluate(EXTRACT_JS, opts)
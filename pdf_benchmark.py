@@ -0,0 +1,117 @@
+import argparse
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pdf_text import available_backends, extract_pdf_text
+
+REFERENCE_BACKEND = "pdfminer"
+
+
+def load_keywords(path):
+    """Keyword JSON as used by the crawlers: {provider: [kw, ...]} or [kw, ...]."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    kws = [kw for v in data.values() for kw in (v if isinstance(v, list) else [v])] if isinstance(data, dict) else data
+    return sorted({str(kw).lower().strip() for kw in kws if str(kw).strip()})
+
+
+def found_keywords(text, keywords):
+    lower = text.lower()
+    return {kw for kw in keywords if re.search(rf"\b{re.escape(kw)}\b", lower)}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        except ImportError:
+            return float("nan")
+
+
+def run_backend(backend, files, keywords):
+    """Runs in a fresh process so peak RSS belongs to this backend alone."""
+    rows = []
+    for path in files:
+        data = Path(path).read_bytes()
+        start = time.perf_counter()
+        try:
+            text, error = extract_pdf_text(data, backend=backend), ""
+        except Exception as e:
+            text, error = "", str(e)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "file": path,
+            "backend": backend,
+            "seconds": elapsed,
+            "chars": len(text),
+            "keywords": sorted(found_keywords(text, keywords)),
+            "error": error,
+        })
+    return rows, _peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed, memory and keyword parity of the PDF text backends")
+    parser.add_argument("fixtures", help="Directory of real PDFs (searched recursively)")
+    parser.add_argument("keywords", help="Keyword JSON to compare recall on")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to run (default: all installed)")
+    parser.add_argument("--output", default=None, help="Optional CSV with per-file results")
+    args = parser.parse_args()
+
+    files = sorted(str(p) for p in Path(args.fixtures).rglob("*.pdf"))
+    if not files:
+        print(f"No PDFs under {args.fixtures}")
+        sys.exit(2)
+    keywords = load_keywords(args.keywords)
+    backends = args.backends or available_backends()
+    if REFERENCE_BACKEND not in backends:
+        backends.insert(0, REFERENCE_BACKEND)
+
+    all_rows, rss = [], {}
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rows, rss[backend] = pool.submit(run_backend, backend, files, keywords).result()
+        all_rows.extend(rows)
+
+    df = pd.DataFrame(all_rows)
+    reference = df[df["backend"] == REFERENCE_BACKEND].set_index("file")["keywords"]
+
+    summary = []
+    for backend, group in df.groupby("backend", sort=False):
+        hits = expected = extra = 0
+        for row in group.itertuples():
+            ref, got = set(reference.get(row.file, [])), set(row.keywords)
+            hits += len(ref & got)
+            expected += len(ref)
+            extra += len(got - ref)
+        summary.append({
+            "backend": backend,
+            "total_s": group["seconds"].sum(),
+            "median_s": group["seconds"].median(),
+            "peak_rss_mb": rss[backend],
+            "errors": int((group["error"] != "").sum()),
+            f"keyword_recall_vs_{REFERENCE_BACKEND}": hits / expected if expected else 1.0,
+            "extra_keywords": extra,
+        })
+
+    print(f"{len(files)} PDFs, {len(keywords)} keywords\n")
+    print(pd.DataFrame(summary).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.output:
+        df.assign(keywords=df["keywords"].map(", ".join)).to_csv(args.output, index=False)
+        print(f"\nPer-file results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
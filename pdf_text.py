@@ -0,0 +1,199 @@
+import logging
+import mmap
+import os
+import re
+from io import BytesIO, StringIO
+
+logger = logging.getLogger(__name__)
+
+# "pdfminer" (layout-aware, pure Python), "pypdf2" (pure Python) or "pypdfium2" (PDFium, C).
+# pdf_benchmark.py compares them on real reports before a pipeline switches.
+PDF_TEXT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pdfminer")
+PDF_BACKENDS = ("pdfminer", "pypdf2", "pypdfium2")
+
+
+def _stream(data):
+    """File-like view of bytes/memoryview/mmap without writing anything to disk."""
+    if hasattr(data, "read"):  # BytesIO, open file, mmap
+        data.seek(0)
+        return data
+    return BytesIO(data)
+
+
+def _as_bytes(data):
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    if isinstance(data, mmap.mmap):
+        return data[:]
+    if hasattr(data, "read"):
+        data.seek(0)
+        return data.read()
+    return bytes(data)
+
+
+def repair_pdf(data):
+    """Rewrite a damaged PDF through pikepdf (qpdf) in memory; returns the repaired bytes."""
+    import pikepdf
+    out = BytesIO()
+    with pikepdf.open(BytesIO(_as_bytes(data))) as pdf:
+        pdf.save(out)
+    return out.getvalue()
+
+
+def extract_pdf_text(data, backend=None):
+    """
+    Text of an in-memory PDF (bytes, BytesIO or mmap). pikepdf repair is only
+    attempted when the direct parse raises, not on every document.
+    """
+    if (backend or PDF_TEXT_BACKEND) != "pdfminer":
+        return join_pages(iter_pdf_pages(data, backend=backend))
+    from pdfminer.high_level import extract_text
+    try:
+        return extract_text(_stream(data))
+    except Exception as e:
+        logger.info(f"pdfminer failed ({e}), retrying after pikepdf repair")
+    return extract_text(BytesIO(repair_pdf(data)))
+
+
+def open_pdf_reader(data):
+    """PyPDF2 PdfReader over in-memory bytes, repaired with pikepdf only if it cannot be opened."""
+    from PyPDF2 import PdfReader
+    try:
+        reader = PdfReader(_stream(data))
+        len(reader.pages)  # PyPDF2 parses lazily; force the xref/page tree now
+        return reader
+    except Exception as e:
+        logger.info(f"PyPDF2 failed ({e}), retrying after pikepdf repair")
+    return PdfReader(BytesIO(repair_pdf(data)))
+
+
+# --- page-level extraction ---
+
+# pdfminer's extract_text() ends every page with a form feed; page-joined text keeps that
+# convention so an offset maps back to its page number.
+PAGE_BREAK = "\f"
+
+
+def _pdfminer_pages(fp, first, last):
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    rsrcmgr = PDFResourceManager(caching=True)
+    laparams = LAParams()
+    for number, page in enumerate(PDFPage.get_pages(fp, caching=True), start=1):
+        if number < first:
+            continue
+        if last is not None and number > last:
+            return
+        out = StringIO()
+        device = TextConverter(rsrcmgr, out, laparams=laparams)
+        try:
+            PDFPageInterpreter(rsrcmgr, device).process_page(page)
+        finally:
+            device.close()
+        yield number, out.getvalue()
+
+
+def _pypdf2_pages(fp, first, last):
+    from PyPDF2 import PdfReader
+    reader = PdfReader(fp)
+    last = min(last or len(reader.pages), len(reader.pages))
+    for number in range(first, last + 1):
+        yield number, reader.pages[number - 1].extract_text() or ""
+
+
+def _pypdfium2_pages(fp, first, last):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(fp)
+    try:
+        last = min(last or len(pdf), len(pdf))
+        for number in range(first, last + 1):
+            page = pdf[number - 1]
+            textpage = page.get_textpage()
+            try:
+                yield number, textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+_PAGE_ITERATORS = {"pdfminer": _pdfminer_pages, "pypdf2": _pypdf2_pages, "pypdfium2": _pypdfium2_pages}
+
+
+def _page_iterator(backend):
+    backend = (backend or PDF_TEXT_BACKEND).lower()
+    if backend not in _PAGE_ITERATORS:
+        raise ValueError(f"Unknown PDF text backend {backend!r} (expected one of {PDF_BACKENDS})")
+    return _PAGE_ITERATORS[backend]
+
+
+def iter_pdf_pages(data, first=1, last=None, backend=None):
+    """
+    Yield (page_number, text) one page at a time (1-based), so callers that stop
+    early never pay for the rest of the document. A PDF that cannot be opened is
+    repaired with pikepdf once and retried.
+    """
+    pages_of = _page_iterator(backend)
+    try:
+        pages = pages_of(_stream(data), first, last)
+        head = next(pages, None)
+    except Exception as e:
+        logger.info(f"{backend or PDF_TEXT_BACKEND} failed ({e}), retrying after pikepdf repair")
+        pages = pages_of(BytesIO(repair_pdf(data)), first, last)
+        head = next(pages, None)
+    if head is not None:
+        yield head
+        yield from pages
+
+
+def pdf_page_count(data, backend=None):
+    backend = (backend or PDF_TEXT_BACKEND).lower()
+    if backend == "pypdfium2":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(_stream(data))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    if backend == "pypdf2":
+        from PyPDF2 import PdfReader
+        return len(PdfReader(_stream(data)).pages)
+    from pdfminer.pdfpage import PDFPage
+    return sum(1 for _ in PDFPage.get_pages(_stream(data)))
+
+
+def available_backends():
+    found = []
+    for backend, module in (("pdfminer", "pdfminer"), ("pypdf2", "PyPDF2"), ("pypdfium2", "pypdfium2")):
+        try:
+            __import__(module)
+            found.append(backend)
+        except ImportError:
+            pass
+    return found
+
+
+def join_pages(pages):
+    """
+    [(page_number, text), ...] -> one text with exactly one PAGE_BREAK between consecutive
+    pages. pdfminer already ends each page with one, so form feeds inside a page's text
+    are turned into newlines before joining; otherwise page_numbers_for would over-count.
+    """
+    return PAGE_BREAK.join(text.rstrip(PAGE_BREAK).replace(PAGE_BREAK, "\n") for _, text in pages)
+
+
+def page_numbers_for(text, word, first_page=1):
+    """Pages of page-joined text on which `word` occurs as a whole word ([] for an empty word)."""
+    if not word or not word.strip():
+        return []
+    pages, number, pos = [], first_page, 0
+    for m in re.finditer(rf"\b{re.escape(word)}\b", text, flags=re.IGNORECASE):
+        number += text.count(PAGE_BREAK, pos, m.start())
+        pos = m.start()
+        if not pages or pages[-1] != number:
+            pages.append(number)
+    return pages
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+
+from pdf_text import available_backends, extract_pdf_text, iter_pdf_pages, join_pages, page_numbers_for
+
+KEYWORD = "Snowflake"
+KEYWORD_PAGE = 3
+PAGE_COUNT = 4
+
+
+def build_pdf(page_texts):
+    """Minimal uncompressed PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def main():
+    texts = [f"Page {n} of the annual report" for n in range(1, PAGE_COUNT + 1)]
+    texts[KEYWORD_PAGE - 1] = f"We run our warehouse on {KEYWORD}"
+    data = build_pdf(texts)
+
+    failures = []
+    for backend in available_backends():
+        joined = join_pages(iter_pdf_pages(data, backend=backend))
+        if joined.count("\f") != PAGE_COUNT - 1:
+            failures.append(f"{backend}: {joined.count(chr(12))} page breaks in joined text, expected {PAGE_COUNT - 1}")
+        for label, text in (("join_pages", joined), ("extract_pdf_text", extract_pdf_text(data, backend=backend))):
+            pages = page_numbers_for(text, KEYWORD)
+            status = "ok" if pages == [KEYWORD_PAGE] else "FAIL"
+            print(f"{status:4}  {backend:10} {label:17} pages={pages}")
+            if pages != [KEYWORD_PAGE]:
+                failures.append(f"{backend} {label}: {pages}, expected [{KEYWORD_PAGE}]")
+
+    # The pooled path try.py and backend.py use for PDF evidence
+    import extract_pool
+    try:
+        pages, _ = asyncio.run(extract_pool.pdf_pages_until(data))
+    finally:
+        extract_pool.shutdown()
+    pooled = page_numbers_for(join_pages(pages), KEYWORD)
+    print(f"{'ok' if pooled == [KEYWORD_PAGE] else 'FAIL':4}  {'pool':10} {'pdf_pages_until':17} pages={pooled}")
+    if pooled != [KEYWORD_PAGE]:
+        failures.append(f"pdf_pages_until: {pooled}, expected [{KEYWORD_PAGE}]")
+
+    if failures:
+        print("\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
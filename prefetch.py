@@ -0,0 +1,113 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+LOOKAHEAD = 2          # URLs loaded ahead of the one being analyzed
+PER_HOST_LIMIT = 1     # concurrent requests per host
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a minimum gap between request starts to the same host."""
+
+    def __init__(self, per_host=PER_HOST_LIMIT, min_interval=0.0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._semaphores = {}
+        self._locks = {}
+        self._last_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                wait = self._last_start.get(host, float("-inf")) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield
+
+
+class LookaheadPrefetcher:
+    """
+    Load the next `lookahead` URLs in extra browser pages while the caller
+    analyzes the current one. `fetch(page, url)` must return everything the
+    caller needs (text, html, hits...) because the page is reused afterwards.
+
+        async with LookaheadPrefetcher(browser, fetch_with_playwright) as prefetcher:
+            async for url, content in prefetcher.iterate(urls):
+                ...
+                if stop_condition:
+                    break   # leaving the block cancels outstanding prefetches
+
+    `urls` may grow while it is being iterated (crawl queues).
+    """
+
+    def __init__(self, browser, fetch, lookahead=LOOKAHEAD, per_host=PER_HOST_LIMIT,
+                 min_interval=0.0, setup_page=None, limiter=None):
+        self.browser = browser
+        self.fetch = fetch
+        self.lookahead = lookahead
+        self.setup_page = setup_page
+        self.limiter = limiter or HostLimiter(per_host, min_interval)
+        self._pages = []
+        self._idle_pages = asyncio.Queue()
+        self._tasks = {}
+        self._next = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _acquire_page(self):
+        if self._idle_pages.empty() and len(self._pages) < self.lookahead + 1:
+            page = await self.browser.new_page()
+            if self.setup_page:
+                await self.setup_page(page)
+            self._pages.append(page)
+            return page
+        return await self._idle_pages.get()
+
+    async def _fetch(self, url):
+        # Wait for the host slot before taking a page so throttled URLs don't hold one.
+        async with self.limiter.slot(url):
+            page = await self._acquire_page()
+            try:
+                return await self.fetch(page, url)
+            finally:
+                self._idle_pages.put_nowait(page)
+
+    def _schedule(self, urls, upto):
+        for j in range(self._next, min(upto + 1, len(urls))):
+            if j not in self._tasks:
+                self._tasks[j] = asyncio.create_task(self._fetch(urls[j]))
+
+    async def iterate(self, urls):
+        self._next = 0
+        while self._next < len(urls):
+            i = self._next
+            self._schedule(urls, i + self.lookahead)
+            result = await self._tasks.pop(i)
+            self._next = i + 1
+            self._schedule(urls, self._next + self.lookahead)
+            yield urls[i], result
+
+    async def cancel(self):
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self):
+        await self.cancel()
+        for page in self._pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pages.clear()
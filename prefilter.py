@@ -0,0 +1,129 @@
+import codecs
+import html
+import re
+
+# Pages whose static text is shorter than this are probably rendered client-side,
+# so the raw bytes cannot prove a keyword is absent.
+MIN_STATIC_TEXT_CHARS = 200
+
+TAG_RE = re.compile(r"<[^>]*>")
+SCRIPT_STYLE_RE = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>", re.I | re.S)
+WHITESPACE_RE = re.compile(r"\s+")
+CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+HREF_RE = re.compile(r"""<a\b[^>]*?\bhref\s*=\s*["']?([^"'\s>]+)""", re.I)
+
+
+def _phrase_pattern(keyword):
+    # Words may be glued together once split tags are stripped ("Amazon</b>Web"),
+    # or separated by any whitespace in the raw markup, so allow both.
+    return r"\s*".join(re.escape(w) for w in keyword.split())
+
+
+def _normalize(s):
+    return WHITESPACE_RE.sub("", s).lower()
+
+
+class KeywordPrefilter:
+    """
+    Case-insensitive multi-pattern scan over raw response bytes and tag-stripped
+    text. It deliberately over-reports: substrings count as hits, entities are
+    decoded and tags removed before the text pass, so a page with no candidates
+    cannot contain any of the keywords and may skip parsing, rendering and OCR.
+    """
+
+    def __init__(self, keywords):
+        self.by_key = {}
+        for kw in keywords:
+            kw = str(kw).strip()
+            if kw:
+                self.by_key.setdefault(_normalize(kw), []).append(kw)
+        # Longest normalized form first: keywords matching at the same position then all
+        # normalize to prefixes of the chosen hit, so candidates() recovers the shorter
+        # ones as substrings ("aws" from "aws lambda", "a b c" from "abcd").
+        phrases = sorted({kw for kws in self.by_key.values() for kw in kws},
+                         key=lambda kw: len(_normalize(kw)), reverse=True)
+        alternation = "|".join(_phrase_pattern(p) for p in phrases) or r"(?!)"
+        self.text_re = re.compile(alternation, re.I)
+        self.bytes_re = re.compile(alternation.encode("utf-8"), re.I)
+
+    def _scan(self, regex, data, decode=None):
+        keys = set()
+        pos = 0
+        while True:
+            m = regex.search(data, pos)
+            if not m:
+                return keys
+            matched = decode(m.group()) if decode else m.group()
+            keys.add(_normalize(matched))
+            # Step one character so keywords starting inside a longer match are also reported.
+            pos = m.start() + 1
+
+    def visible_text(self, data, encoding=None):
+        """Decode, drop tags and decode entities; cheap stand-in for soup.get_text()."""
+        if isinstance(data, bytes):
+            data = decode_bytes(data, encoding)
+        return html.unescape(TAG_RE.sub("", data))
+
+    def candidates(self, data, encoding=None):
+        """Return the set of keywords that may appear in the page (raw bytes or text)."""
+        if not data:
+            return set()
+        if isinstance(data, bytes):
+            keys = self._scan(self.bytes_re, data, decode=lambda b: b.decode("utf-8", errors="replace"))
+        else:
+            keys = self._scan(self.text_re, data)
+        keys |= self._scan(self.text_re, self.visible_text(data, encoding))
+        found = set()
+        for key, kws in self.by_key.items():
+            if any(key in k for k in keys):
+                found.update(kws)
+        return found
+
+    def has_candidates(self, data, encoding=None):
+        if not data:
+            return False
+        regex = self.bytes_re if isinstance(data, bytes) else self.text_re
+        if regex.search(data):
+            return True
+        return self.text_re.search(self.visible_text(data, encoding)) is not None
+
+    def should_skip(self, data, encoding=None, rendered=False):
+        """
+        True when the page can safely skip the expensive path. Pre-render HTML with
+        almost no static text is never skipped because its content arrives via JS.
+        """
+        if self.has_candidates(data, encoding):
+            return False
+        if rendered:
+            return True
+        if isinstance(data, bytes):
+            data = decode_bytes(data, encoding)
+        static_text = WHITESPACE_RE.sub(" ", html.unescape(TAG_RE.sub(" ", SCRIPT_STYLE_RE.sub(" ", data)))).strip()
+        return len(static_text) >= MIN_STATIC_TEXT_CHARS
+
+
+def sniff_charset(data, content_type=""):
+    """Charset from the Content-Type header, else from a <meta charset> in the first 4 KB."""
+    m = re.search(r"charset=([\w.:-]+)", content_type or "", re.I)
+    if m:
+        return m.group(1)
+    m = CHARSET_RE.search(data[:4096])
+    if m:
+        return m.group(1).decode("ascii", errors="ignore")
+    return None
+
+
+def decode_bytes(data, encoding=None, content_type=""):
+    charset = encoding or sniff_charset(data, content_type) or "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return data.decode(charset, errors="replace")
+
+
+def extract_hrefs(data):
+    """Raw href values of <a> tags, for crawlers that skip parsing on negative pages."""
+    if isinstance(data, bytes):
+        data = decode_bytes(data)
+    return [html.unescape(h) for h in HREF_RE.findall(data)]
@@ -0,0 +1,31 @@
+import sys
+
+from prefilter import KeywordPrefilter
+
+# (keywords, page, keywords that must be reported)
+CASES = [
+    (["a b c", "abcd"], "xx abcd yy", {"a b c", "abcd"}),
+    (["a b c", "abcd"], b"xx abcd yy", {"a b c", "abcd"}),
+    (["AWS", "AWS Lambda"], "<p>We deploy on AWS <b>Lambda</b></p>", {"AWS", "AWS Lambda"}),
+    (["Amazon Web Services"], "<b>Amazon</b>Web Services", {"Amazon Web Services"}),
+    (["Snowflake", "Databricks"], "Our stack: Snowflake &amp; dbt", {"Snowflake"}),
+    (["Glue"], "nothing relevant here", set()),
+]
+
+
+def main():
+    failures = 0
+    for keywords, page, expected in CASES:
+        found = KeywordPrefilter(keywords).candidates(page)
+        missing = expected - found
+        status = "FAIL" if missing else "ok"
+        print(f"{status:4}  {keywords!r} in {page!r}: {sorted(found)}")
+        if missing:
+            print(f"      missing {sorted(missing)}")
+            failures += 1
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 import re
 import requests
-from bs4 import BeautifulSoup
+from html_text import block_texts
 from googlesearch import search
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+HTML_TEXT_BACKEND = None  # "selectolax", "lxml", "bs4" or None for the fastest installed
+
 def extract_revenue_from_text(text):
     """
     Look for proper revenue mentions only.
@@ -42,12 +44,10 @@ def get_company_revenue(company_name, industry, website):
             print(f"Checking: {url}")
             headers = {"User-Agent": "Mozilla/5.0"}
             page = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(page.text, "html.parser")
-
-            # Extract visible text
-            paragraphs = soup.find_all(["p", "span", "li", "div"])
-            for para in paragraphs:
-                text = para.get_text(" ", strip=True)
+            # Extract visible text; charset comes from the headers/meta, not requests' guess
+            paragraphs = block_texts(page.content, ["p", "span", "li", "div"], backend=HTML_TEXT_BACKEND,
+                                     content_type=page.headers.get("Content-Type", ""))
+            for text in paragraphs:
                 if any(word in text.lower() for word in ["revenue", "sales", "turnover"]):
                     revenue = extract_revenue_from_text(text)
                     if revenue:
@@ -0,0 +1,129 @@
+from page_document import PageDocument
+
+# Cheap markers checked on the raw HTML before anything is parsed.
+STRUCTURED_MARKERS = ("application/ld+json", "itemscope", "typeof=")
+# Organization properties whose values are people, with the role title they imply.
+PEOPLE_PROPS = {"founder": "Founder", "employee": "", "member": "", "employees": "", "founders": "Founder"}
+
+
+def _local_name(value):
+    """'https://schema.org/Person', 'schema:jobTitle', 'foaf:name' -> 'Person', 'jobTitle', 'name'."""
+    return value.rstrip("/").rsplit("/", 1)[-1].rsplit("#", 1)[-1].rsplit(":", 1)[-1]
+
+
+def _is_person(types):
+    if isinstance(types, str):
+        types = types.split()
+    return any(_local_name(t) == "Person" for t in types or [])
+
+
+def _as_text(value):
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or ""
+    if isinstance(value, list):
+        value = ", ".join(t for t in (_as_text(v) for v in value) if t)
+    return " ".join(str(value or "").split())
+
+
+# --- JSON-LD ---
+
+def _walk_json_ld(node, role, out):
+    if isinstance(node, list):
+        for item in node:
+            _walk_json_ld(item, role, out)
+        return
+    if not isinstance(node, dict):
+        return
+    if _is_person(node.get("@type")):
+        name = _as_text(node.get("name")) or " ".join(
+            p for p in (_as_text(node.get("givenName")), _as_text(node.get("familyName"))) if p)
+        title = _as_text(node.get("jobTitle")) or _as_text(node.get("roleName"))
+        if name:
+            out.append((name, title, role))
+    for key, value in node.items():
+        if key in PEOPLE_PROPS:
+            _walk_json_ld(value, PEOPLE_PROPS[key], out)
+        elif isinstance(value, (dict, list)):
+            _walk_json_ld(value, "", out)
+
+
+def people_from_json_ld(blocks):
+    out = []
+    _walk_json_ld(blocks, "", out)
+    return out
+
+
+# --- microdata and RDFa (same shape: a typed scope element with property descendants) ---
+
+def _value(el):
+    for attr in ("content", "datetime"):
+        if el.get(attr):
+            return _as_text(el[attr])
+    return _as_text(el.get_text(" ", strip=True))
+
+
+def _scope_props(scope, scope_attr, prop_attr):
+    """First value of each property that belongs to `scope` itself (not to a nested item)."""
+    props = {}
+    for el in scope.find_all(attrs={prop_attr: True}):
+        if el.find_parent(attrs={scope_attr: True}) is not scope:
+            continue
+        for prop in el[prop_attr].split():
+            props.setdefault(_local_name(prop), _value(el))
+    return props
+
+
+def _people_from_scopes(soup, scope_attr, type_attr, prop_attr):
+    out = []
+    for scope in soup.find_all(attrs={type_attr: True}):
+        if not _is_person(scope[type_attr]):
+            continue
+        props = _scope_props(scope, scope_attr, prop_attr)
+        name = props.get("name") or " ".join(p for p in (props.get("givenName"), props.get("familyName")) if p)
+        roles = [_local_name(p) for p in (scope.get(prop_attr) or "").split()]
+        title = props.get("jobTitle") or props.get("roleName") or ""
+        role = next((PEOPLE_PROPS[r] for r in roles if PEOPLE_PROPS.get(r)), "")
+        if name:
+            out.append((name, title, role))
+    return out
+
+
+def people_from_microdata(soup):
+    return _people_from_scopes(soup, "itemscope", "itemtype", "itemprop")
+
+
+def people_from_rdfa(soup):
+    return _people_from_scopes(soup, "typeof", "typeof", "property")
+
+
+def structured_people_roles(html, url=None):
+    """
+    (name, declared titles, role titles) for each schema.org Person in JSON-LD,
+    microdata or RDFa, in that order and de-duplicated. Declared titles come from
+    jobTitle/roleName; role titles only from the property the person sits under
+    (e.g. "Founder" for Organization.founder), which site-wide SEO blocks repeat on
+    every page. Pages without any structured-data marker return [] without being parsed.
+    """
+    doc = html if isinstance(html, PageDocument) else PageDocument(html, url=url)
+    lower = doc.html.lower()
+    if not any(marker in lower for marker in STRUCTURED_MARKERS):
+        return []
+    people = people_from_json_ld(doc.json_ld)
+    if "itemscope" in lower:
+        people += people_from_microdata(doc.soup)
+    if "typeof=" in lower:
+        people += people_from_rdfa(doc.soup)
+
+    best = {}
+    for name, title, role in people:
+        titles, roles = best.setdefault(name, (set(), set()))
+        if title:
+            titles.add(title)
+        if role:
+            roles.add(role)
+    return [(name, ", ".join(sorted(titles)), ", ".join(sorted(roles))) for name, (titles, roles) in best.items()]
+
+
+def structured_people(html, url=None):
+    """(name, job title) pairs; the declared title, else the role title, else ""."""
+    return [(name, title or role) for name, title, role in structured_people_roles(html, url)]
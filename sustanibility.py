@@ -2,6 +2,8 @@ import asyncio
 from playwright.async_api import async_playwright
 from urllib.parse import urlparse
 import re
+from keyword_watch import install_keyword_watcher, watch_keywords
+from page_extract import extract_page
 
 # Define keywords with abbreviations + full forms
 KEYWORD_VARIANTS = {
@@ -34,6 +36,9 @@ KEYWORD_VARIANTS = {
 }
 
 
+# Detect keywords in-page while the DOM is built instead of waiting for load + innerText
+USE_KEYWORD_WATCHER = True
+
 # Compile regex patterns
 PATTERNS = []
 for main_kw, variants in KEYWORD_VARIANTS.items():
@@ -59,21 +64,31 @@ async def crawl_company(company_name, base_url, max_pages=10):
 
         visited.add(url)
         try:
-            await page.goto(url, timeout=15000)
-            text = await page.inner_text("body")
-
-            # Search for any keyword variant
-            for main_kw, pattern in PATTERNS:
-                if pattern.search(text):
-                    result["usage"] = "yes"
-                    result["keyword"] = main_kw
-                    result["url"] = url
-                    return
+            if USE_KEYWORD_WATCHER:
+                hits = await watch_keywords(page, url, timeout=15000)
+                for main_kw in KEYWORD_VARIANTS:
+                    if main_kw in hits:
+                        result["usage"] = "yes"
+                        result["keyword"] = main_kw
+                        result["url"] = url
+                        return
+                payload = await extract_page(page, text=False, dates=False, json_ld=False, images=False)
+            else:
+                await page.goto(url, timeout=15000)
+                payload = await extract_page(page, dates=False, json_ld=False, images=False)
+                text = payload.get("text") or ""
+
+                # Search for any keyword variant
+                for main_kw, pattern in PATTERNS:
+                    if pattern.search(text):
+                        result["usage"] = "yes"
+                        result["keyword"] = main_kw
+                        result["url"] = url
+                        return
 
             # Collect internal links
             domain = urlparse(base_url).netloc
-            links = await page.eval_on_selector_all("a[href]", "els => els.map(e => e.href)")
-            for link in links:
+            for link in payload.get("links", []):
                 if urlparse(link).netloc == domain and link not in visited:
                     await crawl_page(page, link)
 
@@ -83,6 +98,8 @@ async def crawl_company(company_name, base_url, max_pages=10):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         page = await browser.new_page()
+        if USE_KEYWORD_WATCHER:
+            await install_keyword_watcher(page, KEYWORD_VARIANTS)
         await crawl_page(page, base_url)
         await browser.close()
 
@@ -3,17 +3,19 @@ import csv
 import json
 import re
 import ssl
-from io import BytesIO
 from pathlib import Path
 from urllib.parse import quote, urlparse
 from datetime import datetime
 import aiofiles
 import aiohttp
 from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
+from pdf_text import open_pdf_reader
+import extract_pool
 from playwright.async_api import async_playwright
 import os
 from dotenv import load_dotenv
+from page_extract import extract_page
+from prefetch import LookaheadPrefetcher
 
 load_dotenv()
 # === Config ===
@@ -130,13 +132,13 @@ async def get_date(url, session):
     if not content: return None
     if ctype == "pdf":
         try:
-            pdf = PdfReader(BytesIO(content))
+            pdf = open_pdf_reader(content)
             for k, v in (pdf.metadata or {}).items():
                 d = parse_date(str(v))
                 if d: return d
-            for page in pdf.pages:
-                d = parse_date(page.extract_text() or '')
-                if d: return d
+            # Pages stream in from the extraction pool; the rest is cancelled at the first date
+            pages, hit = await extract_pool.pdf_pages_until(content, lambda n, txt: parse_date(txt))
+            if hit: return parse_date(pages[-1][1])
         except: return None
     if ctype == "html":
         soup = BeautifulSoup(content, 'html.parser')
@@ -173,18 +175,16 @@ async def crawl_with_playwright(domain, all_keywords, page, session, found_entri
         visited.add(url)
         try:
             await page.goto(url, wait_until='networkidle', timeout=45000)
-            text = await page.evaluate("document.body.innerText") or ""
-            html = await page.content()
-            soup = BeautifulSoup(html, 'html.parser')
-            for a in soup.find_all("a", href=True):
-                href = a['href']
-                if href.startswith('/'): href = f"https://{domain}{href}"
-                elif not href.startswith(f"https://{domain}"): continue
+            payload = await extract_page(page, json_ld=False, images=False)
+            text = payload.get("text") or ""
+            for href in payload.get("links", []):
+                if not href.startswith(f"https://{domain}"): continue
                 if href not in visited: queue.append(href)
             for kw in all_keywords:
                 if any(fk == kw for fk, *_ in found_entries): continue
                 if kw in text.lower():
-                    date_str = await get_date(url, session) or '-'
+                    date_str = next(filter(None, (parse_date(d["value"]) for d in payload.get("dates", []))), None)
+                    date_str = date_str or await get_date(url, session) or '-'
                     year = int(date_str.split()[1]) if date_str != '-' else 0
                     found_entries.append((kw, url, date_str, year, 'own-crawl'))
                     print(f"✅ Found by crawl: {kw} | {url} | {date_str}")
@@ -216,9 +216,7 @@ async def process_company(company_name, domain, country, all_keywords, keyword_t
     urls_own = [u for u in urls if not is_third_party(u, domain)]
     urls_ordered = urls_third_party + urls_own
 
-    async def process_url(url):
-        if is_job_link(url): return
-        text = await fetch_with_playwright(page, url)
+    async def process_url(url, text):
         if not text: return
         src = '3rd-party' if is_third_party(url, domain) else 'own'
         if src == '3rd-party' and not is_relevant_third_party(text, company_name, THIRD_PARTY_KEYWORDS): return
@@ -230,10 +228,11 @@ async def process_company(company_name, domain, country, all_keywords, keyword_t
                 found_entries.append((kw, url, date_str, year, src))
                 print(f"✅ Found ({src}): {kw} | {url} | {date_str}")
 
-    for url in urls_ordered:
-        await process_url(url)
-        if len(found_entries) >= 2: break
-        await delay(REQUEST_DELAY)
+    urls_ordered = [u for u in urls_ordered if not is_job_link(u)]
+    async with LookaheadPrefetcher(browser, fetch_with_playwright, min_interval=REQUEST_DELAY) as prefetcher:
+        async for url, text in prefetcher.iterate(urls_ordered):
+            await process_url(url, text)
+            if len(found_entries) >= 2: break
 
     if not any(e[-1] == '3rd-party' for e in found_entries):
         print(f"🔄 No relevant 3rd-party results. Crawling site for {company_name}")
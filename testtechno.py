@@ -11,6 +11,8 @@ from playwright.async_api import async_playwright
 import csv
 import os
 from dotenv import load_dotenv
+from keyword_watch import install_keyword_watcher, watch_keywords, watched_page_text
+from prefetch import LookaheadPrefetcher
 load_dotenv()
 # ===== CONFIG =====
 COMPANIES_FILE = r'C:\Users\propl\OneDrive\Desktop\work\input.csv'
@@ -22,6 +24,7 @@ SCRAPINGDOG_API_KEY = os.getenv('SCRAPINGDOG_API_KEY')
 REQUEST_DELAY = 1.5
 MAX_RESULTS_PER_COMPANY = 3
 MIN_KEYWORDS_PER_COMPANY = 3  # Min unique keywords per company
+USE_KEYWORD_WATCHER = True  # resolve navigation in-page as soon as keywords are seen
 
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -103,17 +106,45 @@ def is_relevant_third_party(text, company, kws):
 def is_keyword_present_whole_word(text, keyword):
     return re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text.lower()) is not None
 
-async def process_url(url, page, company_name, domain, all_keywords, found_entries):
-    text = await fetch_with_playwright(page, url)
-    if not text:
-        return
+async def fetch_keyword_hits(page, url):
+    if url.endswith(".pdf"):
+        return None
+    try:
+        return set(await watch_keywords(page, url, min_hits=MIN_KEYWORDS_PER_COMPANY, timeout=90000))
+    except Exception as e:
+        print(f"❌ Playwright failed on {url}: {e}")
+        return None
 
+async def fetch_page_signals(page, url, domain):
+    """Return (keyword hits or None, text or None); everything process_url needs from the page."""
+    if not USE_KEYWORD_WATCHER:
+        return None, await fetch_with_playwright(page, url)
+    hits = await fetch_keyword_hits(page, url)
+    if not hits:
+        return hits, None
+    # The relevance check for third-party pages still needs the page text
+    text = await watched_page_text(page) if is_third_party(url, domain) else None
+    return hits, text
+
+async def process_url(url, signals, company_name, domain, all_keywords, found_entries):
+    hits, text = signals
     src = 'own' if not is_third_party(url, domain) else '3rd-party'
-    if src == '3rd-party' and not is_relevant_third_party(text, company_name, THIRD_PARTY_KEYWORDS):
-        return
+
+    if USE_KEYWORD_WATCHER:
+        if not hits:
+            return
+        if src == '3rd-party' and not is_relevant_third_party(text or "", company_name, THIRD_PARTY_KEYWORDS):
+            return
+        is_present = lambda kw: kw in hits
+    else:
+        if not text:
+            return
+        if src == '3rd-party' and not is_relevant_third_party(text, company_name, THIRD_PARTY_KEYWORDS):
+            return
+        is_present = lambda kw: is_keyword_present_whole_word(text, kw)
 
     for kw in ["aws"] + all_keywords:
-        if is_keyword_present_whole_word(text, kw):
+        if is_present(kw):
             if kw == "aws" and any(fk == "aws" for fk, _, _ in found_entries):
                 continue
             if not any(fk == kw for fk, _, _ in found_entries):
@@ -122,8 +153,6 @@ async def process_url(url, page, company_name, domain, all_keywords, found_entri
                 if len(set(fk for fk, _, _ in found_entries)) >= MIN_KEYWORDS_PER_COMPANY:
                     return
 
-    await delay(REQUEST_DELAY)
-
 def write_results_to_csv(results_data, mode='a'):
     OUTPUT_CSV_FILE.parent.mkdir(parents=True, exist_ok=True)
     header = ['Company Name', 'Domain', 'Country', 'Keyword', 'URL', 'Source']
@@ -138,9 +167,15 @@ def write_results_to_csv(results_data, mode='a'):
     print(f"📊 Results saved to {OUTPUT_CSV_FILE}")
 
 async def process_company(company_name, domain, country, all_keywords, session, browser):
-    page = await browser.new_page()
     found_entries = []
 
+    async def setup_page(page):
+        if USE_KEYWORD_WATCHER:
+            await install_keyword_watcher(page, ["aws"] + all_keywords)
+
+    async def fetch(page, url):
+        return await fetch_page_signals(page, url, domain)
+
     def unique_keywords_count():
         return len(set(fk for fk, _, _ in found_entries))
 
@@ -150,16 +185,15 @@ async def process_company(company_name, domain, country, all_keywords, session,
     search_data = await perform_Google_Search(session, company_name, domain, query)
     urls = extract_urls(search_data) if search_data else []
 
-    for url in urls:
-        if is_job_link(url):
-            continue
-        await process_url(url, page, company_name, domain, all_keywords, found_entries)
-
-        # ✅ stop only when we really have 3 different keywords
-        if unique_keywords_count() >= MIN_KEYWORDS_PER_COMPANY:
-            break
+    urls = [u for u in urls if not is_job_link(u)]
+    # Next URLs load in extra pages while the current one is analyzed
+    async with LookaheadPrefetcher(browser, fetch, min_interval=REQUEST_DELAY, setup_page=setup_page) as prefetcher:
+        async for url, signals in prefetcher.iterate(urls):
+            await process_url(url, signals, company_name, domain, all_keywords, found_entries)
 
-    await page.close()
+            # ✅ stop only when we really have 3 different keywords
+            if unique_keywords_count() >= MIN_KEYWORDS_PER_COMPANY:
+                break
 
     results_for_csv = [
         [company_name, domain, country, keyword, url, source]
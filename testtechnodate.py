@@ -6,13 +6,15 @@ from pathlib import Path
 from urllib.parse import quote, urlparse
 import aiofiles
 import aiohttp
-from bs4 import BeautifulSoup
 from playwright.async_api import async_playwright
 import csv
 from datetime import datetime
 import urllib3
 import os
 from dotenv import load_dotenv
+from prefilter import KeywordPrefilter
+from page_document import PageDocument
+from prefetch import LookaheadPrefetcher
 load_dotenv()
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 COMPANIES_FILE = r'C:\Users\propl\OneDrive\Desktop\work\input.csv'
@@ -24,6 +26,7 @@ SCRAPINGDOG_API_KEY = os.getenv('SCRAPINGDOG_API_KEY')
 REQUEST_DELAY = 1.5
 MAX_RESULTS_PER_COMPANY = 3
 MIN_KEYWORDS_PER_COMPANY = 3
+HTML_TEXT_BACKEND = None  # "selectolax", "lxml", "bs4" or None for the fastest installed
 
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -71,31 +74,25 @@ def parse_date(text):
                 continue
     return None
 
-async def fetch_date_from_html(content):
-    soup = BeautifulSoup(content, 'html.parser')
-
-    for selector in [
-        '.local-date', '.pr-date', 'time',
-        'meta[name="pubdate"]',
-        'meta[property="article:published_time"]'
-    ]:
-        el = soup.select_one(selector)
-        if el:
-            date_text = el.get_text() if el.name != 'meta' else el.get('content', '')
-            if (d := parse_date(date_text)):
-                return d, selector
-
- 
-    for tag in ['title', 'h1', 'h2', 'h3']:
-        for el in soup.find_all(tag):
-            if (d := parse_date(el.get_text())):
+async def fetch_date_from_html(doc):
+    if not isinstance(doc, PageDocument):
+        doc = PageDocument(doc, backend=HTML_TEXT_BACKEND)
+
+    for selector in ['.local-date', '.pr-date', 'time']:
+        el = doc.select_one(selector)
+        if el and (d := parse_date(el.get_text())):
+            return d, selector
+    for name, selector in [('pubdate', 'meta[name="pubdate"]'),
+                           ('article:published_time', 'meta[property="article:published_time"]')]:
+        if (d := parse_date(doc.meta.get(name, ''))):
+            return d, selector
+
+    for tag, texts in doc.headings.items():
+        for heading in texts:
+            if (d := parse_date(heading)):
                 return d, tag
 
-
-    footer_text = ""
-    for footer in soup.find_all(['footer']):
-        footer_text += " " + footer.get_text(" ", strip=True)
-
+    footer_text = doc.footer_text
 
     copyright_patterns = [
         re.compile(r'©\s*(19\d{2}|20\d{2})', re.I),
@@ -120,8 +117,7 @@ async def fetch_date_from_html(content):
 
 
     
-    text = soup.get_text(" ", strip=True)
-    if (d := parse_date(text)):
+    if (d := parse_date(doc.text)):
         return d, "body_text"
 
     return None, "not_found"
@@ -178,26 +174,33 @@ def is_job_link(url):
 def is_third_party(url, domain):
     return domain not in urlparse(url).netloc
 
-async def process_url(url, page, company_name, domain, all_keywords, found_entries):
-    content = await fetch_with_playwright(page, url)
+async def process_url(url, content, company_name, domain, all_keywords, found_entries, prefilter=None):
     if not content:
         return
 
-    src = 'own' if domain in urlparse(url).netloc else '3rd-party'
-    text = BeautifulSoup(content, 'html.parser').get_text(" ", strip=True)
+    candidates = prefilter.candidates(content) if prefilter else None
+    if candidates is not None and not candidates:
+        return
 
-    date, date_src = await fetch_date_from_html(content)
+    src = 'own' if domain in urlparse(url).netloc else '3rd-party'
+    # The document is shared by the text and date lookups; the date is only needed on a match
+    doc = PageDocument(content, url=url, backend=HTML_TEXT_BACKEND)
+    text = doc.text
+    date = date_src = None
 
     for kw in ["android"] + all_keywords:
+        if candidates is not None and kw not in candidates:
+            continue
         if re.search(r'\b' + re.escape(kw.lower()) + r'\b', text.lower()):
             if kw == "android" and any(fk == "android" for fk, _, _, _, _ in found_entries):
                 continue
             if not any(fk == kw for fk, _, _, _, _ in found_entries):
+                if date_src is None:
+                    date, date_src = await fetch_date_from_html(doc)
                 found_entries.append((kw, url, src, date or '', date_src))
                 print(f" Found ({src}): {kw} | {url} | Date: {date}")
                 if len(set(fk for fk, _, _, _, _ in found_entries)) >= MIN_KEYWORDS_PER_COMPANY:
                     return
-    await delay(REQUEST_DELAY)
 
 def write_results_to_csv(results_data, mode='a'):
     OUTPUT_CSV_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -211,14 +214,19 @@ def write_results_to_csv(results_data, mode='a'):
             writer.writerow(row)
     print(f"Results saved to {OUTPUT_CSV_FILE}")
 
+async def process_urls(urls, browser, company_name, domain, all_keywords, found_entries, prefilter):
+    # Next pages render while the current one is parsed; leaving the block cancels them
+    async with LookaheadPrefetcher(browser, fetch_with_playwright, min_interval=REQUEST_DELAY) as prefetcher:
+        async for url, content in prefetcher.iterate(urls):
+            await process_url(url, content, company_name, domain, all_keywords, found_entries, prefilter)
+            if len(set(fk for fk, _, _, _, _ in found_entries)) >= MIN_KEYWORDS_PER_COMPANY:
+                break
+
 async def process_company(company_name, domain, country, all_keywords, session, browser):
-    page = await browser.new_page()
     found_entries = []
 
-    def unique_keywords_count():
-        return len(set(fk for fk, _, _, _, _ in found_entries))
-
     all_kw_query = " OR ".join([f'"{kw}"' for kw in all_keywords])
+    prefilter = KeywordPrefilter(["android"] + all_keywords)
 
     # ---- Step 1: Own site search ----
     own_query = f'site:{domain} android ({all_kw_query}) (partnership OR collaboration OR customer OR "case study" OR deal)'
@@ -227,10 +235,7 @@ async def process_company(company_name, domain, country, all_keywords, session,
 
     own_urls = [u for u in urls if not is_third_party(u, domain) and not is_job_link(u)]
 
-    for url in own_urls:
-        await process_url(url, page, company_name, domain, all_keywords, found_entries)
-        if unique_keywords_count() >= MIN_KEYWORDS_PER_COMPANY:
-            break
+    await process_urls(own_urls, browser, company_name, domain, all_keywords, found_entries, prefilter)
 
     # ---- Step 2: Fallback to 3rd party if no own results ----
     if not found_entries:
@@ -244,12 +249,7 @@ async def process_company(company_name, domain, country, all_keywords, session,
 
         third_party_urls = [u for u in urls if is_third_party(u, domain) and not is_job_link(u)]
 
-        for url in third_party_urls:
-            await process_url(url, page, company_name, domain, all_keywords, found_entries)
-            if unique_keywords_count() >= MIN_KEYWORDS_PER_COMPANY:
-                break
-
-    await page.close()
+        await process_urls(third_party_urls, browser, company_name, domain, all_keywords, found_entries, prefilter)
 
     results_for_csv = [
         [company_name, domain, country, keyword, url, source, date, date_src]
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "translation_cache.sqlite")
+# Optional fastText language-ID model (lid.176.ftz); langid.py or a stopword heuristic otherwise.
+FASTTEXT_LID_MODEL = os.getenv("FASTTEXT_LID_MODEL", "lid.176.ftz")
+LANG_SAMPLE_CHARS = 3000
+# The free `translate` providers reject long queries, so chunks are sent in sentence-aligned pieces.
+TRANSLATE_MAX_CHARS = 480
+
+ENGLISH_STOPWORDS = frozenset(
+    "the and of to in is for on with that by this are as be from at or an it we our "
+    "has have was were will can not which their its more your you all about".split()
+)
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+# Error and quota notices the free providers return in place of a translation (MyMemory, mostly).
+SERVICE_ERROR_RE = re.compile(
+    r"MYMEMORY WARNING|YOU USED ALL AVAILABLE FREE TRANSLATIONS|QUERY LENGTH LIMIT EXCEEDED|"
+    r"INVALID LANGUAGE PAIR|IS AN INVALID (?:SOURCE|TARGET) LANGUAGE|PLEASE SELECT TWO DISTINCT LANGUAGES|"
+    r"NO QUERY SPECIFIED|TOO MANY REQUESTS|INVALID EMAIL PROVIDED",
+    re.IGNORECASE,
+)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？])\s+")
+
+_lid = None
+_translators = {}
+_cache = None
+
+
+def _load_lid():
+    global _lid
+    if _lid is None:
+        _lid = False
+        if os.path.exists(FASTTEXT_LID_MODEL):
+            try:
+                import fasttext
+                model = fasttext.load_model(FASTTEXT_LID_MODEL)
+                _lid = lambda s: model.predict(s.replace("\n", " "))[0][0].replace("__label__", "")
+            except Exception as e:
+                logger.info(f"fastText language ID unavailable: {e}")
+        if not _lid:
+            try:
+                import langid
+                _lid = lambda s: langid.classify(s)[0]
+            except ImportError:
+                pass
+    return _lid
+
+
+def detect_language(text):
+    """
+    ISO 639-1 code of `text`, decided locally. Pages that are clearly English by
+    stopword share never reach the model; "und" when nothing can tell.
+    """
+    sample = (text or "")[:LANG_SAMPLE_CHARS]
+    words = [w.lower() for w in WORD_RE.findall(sample)]
+    if not words:
+        return "und"
+    english = sum(w in ENGLISH_STOPWORDS for w in words) / len(words)
+    if english >= 0.15:
+        return "en"
+    lid = _load_lid()
+    if lid:
+        try:
+            return lid(sample)
+        except Exception as e:
+            logger.debug(f"Language ID failed: {e}")
+    # No model: mostly-ASCII text with some English function words is treated as English.
+    ascii_share = sum(c.isascii() for c in sample) / len(sample)
+    return "en" if ascii_share > 0.97 and english >= 0.05 else "und"
+
+
+def is_english(text):
+    return detect_language(text) == "en"
+
+
+class TranslationCache:
+    """sqlite map of sha256(target + text) -> translation, shared across runs and threads."""
+
+    def __init__(self, path=TRANSLATION_CACHE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, target TEXT, text TEXT)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(text, target):
+        return hashlib.sha256(f"{target}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text, target):
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM translations WHERE key = ?", (self.key(text, target),)).fetchone()
+        return row[0] if row else None
+
+    def put(self, text, target, translated):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?)",
+                               (self.key(text, target), target, translated))
+            self._conn.commit()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TranslationCache()
+    return _cache
+
+
+def _translator(target, source):
+    pair = (target, source)
+    if pair not in _translators:
+        from translate import Translator
+        _translators[pair] = Translator(to_lang=target, from_lang=source) if source else Translator(to_lang=target)
+    return _translators[pair]
+
+
+def _pieces(text, max_chars=TRANSLATE_MAX_CHARS):
+    """Sentence-aligned pieces of at most max_chars (a longer sentence is cut at word boundaries)."""
+    pieces, current = [], ""
+    for sentence in SENTENCE_END_RE.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def is_failed_translation(original, translated, source=None, target="en"):
+    """
+    True for answers that must not be cached: empty output, a provider error or quota
+    notice, or text handed back unchanged although its language differs from the target.
+    """
+    if not translated or not translated.strip():
+        return True
+    if SERVICE_ERROR_RE.search(translated):
+        return True
+    return source != target and " ".join(translated.split()) == " ".join(original.split())
+
+
+def translate_text(text, target="en", source=None):
+    """
+    Blocking, cached translation of one text; the original is returned on failure.
+    Only real translations are cached, so a quota hit is retried on the next run.
+    """
+    if not text or not text.strip():
+        return text
+    cache = get_cache()
+    cached = cache.get(text, target)
+    if cached is not None:
+        return cached
+    out, complete, stopped = [], True, False
+    try:
+        translator = _translator(target, source if source and source != "und" else None)
+        for piece in _pieces(text):
+            hit = cache.get(piece, target)
+            if hit is None and not stopped:
+                answer = translator.translate(piece)
+                if answer and SERVICE_ERROR_RE.search(answer):
+                    logger.warning(f"Translation service error: {answer[:120]}")
+                    stopped = True  # quota or error: uncached remaining pieces stay untranslated
+                elif not is_failed_translation(piece, answer, source, target):
+                    hit = answer
+                    cache.put(piece, target, hit)
+            if hit is None:
+                hit, complete = piece, False
+            out.append(hit)
+    except Exception as e:
+        logger.warning(f"Translation failed: {e}")
+        return text
+    translated = " ".join(out)
+    if complete:
+        cache.put(text, target, translated)
+    return translated
+
+
+async def translate_chunks(chunks, source=None, target="en"):
+    """Translate keyword-centred chunks off the event loop; English chunks pass through untouched."""
+    out = []
+    for chunk in chunks:
+        lang = source or detect_language(chunk)
+        if lang == target:
+            out.append(chunk)
+        else:
+            out.append(await asyncio.to_thread(translate_text, chunk, target, lang))
+    return out
+
+
+async def translate_if_needed(text, target="en"):
+    """Whole-text translation behind the language gate (English text never leaves the process)."""
+    lang = detect_language(text)
+    if lang == target:
+        return text
+    return await asyncio.to_thread(translate_text, text, target, lang)
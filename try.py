@@ -2,33 +2,25 @@ import argparse
 import asyncio
 import logging
 import re
-from io import BytesIO
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import sys
 import os
 import pandas as pd
 import httpx
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text as pdf_extract_text
-from PIL import Image
-import pytesseract
-import trafilatura
-from sentence_transformers import SentenceTransformer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
 import numpy as np
-import spacy
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-
-try:
-    from translate import Translator
-    translator = Translator(to_lang="en")
-    TRANSLATOR_AVAILABLE = True
-except Exception:
-    translator = None
-    TRANSLATOR_AVAILABLE = False
+from prefilter import KeywordPrefilter, sniff_charset
+from page_document import PageDocument
+import extract_pool
+from pdf_text import join_pages, page_numbers_for
+from html_stream import StreamingTextExtractor, stream_html_text
+from translation import detect_language, translate_chunks
+import multilingual
+import embedding_cache
+import embedding_batcher
+from embedding_backends import embedding_model_name
+import model_client
+from multilingual import term_view
 
 
 logging.basicConfig(
@@ -40,10 +32,11 @@ logger = logging.getLogger(__name__)
 # NLP / Models (lazy-loaded)
 LOGGER = logger
 MODEL = None
-NLP = None
-SIA = None
-VECTORIZER = None
-CLASSIFIER = None
+EMBEDDING_BACKEND = None  # "torch", "minilm", "onnx", "onnx-int8" or None for $EMBEDDING_BACKEND
+EMBEDDING_MODEL = embedding_model_name(EMBEDDING_BACKEND)
+ROW_CONCURRENCY = int(os.getenv("ROW_CONCURRENCY", 4))
+# Finished rows classified together before an incremental write
+CLASSIFY_BATCH = int(os.getenv("CLASSIFY_BATCH", 32))
 
 # Acronym expansions (example)
 ACRONYM_MAP = {
@@ -103,29 +96,17 @@ def contains_whole_word(text: str, word: str) -> bool:
         return False
     return re.search(rf'\b{re.escape(word)}\b', text, flags=re.IGNORECASE) is not None
 
-async def translate_if_needed(text: str) -> str:
-    if not TRANSLATOR_AVAILABLE:
-        return text
-    try:
-        translated = translator.translate(text)
-        # translator may return same text if already english
-        if translated and translated.strip():
-            return translated
-        return text
-    except Exception as e:
-        logger.warning(f"Translation failed: {e}")
-        return text
-
 def is_news_or_course_site(url: str):
     lower = url.lower() if url else ""
     is_news = bool(re.search(r'\b(news|blog|press|media|journal|release|article)\b', lower))
     is_course = bool(re.search(r'\b(course|training|academy|bootcamp|class|learn)\b', lower))
     return is_news, is_course
 
-def split_chunks(text: str, keyword: str, window_words: int = 400):
+def split_chunks(text: str, keyword: str, window_words: int = 400, require_terms: bool = True):
     """
     Return list of chunks (strings) centered around occurrences of keyword.
     If no keyword occurrences but overall text has any of ALL_TERMS, return a truncated chunk.
+    require_terms=False skips the ALL_TERMS check (for text that is checked after translation).
     """
     if not text:
         return []
@@ -148,21 +129,30 @@ def split_chunks(text: str, keyword: str, window_words: int = 400):
             start_idx = max(0, idx - window_words // 2)
             end_idx = min(len(words), idx + window_words // 2 + 1)
             chunk = ' '.join(words[start_idx:end_idx])
-            if any(t in chunk.lower() for t in ALL_TERMS):
+            if not require_terms or any(t in chunk.lower() for t in ALL_TERMS):
                 chunks.append(chunk.strip())
         return list(dict.fromkeys(chunks))
     else:
-        if any(t in text_lower for t in ALL_TERMS):
+        if not require_terms or any(t in text_lower for t in ALL_TERMS):
             return [text.strip()[:2000]]
     return []
 
-def semantic_filter(chunks, query, model, threshold=0.1):
-    """Return list of (chunk, similarity) with sim > threshold."""
+async def semantic_filter(chunks, query, model, threshold=0.1, model_name=None):
+    """
+    Return list of (chunk, similarity) with sim > threshold. Embeddings go through the on-disk
+    cache, and through the cross-row batcher when run_pipeline has started one for the model.
+    """
     try:
         if not chunks:
             return []
-        chunk_embeddings = model.encode(chunks, show_progress_bar=False)
-        query_embedding = model.encode([query], show_progress_bar=False)
+        model_name = model_name or EMBEDDING_MODEL
+        batcher = embedding_batcher.get(model_name)
+        if batcher is not None:
+            chunk_embeddings = await batcher.encode(chunks)
+            query_embedding = [await batcher.encode_query(query)]
+        else:
+            chunk_embeddings = embedding_cache.encode(model, chunks, model_name)
+            query_embedding = [embedding_cache.encode_query(model, query, model_name)]
         # compute cosine similarity
         from sklearn.metrics.pairwise import cosine_similarity
         sims = cosine_similarity(query_embedding, chunk_embeddings)[0]
@@ -171,8 +161,8 @@ def semantic_filter(chunks, query, model, threshold=0.1):
         logger.error(f"semantic_filter error: {e}")
         return []
 
-def justify_relevance(chunk, company, keyword, score, threshold, is_news=False, is_course=False):
-    chunk_lower = chunk.lower()
+def justify_relevance(chunk, company, keyword, score, threshold, is_news=False, is_course=False, language="en"):
+    chunk_lower = term_view(chunk, language)
     matched = [t for t in ALL_TERMS if t in chunk_lower]
     usage_matches = [t for t in matched if t in usageBase]
     hiring_matches = [t for t in matched if t in hiringBase]
@@ -215,8 +205,65 @@ def justify_relevance(chunk, company, keyword, score, threshold, is_news=False,
 
     return relevance_status, level, explanation
 
-# Fetch page content (pdf or html) using Playwright for JS-rendered pages
-async def fetch_page_content(playwright, url: str):
+async def keyword_absent_from_source(url: str, keyword: str) -> bool:
+    """
+    Cheap pre-render check: fetch the raw HTML and scan it for the keyword (and its
+    expansion). Only returns True when the page can safely skip rendering, OCR,
+    chunking and embeddings; any fetch problem keeps the page on the full path.
+    """
+    if not keyword or url.lower().endswith(".pdf"):
+        return False
+    variants = [keyword] + ([ACRONYM_MAP[keyword.lower()]] if keyword.lower() in ACRONYM_MAP else [])
+    try:
+        async with httpx.AsyncClient(timeout=20, verify=False, follow_redirects=True) as client:
+            r = await client.get(url)
+            r.raise_for_status()
+            content_type = r.headers.get("content-type", "text/html")
+            if "html" not in content_type:
+                return False
+            return KeywordPrefilter(variants).should_skip(r.content, encoding=sniff_charset(r.content, content_type))
+    except Exception as e:
+        logger.debug(f"Prefilter fetch failed for {url}: {e}")
+        return False
+
+# PDFs are read page by page until the keyword shows up, plus this many pages of context
+PDF_CONTEXT_PAGES = 1
+PDF_MAX_PAGES = None
+PDF_TEXT_BACKEND = None  # "pdfminer", "pypdf2", "pypdfium2" or None for $PDF_TEXT_BACKEND
+
+# Serialized pages above this size skip the DOM parse and go through the streaming extractor
+LARGE_HTML_CHARS = 5_000_000
+
+# Drop what never contributes text before page.content() serializes the DOM:
+# scripts/styles, inline data: images and data: backgrounds (often tens of MB).
+PRUNE_DOM_JS = """
+() => {
+  for (const el of document.querySelectorAll('script:not([type="application/ld+json"]), style, noscript, template')) el.remove();
+  for (const el of document.querySelectorAll('[src^="data:"], [srcset*="data:"]')) {
+    el.removeAttribute('src');
+    el.removeAttribute('srcset');
+  }
+  for (const el of document.querySelectorAll('[style*="data:"]')) el.removeAttribute('style');
+}
+"""
+
+# PDFs stop being read once the keyword and, when ACRONYM_MAP has one, its expansion have both
+# appeared; the wrong-expansion check downstream must see the expansion if the document has it.
+def pdf_stop_condition(keyword):
+    if not keyword:
+        return None
+    missing = {keyword}
+    if ACRONYM_MAP.get(keyword.lower()):
+        missing.add(ACRONYM_MAP[keyword.lower()])
+
+    def found(number, page_text):
+        missing.difference_update([term for term in missing if contains_whole_word(page_text, term)])
+        return not missing
+    return found
+
+# Fetch page content (pdf or html) using Playwright for JS-rendered pages.
+# Very large HTML comes back as a StreamingTextExtractor instead of a string.
+async def fetch_page_content(playwright, url: str, keyword=None):
     url = ensure_https(url)
     if url.lower().endswith(".pdf"):
         # fetch via httpx (no JS)
@@ -227,10 +274,14 @@ async def fetch_page_content(playwright, url: str):
                 content = r.content
                 if not content[:4] == b"%PDF":
                     return "", "invalid_pdf"
-                # use pdfminer
+                # use pdfminer, pages in parallel in the extraction pool, stopping at the keyword
                 try:
-                    text = pdf_extract_text(BytesIO(content))
-                    return text, "pdf"
+                    pages, hit = await extract_pool.pdf_pages_until(
+                        content, pdf_stop_condition(keyword), max_pages=PDF_MAX_PAGES, extra_pages=PDF_CONTEXT_PAGES,
+                        backend=PDF_TEXT_BACKEND)
+                    if hit:
+                        logger.info(f"{url}: '{keyword}' (and any expansion) seen by page {hit}, read {len(pages)} pages")
+                    return join_pages(pages), "pdf"
                 except Exception as e:
                     logger.error(f"PDF extract error: {e}")
                     return "", "load_failed_pdf_processing"
@@ -243,8 +294,12 @@ async def fetch_page_content(playwright, url: str):
     try:
         await page.goto(url, timeout=45000)
         await page.wait_for_load_state('networkidle', timeout=30000)
+        await page.evaluate(PRUNE_DOM_JS)
         html = await page.content()
         await browser.close()
+        if len(html) > LARGE_HTML_CHARS:
+            logger.info(f"{url}: {len(html)} chars of HTML after pruning, streaming text extraction")
+            return stream_html_text(html, base_url=url), "html"
         return html, "html"
     except Exception as e:
         logger.error(f"Playwright failed to load {url}: {e}")
@@ -254,48 +309,46 @@ async def fetch_page_content(playwright, url: str):
             pass
         return "", "load_failed_playwright"
 
-# Extract text using trafilatura (preferred) with fallback to BeautifulSoup
-def clean_text_from_html(html_content: str):
+# Extract text using trafilatura (preferred) with fallback to the document's visible text,
+# in the extraction pool so the event loop keeps serving network I/O meanwhile
+async def clean_text_from_html(html_content):
+    """html_content may be a raw HTML string or a PageDocument shared with the image OCR step."""
     if not html_content:
         return ""
+    doc = html_content if isinstance(html_content, PageDocument) else PageDocument(html_content)
     try:
-        extracted = trafilatura.extract(html_content, include_comments=False, include_tables=False)
-        if extracted and extracted.strip():
-            return extracted
+        return await extract_pool.html_text(doc.html)
     except Exception as e:
-        logger.debug(f"trafilatura extraction failed: {e}")
-    # fallback
+        logger.error(f"Pooled text extraction failed, extracting inline: {e}")
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text(separator=' ', strip=True)
-        return text
+        return doc.text
     except Exception as e:
-        logger.error(f"BeautifulSoup fallback failed: {e}")
+        logger.error(f"Text fallback failed: {e}")
         return ""
 
 # OCR images on page to find keywords
-async def extract_text_from_images(website_url, keywords):
+async def extract_text_from_images(website_url, keywords, doc=None, image_urls=None):
+    """
+    With `doc` (or `image_urls`) the already-fetched page supplies the <img> list;
+    otherwise the page is fetched again.
+    """
     results = {}
     try:
         async with httpx.AsyncClient(timeout=20, verify=False) as client:
-            r = await client.get(website_url)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.text, 'html.parser')
-            img_tasks = []
-            image_urls = []
-            for img_tag in soup.find_all('img'):
-                src = img_tag.get('src')
-                if not src:
-                    continue
-                img_url = urljoin(website_url, src)
-                image_urls.append(img_url)
+            if image_urls is not None:
+                image_urls = list(dict.fromkeys(image_urls))
+            elif doc is None:
+                r = await client.get(website_url)
+                r.raise_for_status()
+                doc = PageDocument(r.content, url=website_url, content_type=r.headers.get("Content-Type", ""))
+            if image_urls is None:
+                image_urls = list(dict.fromkeys(img["src"] for img in doc.images))
             # process synchronously to keep code simple
             for img_url in image_urls:
                 try:
                     resp = await client.get(img_url, timeout=15)
                     resp.raise_for_status()
-                    img = Image.open(BytesIO(resp.content)).convert('RGB')
-                    text = pytesseract.image_to_string(img).strip()
+                    text = await extract_pool.ocr_image(resp.content)
                     found = [kw for kw in keywords if contains_whole_word(text, kw)]
                     if found:
                         results[img_url] = found
@@ -305,61 +358,41 @@ async def extract_text_from_images(website_url, keywords):
         logger.debug(f"Image OCR overall failed: {e}")
     return results
 
-# Initialize heavy models (lazy)
+# Initialize heavy models (lazy). With model_server.py running they stay in the server process.
 def init_models():
-    global MODEL, NLP, SIA, VECTORIZER, CLASSIFIER
+    global MODEL
     if MODEL is None:
-        logger.info("Loading embedding model (sentence-transformers/all-mpnet-base-v2)...")
-        MODEL = SentenceTransformer('all-mpnet-base-v2')
-    if NLP is None:
-        logger.info("Loading spaCy model (en_core_web_sm)...")
-        NLP = spacy.load("en_core_web_sm")
-    if SIA is None:
-        logger.info("Loading NLTK VADER...")
-        try:
-            nltk.data.find('sentiment/vader_lexicon.zip')
-        except LookupError:
-            nltk.download('vader_lexicon')
-        SIA = SentimentIntensityAnalyzer()
-    if VECTORIZER is None or CLASSIFIER is None:
-        # Quick seed classifier - replace with proper training if available
-        logger.info("Preparing quick TF-IDF + MultinomialNB classifier (seed examples).")
-        seed_docs = [
-            "Company X partners with AWS to offer cloud solutions",
-            "We are hiring software engineers and devops",
-            "Read our latest blog about productivity and best practices",
-            "Company Y integrates with Google Cloud Platform for storage",
-            "Join our team - open positions in marketing and engineering",
-            "Announcement: new product launch and solution brief"
-        ]
-        seed_labels = ["partnership", "hiring", "blog", "partnership", "hiring", "partnership"]
-        VECTORIZER = TfidfVectorizer(max_features=5000, stop_words='english')
-        X = VECTORIZER.fit_transform(seed_docs)
-        CLASSIFIER = MultinomialNB()
-        CLASSIFIER.fit(X, seed_labels)
+        logger.info(f"Loading embedding model ({EMBEDDING_MODEL})...")
+        MODEL = model_client.get_encoder(EMBEDDING_BACKEND)
+    if not isinstance(MODEL, model_client.RemoteEncoder):
+        logger.info("No model server; loading spaCy, NLTK VADER and the category classifier in-process.")
+        model_client.load_spacy()
+        model_client.load_sentiment()
+        model_client.load_classifier()
 
 # Entity extraction helper
 def extract_entities(text):
-    if not NLP or not text:
+    if not text:
         return []
-    doc = NLP(text)
-    ents = [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in ("ORG", "PRODUCT", "GPE", "PERSON")]
+    ents = model_client.entities([text], labels=("ORG", "PRODUCT", "GPE", "PERSON"))[0]
     # return only unique entity texts
     return list(dict.fromkeys([t for t, _ in ents]))
 
-# Simple classification wrapper
-def classify_text_category(text):
-    if not VECTORIZER or not CLASSIFIER or not text:
-        return "-"
+# Category of every row's top chunk in one call (rows left with "Predicted Category" None by process_row)
+def classify_categories(results):
+    pending = [r for r in results if r is not None and r.get("Predicted Category") is None]
+    if not pending:
+        return
     try:
-        X = VECTORIZER.transform([text])
-        return CLASSIFIER.predict(X)[0]
+        labels = model_client.classify([r["Chunk"] for r in pending])
     except Exception as e:
-        logger.debug(f"classify_text_category error: {e}")
-        return "-"
+        logger.debug(f"classify_categories error: {e}")
+        labels = ["-"] * len(pending)
+    for r, label in zip(pending, labels):
+        r["Predicted Category"] = label
 
 # main row processing
-async def process_row(idx, row, playwright, threshold=0.4):
+async def process_row(idx, row, playwright, threshold=0.4, prefilter=False):
     company_raw = row.get('Company Name') or row.get('company') or row.get('Company') or ""
     company = normalize_company_name(company_raw)
     keyword = str(row.get('Keyword') or row.get('Technology') or row.get('keyword') or "").strip()
@@ -367,7 +400,24 @@ async def process_row(idx, row, playwright, threshold=0.4):
     url = ensure_https(raw_url)
 
     is_news, is_course = is_news_or_course_site(url)
-    html_or_text, content_type = await fetch_page_content(playwright, url)
+    if prefilter and await keyword_absent_from_source(url, keyword):
+        return {
+            "Company": company,
+            "Link": url,
+            "Keyword": keyword,
+            "Content Type": "html",
+            "Relevant or Not": "NOT RELEVANT",
+            "Chunk": "-",
+            "Score Level": "LOW",
+            "Explanation": f"Keyword '{keyword}' not present in page source (prefilter).",
+            "OCR Keywords & Image Links": "-",
+            "Predicted Category": "-",
+            "Entities Found": "-",
+            "Sentiment": "-",
+            "Load Status": "skipped_prefilter"
+        }
+
+    html_or_text, content_type = await fetch_page_content(playwright, url, keyword=keyword)
 
     if content_type.startswith("load_failed"):
         return {
@@ -403,20 +453,25 @@ async def process_row(idx, row, playwright, threshold=0.4):
             "Load Status": "invalid_pdf"
         }
 
-    # Extract clean text
+    # Extract clean text; the HTML is parsed once and shared with the image OCR below
+    doc = None
+    image_urls = None
+    load_status = content_type
     if content_type == "pdf":
         text = html_or_text
+    elif isinstance(html_or_text, StreamingTextExtractor):
+        text, image_urls = html_or_text.text, html_or_text.images
+        if html_or_text.truncated:
+            load_status = f"{content_type}_truncated"
     else:
-        text = clean_text_from_html(html_or_text)
+        doc = PageDocument(html_or_text, url=url)
+        text = await clean_text_from_html(doc)
 
-    # translate if needed (optional)
-    try:
-        text = await translate_if_needed(text)
-    except Exception:
-        pass
+    # Language ID is local; only keyword chunks of non-English pages are translated (below)
+    language = detect_language(text)
 
     # OCR images for keywords and acronyms
-    ocr_keywords = await extract_text_from_images(url, [keyword] + list(ACRONYM_MAP.keys())) if keyword else {}
+    ocr_keywords = await extract_text_from_images(url, [keyword] + list(ACRONYM_MAP.keys()), doc=doc, image_urls=image_urls) if keyword else {}
     ocr_summary = "; ".join([f"{k}: {', '.join(v)}" for k, v in ocr_keywords.items()]) if ocr_keywords else "-"
 
     # early filter: text size
@@ -434,7 +489,7 @@ async def process_row(idx, row, playwright, threshold=0.4):
             "Predicted Category": "-",
             "Entities Found": "-",
             "Sentiment": "-",
-            "Load Status": content_type
+            "Load Status": load_status
         }
 
     # check wrong acronym expansion
@@ -455,11 +510,19 @@ async def process_row(idx, row, playwright, threshold=0.4):
                 "Predicted Category": "-",
                 "Entities Found": "-",
                 "Sentiment": "-",
-                "Load Status": content_type
+                "Load Status": load_status
             }
 
     # split chunks around keyword
-    chunks = split_chunks(text, keyword)
+    direct = multilingual.can_score_directly(language)
+    if language == "en":
+        chunks = split_chunks(text, keyword)
+    elif direct:
+        # multilingual mode: score the original chunks, no translation round trip
+        chunks = [c for c in split_chunks(text, keyword, require_terms=False) if any(t in term_view(c, language) for t in ALL_TERMS)]
+    else:
+        chunks = await translate_chunks(split_chunks(text, keyword, require_terms=False), source=language)
+        chunks = [c for c in chunks if any(t in c.lower() for t in ALL_TERMS)]
     if not chunks:
         return {
             "Company": company,
@@ -474,12 +537,13 @@ async def process_row(idx, row, playwright, threshold=0.4):
             "Predicted Category": "-",
             "Entities Found": "-",
             "Sentiment": "-",
-            "Load Status": content_type
+            "Load Status": load_status
         }
 
     # semantic filter using embeddings
     query = f"What is the relationship between {company} and {keyword}?"
-    rel_chunks = semantic_filter(chunks, query, MODEL, threshold=0.05)  # small prefilter threshold
+    model, model_name = (multilingual.get_model(), multilingual.MULTILINGUAL_MODEL) if direct else (MODEL, EMBEDDING_MODEL)
+    rel_chunks = await semantic_filter(chunks, query, model, threshold=0.05, model_name=model_name)  # small prefilter threshold
     if not rel_chunks:
         # fallback: take chunks and still run justification based on terms
         top_chunk = chunks[0]
@@ -489,15 +553,18 @@ async def process_row(idx, row, playwright, threshold=0.4):
 
     # compute entities and sentiment and predicted category
     entities = extract_entities(top_chunk)
-    sentiment_scores = SIA.polarity_scores(top_chunk) if SIA else {}
+    sentiment_scores = model_client.sentiment([top_chunk])[0]
     sentiment_summary = f"neg:{sentiment_scores.get('neg',0):.2f}, neu:{sentiment_scores.get('neu',0):.2f}, pos:{sentiment_scores.get('pos',0):.2f}, comp:{sentiment_scores.get('compound',0):.2f}" if sentiment_scores else "-"
-    predicted_category = classify_text_category(top_chunk)
+    predicted_category = None if top_chunk else "-"  # filled in batches by classify_categories
 
-    relevance, level, explanation = justify_relevance(top_chunk, company, keyword, score, threshold, is_news=is_news, is_course=is_course)
+    relevance, level, explanation = justify_relevance(top_chunk, company, keyword, score, threshold, is_news=is_news, is_course=is_course,
+                                                      language=language if direct else "en")
 
     # if no entities found but OCR found keywords, consider note
     if relevance == "NOT RELEVANT" and ocr_keywords:
         explanation += f" (OCR detected keywords in images: {ocr_summary})"
+    if content_type == "pdf" and keyword and (pages := page_numbers_for(text, keyword)):
+        explanation += f" (PDF page(s): {', '.join(map(str, pages[:10]))})"
 
     # final packaging
     return {
@@ -513,10 +580,10 @@ async def process_row(idx, row, playwright, threshold=0.4):
         "Predicted Category": predicted_category,
         "Entities Found": ", ".join(entities) if entities else "-",
         "Sentiment": sentiment_summary,
-        "Load Status": content_type
+        "Load Status": load_status
     }
 
-async def run_pipeline(input_path, output_path):
+async def run_pipeline(input_path, output_path, prefilter=False, concurrency=ROW_CONCURRENCY):
     # read input
     if input_path.lower().endswith(('.xls', '.xlsx')):
         df = pd.read_excel(input_path)
@@ -525,12 +592,18 @@ async def run_pipeline(input_path, output_path):
     # normalize columns to expected
     df = df.rename(columns={c: c.strip() for c in df.columns})
     init_models()
-    results = []
-    async with async_playwright() as playwright:
-        for idx, row in df.iterrows():
+    # Rows in flight share one embedding batcher per model instead of encoding a few chunks each
+    embedding_batcher.start(MODEL, EMBEDDING_MODEL)
+    if multilingual.multilingual_enabled():
+        embedding_batcher.start(multilingual.get_model(), multilingual.MULTILINGUAL_MODEL)
+    results = [None] * len(df)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_row(pos, idx, row, playwright):
+        async with semaphore:
             try:
                 logger.info(f"Processing row {idx+1}/{len(df)}")
-                res = await process_row(idx, row, playwright, threshold=0.4)
+                res = await process_row(idx, row, playwright, threshold=0.4, prefilter=prefilter)
             except Exception as e:
                 logger.exception(f"Error processing row {idx}: {e}")
                 res = {
@@ -548,10 +621,21 @@ async def run_pipeline(input_path, output_path):
                     "Sentiment": "-",
                     "Load Status": "error"
                 }
-            results.append(res)
-            # Save incremental output after each row
-            out_df = pd.DataFrame(results)
-            out_df.to_csv(output_path, index=False)
+        results[pos] = res
+        if sum(1 for r in results if r is not None and r.get("Predicted Category") is None) >= CLASSIFY_BATCH:
+            classify_categories(results)
+        # Save incremental output after each row (finished rows, in input order)
+        out_df = pd.DataFrame([r for r in results if r is not None])
+        out_df.to_csv(output_path, index=False)
+
+    try:
+        async with async_playwright() as playwright:
+            await asyncio.gather(*(run_row(pos, idx, row, playwright) for pos, (idx, row) in enumerate(df.iterrows())))
+    finally:
+        await embedding_batcher.stop_all()
+        # Also on an interrupted run, so the last write never leaves the category column empty
+        classify_categories(results)
+        pd.DataFrame([r for r in results if r is not None]).to_csv(output_path, index=False)
     logger.info(f"Completed. Results written to {output_path}")
     return output_path
 
@@ -559,6 +643,10 @@ def main():
     parser = argparse.ArgumentParser(description="QC Scraper - semantic + NLP QC for scraped pages")
     parser.add_argument("input", help="Input file path (.xlsx or .csv)")
     parser.add_argument("output", help="Output CSV path")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="Skip rendering and analysis for pages whose source does not contain the keyword")
+    parser.add_argument("--concurrency", type=int, default=ROW_CONCURRENCY,
+                        help="Rows processed at the same time (their embeddings are batched together)")
     args = parser.parse_args()
     input_path = args.input
     output_path = args.output
@@ -569,13 +657,15 @@ def main():
 
     # run asyncio event loop
     try:
-        asyncio.run(run_pipeline(input_path, output_path))
+        asyncio.run(run_pipeline(input_path, output_path, prefilter=args.prefilter, concurrency=args.concurrency))
     except KeyboardInterrupt:
         logger.warning("Interrupted by user")
         sys.exit(1)
     except Exception as e:
         logger.exception(f"Fatal error: {e}")
         sys.exit(2)
+    finally:
+        extract_pool.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -5,37 +5,25 @@ import pandas as pd
 import httpx
 from bs4 import BeautifulSoup
 import trafilatura
-import spacy
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-import subprocess
-import json
+import model_client
+import llm_client
 
 # ---------- Setup ----------
 logging.basicConfig(level=logging.INFO, format="%(asctime)s — %(levelname)s — %(message)s")
 
-nlp = spacy.load("en_core_web_sm")
-nltk.download("vader_lexicon", quiet=True)
-sia = SentimentIntensityAnalyzer()
+# spaCy and VADER come from model_server.py when it is running, else load in-process on first use
+
+ROW_CONCURRENCY = 8  # rows fetched and analyzed at once; LLM requests are further bounded by LLM_CONCURRENCY
 
 # ---------- Call mistral ----------
-def ask_mistral(prompt: str) -> dict:
-    """Send structured prompt to local mistral via Ollama and parse JSON response."""
+async def ask_mistral(client, prompt: str, company: str, keyword: str, chunk: str) -> dict:
+    """Send structured prompt to local mistral via the Ollama HTTP API (JSON mode, cached) and return the parsed answer."""
+    key = llm_client.LLMCache.key(client.model, PROMPT_VERSION, company, keyword, chunk)
     try:
-        result = subprocess.run(
-            ["ollama", "run", "mistral"],
-            input=prompt.encode("utf-8"),
-            capture_output=True,
-            check=True
-        )
-        raw = result.stdout.decode("utf-8").strip()
-        # try to extract JSON
-        try:
-            parsed = json.loads(raw)
-            return parsed
-        except json.JSONDecodeError:
-            logging.warning("Mistral did not return valid JSON, fallback to raw text")
-            return {"uses_tech": False, "explanation": raw, "confidence": "low"}
+        return await client.ask_json(prompt, key=key)
+    except ValueError as e:  # invalid JSON or not a JSON object
+        logging.warning(f"Mistral did not return a valid JSON object: {e}")
+        return {"uses_tech": False, "explanation": "LLM returned invalid JSON", "confidence": "low"}
     except Exception as e:
         logging.error(f"Ollama mistral error: {e}")
         return {"uses_tech": False, "explanation": "LLM call failed", "confidence": "low"}
@@ -61,6 +49,8 @@ def extract_clean_text(html: str) -> str:
     return soup.get_text(separator=" ", strip=True)
 
 # ---------- QC Prompt ----------
+PROMPT_VERSION = 1  # bump on any change to build_prompt so cached answers are not reused
+
 def build_prompt(company_name: str, keyword_tech: str, text_chunk: str) -> str:
     return f"""
 You are a highly skeptical web scraper and technology analyst. 
@@ -99,18 +89,17 @@ Your goal is to decide if **{company_name}** is **currently and actively** using
 """
 
 # ---------- QC Pipeline ----------
-def analyze_text(text: str, company: str, keyword: str) -> dict:
+async def analyze_text(client, text: str, company: str, keyword: str) -> dict:
     if not text:
         return {"uses_tech": False, "explanation": "No content", "confidence": "low"}
 
     # Sentiment + entities (extra QC, not main decision)
-    doc = nlp(text[:5000])
-    entities = [(ent.text, ent.label_) for ent in doc.ents]
-    sentiment = sia.polarity_scores(text)
+    entities = (await asyncio.to_thread(model_client.entities, [text[:5000]]))[0]
+    sentiment = (await asyncio.to_thread(model_client.sentiment, [text]))[0]
 
     # Call mistral with strict QC prompt
-    prompt = build_prompt(company, keyword, text[:1500])  # limit snippet length
-    llm_output = ask_mistral(prompt)
+    chunk = text[:1500]  # limit snippet length
+    llm_output = await ask_mistral(client, build_prompt(company, keyword, chunk), company, keyword, chunk)
 
     return {
         "entities": entities,
@@ -119,28 +108,36 @@ def analyze_text(text: str, company: str, keyword: str) -> dict:
     }
 
 # ---------- Runner ----------
-async def run_pipeline(input_csv: str, output_csv: str):
+async def run_pipeline(input_csv: str, output_csv: str, client=None, concurrency=ROW_CONCURRENCY):
     df = pd.read_csv(input_csv)
+    client = client or llm_client.get_client()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    results = []
-    for _, row in df.iterrows():
+    async def run_row(row):
         company = row["Company Name"]
         domain = row["Website"]
         keyword = row["Keyword"]
         url = row["URL"]
 
-        logging.info(f"Processing {company} | {url}")
-        html = await fetch_url(url)
-        text = extract_clean_text(html)
-        analysis = analyze_text(text, company, keyword)
+        async with semaphore:
+            logging.info(f"Processing {company} | {url}")
+            html = await fetch_url(url)
+            text = await asyncio.to_thread(extract_clean_text, html)
+            analysis = await analyze_text(client, text, company, keyword)
 
-        results.append({
+        return {
             "company": company,
             "domain": domain,
             "keyword": keyword,
             "url": url,
             **analysis
-        })
+        }
+
+    try:
+        results = await asyncio.gather(*(run_row(row) for _, row in df.iterrows()))
+    finally:
+        await client.aclose()
+    logging.info(f"LLM requests: {client.requests}, answered from cache: {client.cache_hits}")
 
     out_df = pd.DataFrame(results)
     out_df.to_csv(output_csv, index=False)
@@ -152,6 +149,15 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", default="companies.csv", help="Input CSV with company,domain,country,keyword,url")
     parser.add_argument("--output", default="results_mistral.csv", help="Output CSV")
+    parser.add_argument("--concurrency", type=int, default=ROW_CONCURRENCY, help="Rows processed at the same time")
+    parser.add_argument("--llm-concurrency", type=int, default=llm_client.LLM_CONCURRENCY,
+                        help="Requests in flight to the Ollama server")
+    parser.add_argument("--stub-llm", action="store_true", help="Use a canned local answer instead of Ollama")
     args = parser.parse_args()
 
-    asyncio.run(run_pipeline(args.input, args.output))
+    async def main():
+        # The client (and its asyncio primitives) is created inside the running loop
+        client = llm_client.get_client("stub" if args.stub_llm else None, concurrency=args.llm_concurrency)
+        await run_pipeline(args.input, args.output, client=client, concurrency=args.concurrency)
+
+    asyncio.run(main())
@@ -1,8 +1,11 @@
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import csv
 import os
+from prefilter import KeywordPrefilter, extract_hrefs, sniff_charset
+from html_text import decode_html, html_to_text
+
+HTML_TEXT_BACKEND = None  # "selectolax", "lxml", "bs4" or None for the fastest installed
 
 # =====================
 # Keyword Dictionaries
@@ -28,6 +31,9 @@ voice_keywords = [
     "EPabx", "EPABX", "Nortel", "MS Teams", "Softphone"
 ]
 
+# One combined scan decides whether a page is worth parsing at all
+KEYWORD_PREFILTER = KeywordPrefilter(voice_keywords + ccaas_keywords)
+
 # =====================
 # URL Normalization
 # =====================
@@ -59,21 +65,30 @@ def crawl_and_search(base_url, max_pages=10):
             resp = requests.get(url, timeout=10)
             if "text/html" not in resp.headers.get("Content-Type", ""):
                 continue
-            soup = BeautifulSoup(resp.text, "html.parser")
-            text = soup.get_text(" ", strip=True)
+            charset = sniff_charset(resp.content, resp.headers.get("Content-Type", ""))
+            candidates = KEYWORD_PREFILTER.candidates(resp.content, charset)
+
+            if candidates:
+                html = decode_html(resp.content, charset)
+                text = html_to_text(html, backend=HTML_TEXT_BACKEND).lower()
 
-            # Search keywords
-            for k in voice_keywords:
-                if k.lower() in text.lower():
-                    found_voice.add(k)
+                # Search keywords
+                for k in voice_keywords:
+                    if k in candidates and k.lower() in text:
+                        found_voice.add(k)
 
-            for k in ccaas_keywords:
-                if k.lower() in text.lower():
-                    found_ccaas.add(k)
+                for k in ccaas_keywords:
+                    if k in candidates and k.lower() in text:
+                        found_ccaas.add(k)
+
+            else:
+                # No keyword can be on this page: skip the parse, just follow its links
+                html = resp.content
+            hrefs = extract_hrefs(html)
 
             # Collect internal links
-            for a in soup.find_all("a", href=True):
-                link = urljoin(url, a["href"])
+            for href in hrefs:
+                link = urljoin(url, href)
                 if urlparse(link).netloc == urlparse(base_url).netloc:
                     if link not in visited:
                         to_visit.append(link)